@@ -3,14 +3,47 @@ import streamlit as st
 # Page Config must be the first Streamlit command
 st.set_page_config(page_title="AI Resume Shortlister", layout="wide")
 
+import os
+import re
+import tempfile
+import time
+
 import pandas as pd
-from parsing import resume_parser, jd_parser
-from matching import skill_matcher, scorer
-from explanation import gemini_explainer
-from utils import logger, skill_taxonomy
-from sklearn.metrics.pairwise import cosine_similarity
+from matching import skill_matcher
+from matching import scorer
+from pipeline.engine import ShortlistEngine, feature_matrix, unique_title
+from pipeline.service import ServiceBusyError, ServiceClient
+from pipeline.streaming import StreamingRanker
+from utils import instrumentation, logger
+from utils.model_registry import REGISTRY
+
+# Above this many uploads, only the top candidates stay in memory and on screen
+MAX_INTERACTIVE_FILES = 20
+TOP_K_DISPLAY = 50
+# Streaming: resumes scored per pass, and the shortest gap between table redraws
+STREAM_BATCH_SIZE = 8
+STREAM_REDRAW_SECONDS = 0.5
+
+# Set to e.g. http://127.0.0.1:8765 to score on a shared `python -m pipeline.service`
+# instead of loading the models in this Streamlit process
+SERVICE_URL = os.getenv("SHORTLIST_SERVICE_URL")
+
+
+@st.cache_resource
+def get_engine():
+    return ShortlistEngine()
+
+
+@st.cache_resource
+def warm_up_models():
+    # Once per server process: load spaCy, the encoder and Gemini while the page renders
+    return REGISTRY.warm_up()
+
 
 def main():
+    _remove_spill()
+    if not SERVICE_URL:
+        warm_up_models()
     st.title("AI Resume Shortlister 🚀")
     st.markdown("---")
 
@@ -20,6 +53,12 @@ def main():
     with col1:
         st.subheader("1. Job Description (Compulsory)")
         jd_text = st.text_area("Paste the Job Description here", height=300, key="jd_input")
+        extra_roles = st.text_area(
+            "Other open roles (optional)", height=120, key="extra_roles_input",
+            placeholder="Data Engineer\n<job description>\n---\nML Engineer\n<job description>"
+        )
+        st.caption("Each role: a title line, then its description; separate roles with a line of ---. "
+                   "Resumes are parsed once and ranked for every role.")
     
     with col2:
         st.subheader("2. Required Skills (Compulsory)")
@@ -28,6 +67,7 @@ def main():
         
         st.subheader("3. Upload Resumes")
         uploaded_files = st.file_uploader("Upload PDF or DOCX files", type=["pdf", "docx"], accept_multiple_files=True)
+        stream_results = st.checkbox("Stream results as they finish", value=True)
 
     # 2. Action
     if st.button("Evaluate Candidates", type="primary"):
@@ -44,7 +84,8 @@ def main():
             return
 
         # Input Validation (Prevent Streamlit Cloud resource exhaustion)
-        if len(jd_text) > 10000:
+        roles = _parse_roles(jd_text, extra_roles)
+        if any(len(text) > 10000 for text in roles.values()):
             st.error("❌ Job Description too long (max 10,000 characters)")
             return
         
@@ -53,10 +94,6 @@ def main():
             st.error("❌ Too many skills entered (max 50 skills)")
             return
         
-        if len(uploaded_files) > 20:
-            st.error("❌ Too many resumes (max 20 per batch)")
-            return
-        
         # Check individual file sizes (max 10MB per file)
         for file in uploaded_files:
             file_size_mb = file.size / (1024 * 1024)
@@ -66,143 +103,383 @@ def main():
 
 
         # 3. Processing
-        results = []
+        if SERVICE_URL and len(roles) > 1:
+            # The service scores one job description per job; loading the
+            # models here instead would defeat the point of sharing them
+            st.error("❌ Multiple roles are not supported with the shared scoring service. "
+                     "Evaluate one role at a time.")
+            return
+
         progress_bar = st.progress(0)
         status_text = st.empty()
+
+        if SERVICE_URL:
+            _evaluate_remote(jd_text, input_skill_list, uploaded_files, progress_bar, status_text)
+            _render_reweighting_if_scored()
+            return
+
+        engine = get_engine()
+        if len(roles) > 1:
+            st.session_state.pop("scored", None)
+            _evaluate_roles(engine, roles, input_skill_list, uploaded_files, progress_bar, status_text)
+            return
         
         # Parse JD
         status_text.text("Parsing Job Description...")
         try:
-            parsed_jd = jd_parser.parse_jd(jd_text)
-            input_skill_list = [s.strip() for s in manual_skills.split(",") if s.strip()]
-            
-            # VALIDATION: Filter JD skills through taxonomy
-            jd_skills_validated = skill_taxonomy.validate_skills(parsed_jd["required_skills"])
-            parsed_jd["required_skills"] = list(set(jd_skills_validated + input_skill_list))
-            
-            # Encode JD for similarity
-            jd_embedding = skill_matcher.model.encode(jd_text)
-            
+            jd = engine.prepare_jd(jd_text, input_skill_list)
         except Exception as e:
             st.error(f"Error parsing JD: {e}")
             return
 
         total_files = len(uploaded_files)
-        successful_count = 0
+        large_batch = total_files > MAX_INTERACTIVE_FILES
+        if large_batch:
+            st.info(
+                f"Large batch: showing the top {TOP_K_DISPLAY} of {total_files} candidates. "
+                "Full results for every resume are available for download below."
+            )
+
+        def on_progress(done, name):
+            status_text.text(f"Processing {name} ({done}/{total_files})...")
+            progress_bar.progress(done / total_files)
+
+        # Streaming: rank candidates as each small batch is scored, explain afterwards
+        ranking_area = st.empty()
+        batch_metrics = instrumentation.BatchMetrics()
+        results = []
+        scored = []
+        truncated = []
         failed_count = 0
-        
-        for idx, file in enumerate(uploaded_files):
-            status_text.text(f"Processing {file.name} ({idx+1}/{total_files})...")
-            
-            try:
-                # A. Parse Resume Text
-                resume_text = resume_parser.extract_resume_text(file)
-                
-                # B. Extract Data from Resume (Reusing JD logic for consistency)
-                resume_skills_raw = jd_parser.extract_skills(resume_text)
-                # VALIDATION: Filter skills through taxonomy
-                resume_skills = skill_taxonomy.validate_skills(resume_skills_raw)
-                resume_exp = jd_parser.extract_experience(resume_text)
-                
-                # C. Compute Semantic Similarity (Whole Text)
-                resume_embedding = skill_matcher.model.encode(resume_text)
-                jd_similarity = cosine_similarity([jd_embedding], [resume_embedding])[0][0]
-                
-                # Project Score (New)
-                proj_score = scorer.calculate_project_score(resume_text)
-                
-                parsed_resume = {
-                    "text": resume_text,
-                    "skills": resume_skills,
-                    "experience_years": resume_exp,
-                    "jd_similarity": jd_similarity,
-                    "project_score": proj_score
-                }
-                
-                # D. Match Skills
-                match_result = skill_matcher.match_skills(parsed_resume["skills"], parsed_jd["required_skills"])
-                
-                # E. Score
-                score_data = scorer.score_resume(parsed_resume, parsed_jd, match_result)
-                
-                # AUDIT LOGGING: Log scoring decision
-                logger.log_scoring_decision(
-                    resume_name=file.name,
-                    score_data=score_data,
-                    jd_text=jd_text,
-                    resume_text=resume_text,
-                    parsed_jd=parsed_jd
-                )
-                
-                # F. Explain (Gemini)
-                explanation = gemini_explainer.generate_explanation(score_data)
-                
-                results.append({
-                    "Name": file.name,
-                    "Score": score_data["final_score"],
-                    "Match Ratio": score_data["skill_match"],
-                    "Experience": score_data["experience_match"],
-                    "Explanation": explanation,
-                    "Details": score_data,
-                    "Text Preview": resume_text[:500] + "..." # Preview
-                })
-                
-                successful_count += 1
-                
-            except Exception as e:
-                st.warning(f"Failed to process {file.name}: {e}")
-                logger.log_error(file.name, str(e))
+        last_redraw = 0.0
+        ranker = None
+        if large_batch:
+            spill = tempfile.NamedTemporaryFile(prefix="shortlist_", suffix=".jsonl", delete=False)
+            spill.close()
+            # Remembered so the next run removes it even if this one is interrupted
+            st.session_state["spill_path"] = spill.name
+            ranker = StreamingRanker(TOP_K_DISPLAY, spill.name)
+        for result in engine.iter_results(
+            jd, uploaded_files, on_progress,
+            batch_size=STREAM_BATCH_SIZE if stream_results and not large_batch else None,
+            explain=not stream_results and not large_batch,
+            batch_metrics=batch_metrics
+        ):
+            if ranker is not None:
+                # Bounded memory: keep the top K, spill everything to disk
+                ranker.add(result)
+                failed_count += bool(result["error"])
+                continue
+
+            if result["error"]:
+                st.warning(f"Failed to process {result['name']}: {result['error']}")
                 failed_count += 1
-            
-            progress_bar.progress((idx + 1) / total_files)
+                continue
+
+            results.append(_to_row(result))
+            scored.append(result)
+            if result["truncated"]:
+                truncated.append(result["name"])
+            # Redrawing rebuilds the whole table, so do it at most every STREAM_REDRAW_SECONDS
+            if stream_results and time.perf_counter() - last_redraw >= STREAM_REDRAW_SECONDS:
+                _render_ranking(ranking_area, results)
+                last_redraw = time.perf_counter()
 
-        # Log batch summary
-        logger.log_batch_summary(total_files, successful_count, failed_count)
+        if ranker is not None:
+            ranker.close()
+            scored = ranker.ranked()
+            results = [_to_row(result) for result in scored]
+            truncated = ranker.truncated
 
         status_text.text("Analysis Complete!")
+        _warn_truncated(truncated)
+        cache_stats = skill_matcher.cache.stats()
+        st.caption(
+            f"Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']}% hit rate)"
+        )
+        if skill_matcher.ENCODE_BROKER:
+            broker_stats = skill_matcher.load_broker().stats()
+            st.caption(
+                f"Encode broker: {broker_stats['requests']} requests in {broker_stats['batches']} batches "
+                f"(mean {broker_stats['mean_batch_size']} texts, p95 wait {broker_stats['p95_queue_ms']} ms)"
+            )
+        if engine.result_cache is not None:
+            result_stats = engine.result_cache.stats()
+            st.caption(
+                f"Result cache: {result_stats['hits']} hits, {result_stats['misses']} misses "
+                f"({result_stats['hit_rate']}% hit rate)"
+            )
+        load_times = ", ".join(
+            f"{name} {info['seconds']}s" for name, info in REGISTRY.timings().items() if info["loaded"]
+        )
+        if load_times:
+            st.caption(f"Model load times: {load_times}")
         
+        # Component features of every candidate kept for instant re-weighting on later reruns
+        min_experience = jd["parsed"].get("min_experience", 0)
+        if ranker is not None:
+            st.session_state["scored"] = _scored_state(*ranker.feature_table(), min_experience)
+        else:
+            st.session_state["scored"] = _scored_state(
+                [result["name"] for result in scored],
+                [result["score_data"]["final_score"] for result in scored],
+                feature_matrix(scored),
+                min_experience
+            )
+
         # 4. Display Results
         if results:
-            st.markdown("### 🏆 Ranked Candidates")
-            
-            df = pd.DataFrame(results).sort_values(by="Score", ascending=False)
-            
-            # Highlight top candidate
-            st.metric("Top Candidate", df.iloc[0]["Name"], f"{df.iloc[0]['Score']} / 100")
-            
-            # Bar Chart of Scores
-            st.bar_chart(df.set_index("Name")["Score"])
-            
-            # Display Summary Table
-            st.dataframe(
-                df[["Name", "Score", "Match Ratio", "Experience"]],
-                use_container_width=True,
-                hide_index=True
-            )
-            
-            # Detailed Explanations
-            st.markdown("### 📝 Detailed Insights")
-            for _, row in df.iterrows():
-                with st.expander(f"**{row['Name']}** - Score: {row['Score']}"):
-                    st.markdown(f"**Why shortlisted:**")
-                    st.write(row["Explanation"])
-                    
-                    st.markdown("---")
-                    
-                    # Columns for details
-                    c1, c2, c3 = st.columns(3)
-                    with c1:
-                        st.markdown("**✅ Matched Skills**")
-                        st.caption(", ".join(row["Details"]["matched_skills"]))
-                    with c2:
-                        st.markdown("**⚠️ Missing Skills**")
-                        st.caption(", ".join(row["Details"]["missing_skills"]))
-                    with c3:
-                        st.markdown("**📄 Quick Preview**")
-                        st.text(row["Text Preview"])
+            _render_ranking(ranking_area, results)
+            slots = _render_insights(results)
+
+            # Fill explanations in as they arrive
+            if stream_results or large_batch:
+                pending = [row for row in results if row["Explanation"] is None]
+                with instrumentation.stage_timer("explain", [row["Timings"] for row in pending], batch_metrics):
+                    explanations = engine.explainer.iter_explanations([row["Details"] for row in pending])
+                    for i, explanation in explanations:
+                        pending[i]["Explanation"] = explanation
+                        slots[id(pending[i])].write(explanation)
 
         else:
             st.info("No resumes processed successfully.")
 
+        if ranker is not None:
+            with open(ranker.spill_path, "rb") as f:
+                st.download_button(
+                    "Download all results (JSONL)", f, file_name="shortlist_results.jsonl",
+                    mime="application/json"
+                )
+            # The button holds its own copy of the data
+            _remove_spill()
+            if failed_count:
+                st.warning(f"{failed_count} resumes failed; see the downloaded results for details.")
+
+        # Log batch summary (with per-stage timing) and refresh the metrics file
+        successful = ranker.successful if ranker is not None else len(results)
+        logger.log_batch_summary(total_files, successful, failed_count, batch_metrics.summary())
+        instrumentation.export_prometheus()
+
+    _render_reweighting_if_scored()
+
+
+def _remove_spill() -> None:
+    """Delete the large-batch spill file of this session, if any."""
+    path = st.session_state.pop("spill_path", None)
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def _scored_state(names: list, scores, features, min_experience: float) -> dict:
+    """What re-weighting needs from a batch: one name, original score and feature row per candidate."""
+    return {"names": names, "scores": list(scores), "features": features, "min_experience": min_experience}
+
+
+def _render_reweighting_if_scored() -> None:
+    if st.session_state.get("scored", {}).get("names"):
+        _render_reweighting(st.session_state["scored"])
+
+
+def _evaluate_remote(jd_text: str, skills: list, uploaded_files, progress_bar, status_text) -> None:
+    """Score on the shared scoring service; nothing is loaded in this process."""
+    client = ServiceClient(SERVICE_URL)
+    large_batch = len(uploaded_files) > MAX_INTERACTIVE_FILES
+
+    status_text.text("Submitting to the scoring service...")
+    try:
+        job = client.submit(jd_text, skills, uploaded_files, explain=not large_batch)
+    except ServiceBusyError as e:
+        st.warning(f"⏳ The scoring service is busy. Please try again in {e.retry_after}s.")
+        return
+    except (OSError, RuntimeError) as e:
+        st.error(f"Scoring service unavailable: {e}")
+        return
+
+    def on_status(status):
+        if status.get("state") == "queued":
+            status_text.text("Waiting for a free scoring worker...")
+        elif status.get("total"):
+            status_text.text(f"Scoring on the shared service ({status['done']}/{status['total']})...")
+            progress_bar.progress(status["done"] / status["total"])
+
+    batch = client.wait(job["job_id"], on_status=on_status)
+    if batch.get("state") != "done":
+        st.error(f"Scoring job {batch.get('state', 'failed')}: {batch.get('error')}")
+        return
+    status_text.text("Analysis Complete!")
+
+    for error in batch["errors"]:
+        st.warning(f"Failed to process {error['name']}: {error['error']}")
+    _warn_truncated([result["name"] for result in batch["results"] if result.get("truncated")])
+    # Already ranked by the service; per-stage timings stay in its audit log
+    scored = [{**result, "timings": {}} for result in batch["results"]]
+    if not scored:
+        st.info("No resumes processed successfully.")
+        st.session_state.pop("scored", None)
+        return
+
+    st.session_state["scored"] = _scored_state(
+        [result["name"] for result in scored],
+        [result["score_data"]["final_score"] for result in scored],
+        feature_matrix(scored),
+        batch["min_experience"]
+    )
+    if large_batch:
+        st.info(f"Large batch: showing the top {TOP_K_DISPLAY} of {len(scored)} candidates.")
+    rows = [_to_row(result) for result in scored[:TOP_K_DISPLAY if large_batch else None]]
+    _render_ranking(st.empty(), rows)
+    _render_insights(rows)
+
+
+def _render_reweighting(scored: dict) -> None:
+    """Re-rank the last batch under new weights from its stored features (no re-parsing)."""
+    st.markdown("### ⚖️ Adjust Weights")
+    st.caption("Re-ranks every candidate of the last batch instantly from stored component scores.")
+    cols = st.columns(len(scorer.DEFAULT_WEIGHTS) + 1)
+    weights = {
+        name: col.slider(name.title(), 0.0, 1.0, default, 0.05, key=f"weight_{name}")
+        for col, (name, default) in zip(cols, scorer.DEFAULT_WEIGHTS.items())
+    }
+    min_experience = cols[-1].number_input(
+        "Min. experience (years)", 0, 30, int(scored["min_experience"]), key="weight_min_experience"
+    )
+    if not any(weights.values()):
+        st.warning("Set at least one weight above zero.")
+        return
+
+    ranked = pd.DataFrame({
+        "Name": scored["names"],
+        "Score": scorer.rerank(scored["features"], min_experience, weights),
+        "Original Score": scored["scores"]
+    }).sort_values(by="Score", ascending=False, kind="stable")
+    st.dataframe(ranked, use_container_width=True, hide_index=True)
+
+
+def _parse_roles(jd_text: str, extra_roles: str) -> dict:
+    """
+    {title: JD text} for the main JD plus any "---"-separated extra roles.
+    Repeated titles are numbered ("Data Engineer (2)") rather than replacing
+    an earlier role.
+    """
+    roles = {"Main role": jd_text}
+    for block in re.split(r"^\s*---\s*$", extra_roles or "", flags=re.MULTILINE):
+        title, _, text = block.strip().partition("\n")
+        if title.strip() and text.strip():
+            roles[unique_title(title.strip(), roles)] = text.strip()
+    return roles
+
+
+def _evaluate_roles(engine, roles: dict, skills: list, uploaded_files, progress_bar, status_text) -> None:
+    """Multi-role mode: parse every resume once, rank it for each role."""
+    total_files = len(uploaded_files)
+
+    def on_progress(done, name):
+        status_text.text(f"Processing {name} ({done}/{total_files})...")
+        progress_bar.progress(done / total_files)
+
+    status_text.text(f"Parsing {len(roles)} job descriptions...")
+    try:
+        batch = engine.evaluate_multi(roles, skills, uploaded_files, on_progress)
+    except Exception as e:
+        st.error(f"Error evaluating roles: {e}")
+        return
+    status_text.text("Analysis Complete!")
+
+    for error in batch["errors"]:
+        st.warning(f"Failed to process {error['name']}: {error['error']}")
+    _warn_truncated(batch["truncated"])
+    if not batch["best_roles"]:
+        st.info("No resumes processed successfully.")
+        return
+
+    st.markdown("### 🎯 Best Role per Candidate")
+    best = pd.DataFrame([
+        {"Name": row["name"], "Best Role": row["role"], "Score": row["final_score"], **row["scores"]}
+        for row in batch["best_roles"]
+    ])
+    st.dataframe(best, use_container_width=True, hide_index=True)
+
+    for tab, (title, results) in zip(st.tabs(list(batch["roles"])), batch["roles"].items()):
+        with tab:
+            _render_ranking(st.empty(), [_to_row(result) for result in results])
+
+
+def _warn_truncated(names: list) -> None:
+    """Flag resumes that hit the PDF page limit, so their scores may miss later pages."""
+    if names:
+        shown = ", ".join(names[:10]) + (f" and {len(names) - 10} more" if len(names) > 10 else "")
+        st.warning(f"✂️ Only the first pages of {len(names)} long resume(s) were read: {shown}")
+
+
+def _to_row(result: dict) -> dict:
+    score_data = result["score_data"]
+    return {
+        "Name": result["name"],
+        "Score": score_data["final_score"],
+        "Match Ratio": score_data["skill_match"],
+        "Experience": score_data["experience_match"],
+        "Explanation": result["explanation"],
+        "Details": score_data,
+        "Text Preview": result["preview"],
+        "Timings": result["timings"]
+    }
+
+
+def _render_ranking(area, results: list) -> None:
+    """Redraw the top-candidate metric, score chart and summary table in place."""
+    df = pd.DataFrame(results).sort_values(by="Score", ascending=False)
+
+    with area.container():
+        st.markdown("### 🏆 Ranked Candidates")
+        
+        # Highlight top candidate
+        st.metric("Top Candidate", df.iloc[0]["Name"], f"{df.iloc[0]['Score']} / 100")
+        
+        # Bar Chart of Scores
+        st.bar_chart(df.set_index("Name")["Score"])
+        
+        # Display Summary Table
+        st.dataframe(
+            df[["Name", "Score", "Match Ratio", "Experience"]],
+            use_container_width=True,
+            hide_index=True
+        )
+
+
+def _render_insights(results: list) -> dict:
+    """
+    Draw one expander per candidate, best first.
+    Returns explanation placeholders keyed by id(row) for later filling.
+    """
+    slots = {}
+    
+    # Detailed Explanations
+    st.markdown("### 📝 Detailed Insights")
+    for row in sorted(results, key=lambda r: r["Score"], reverse=True):
+        with st.expander(f"**{row['Name']}** - Score: {row['Score']}"):
+            st.markdown(f"**Why shortlisted:**")
+            slots[id(row)] = st.empty()
+            if row["Explanation"] is None:
+                slots[id(row)].caption("Generating explanation...")
+            else:
+                slots[id(row)].write(row["Explanation"])
+            
+            st.markdown("---")
+            
+            # Columns for details
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                st.markdown("**✅ Matched Skills**")
+                st.caption(", ".join(row["Details"]["matched_skills"]))
+            with c2:
+                st.markdown("**⚠️ Missing Skills**")
+                st.caption(", ".join(row["Details"]["missing_skills"]))
+            with c3:
+                st.markdown("**📄 Quick Preview**")
+                st.text(row["Text Preview"])
+
+    return slots
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,151 @@
+"""
+Synthetic corpus generator for benchmarks.
+
+Builds reproducible resumes (PDF and DOCX) and job descriptions from
+utils.skill_taxonomy.TECH_SKILLS. The same seed always yields the same files.
+
+Usage:
+    python -m benchmarks.corpus --out bench_corpus --resumes 100 --jds 3
+"""
+
+import argparse
+import os
+import random
+
+import fitz  # PyMuPDF
+from docx import Document
+
+from parsing.feature_extractor import ACTION_VERBS
+from utils.skill_taxonomy import TECH_SKILLS
+
+FILLER = (
+    "responsible for the delivery of features across the team and worked closely "
+    "with stakeholders to improve the quality of the product"
+).split()
+
+
+def make_text(rng: random.Random, words: int, skill_rate: float = 0.2) -> str:
+    """A resume-like paragraph: filler words with skills mixed in."""
+    skills = sorted(TECH_SKILLS)
+    return " ".join(
+        rng.choice(skills) if rng.random() < skill_rate else rng.choice(FILLER)
+        for _ in range(words)
+    ) + "."
+
+
+def make_corpus(n_docs: int, words_per_doc: int, seed: int = 42) -> list:
+    """Plain-text documents, for stages that don't need files."""
+    rng = random.Random(seed)
+    return [make_text(rng, words_per_doc) for _ in range(n_docs)]
+
+
+def make_resume(rng: random.Random, words: int) -> str:
+    start = rng.randint(2005, 2020)
+    lines = [
+        f"Candidate {rng.randint(1000, 9999)}",
+        "Experience",
+    ]
+    year = start
+    while year < 2024:
+        end = min(year + rng.randint(1, 4), 2024)
+        verbs = rng.sample(ACTION_VERBS, 2)
+        lines.append(f"{year} - {end}: {verbs[0]} and {verbs[1]} {make_text(rng, words // 8)}")
+        year = end
+    if rng.random() < 0.3:
+        lines.append(f"{year} - present: {rng.choice(ACTION_VERBS)} {make_text(rng, words // 8)}")
+    lines.append("Skills")
+    lines.append(", ".join(rng.sample(sorted(TECH_SKILLS), 12)))
+    lines.append("Summary")
+    lines.append(make_text(rng, words // 2))
+    return "\n".join(lines)
+
+
+def make_jd(rng: random.Random, words: int) -> str:
+    return (
+        f"We are hiring an engineer with {rng.randint(1, 8)}+ years of experience. "
+        f"Required: {', '.join(rng.sample(sorted(TECH_SKILLS), 8))}. "
+        + make_text(rng, words, skill_rate=0.3)
+    )
+
+
+def _write_pdf(path: str, text: str) -> None:
+    doc = fitz.open()
+    lines = text.split("\n")
+    # Wrap long lines so text stays on the page
+    wrapped = []
+    for line in lines:
+        words = line.split()
+        while words:
+            wrapped.append(" ".join(words[:14]))
+            words = words[14:]
+    for start in range(0, len(wrapped), 50):
+        page = doc.new_page()
+        page.insert_text((50, 50), "\n".join(wrapped[start:start + 50]), fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def _write_docx(path: str, text: str) -> None:
+    doc = Document()
+    for line in text.split("\n"):
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def generate_corpus(
+    out_dir: str,
+    n_resumes: int = 100,
+    n_jds: int = 3,
+    words: int = 400,
+    pdf_ratio: float = 0.5,
+    seed: int = 42
+) -> dict:
+    """
+    Write resumes to out_dir/resumes and JDs to out_dir/jds.
+
+    Returns:
+        {"resumes": [paths], "jds": [paths]}
+    """
+    rng = random.Random(seed)
+    resume_dir = os.path.join(out_dir, "resumes")
+    jd_dir = os.path.join(out_dir, "jds")
+    os.makedirs(resume_dir, exist_ok=True)
+    os.makedirs(jd_dir, exist_ok=True)
+
+    resumes = []
+    for i in range(n_resumes):
+        text = make_resume(rng, words)
+        if rng.random() < pdf_ratio:
+            path = os.path.join(resume_dir, f"resume_{i:05d}.pdf")
+            _write_pdf(path, text)
+        else:
+            path = os.path.join(resume_dir, f"resume_{i:05d}.docx")
+            _write_docx(path, text)
+        resumes.append(path)
+
+    jds = []
+    for i in range(n_jds):
+        path = os.path.join(jd_dir, f"jd_{i:03d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_jd(rng, words // 2))
+        jds.append(path)
+
+    return {"resumes": resumes, "jds": jds}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume/JD corpus.")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--jds", type=int, default=3)
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--pdf-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.out, args.resumes, args.jds, args.words, args.pdf_ratio, args.seed)
+    print(f"Wrote {len(corpus['resumes'])} resumes and {len(corpus['jds'])} JDs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
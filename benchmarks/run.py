@@ -0,0 +1,180 @@
+"""
+Per-stage pipeline benchmark.
+
+Generates a synthetic corpus, times every pipeline stage
+separately and reports throughput and p50/p95 latency. Results are saved
+as JSON and can be compared against an earlier run.
+
+Runs fully offline: Gemini is disabled (fallback explanations), the
+sentence-transformer must already be in the local model cache, and the
+audit log and embedding cache are written inside the work directory so
+production files are never touched.
+
+Usage:
+    python -m benchmarks.run --resumes 100 --output bench.json
+    python -m benchmarks.run --resumes 100 --output new.json --baseline bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from utils.instrumentation import _percentile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = [
+    "extract", "spacy", "taxonomy", "embed", "match",
+    "features", "score", "log", "explain"
+]
+
+
+def summarize(samples: list) -> dict:
+    """Throughput and latency summary for a list of per-item durations (seconds)."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        "count": len(ordered),
+        "total_s": round(total, 4),
+        "throughput_per_s": round(len(ordered) / total, 2) if total > 0 else 0,
+        "mean_ms": round(total / len(ordered) * 1000, 3) if ordered else 0,
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 3)
+    }
+
+
+def _timed(samples: dict, stage: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    samples[stage].append(time.perf_counter() - start)
+    return result
+
+
+def run_benchmark(corpus: dict) -> dict:
+    """Time each stage over every resume in the corpus against its first JD."""
+    from parsing import resume_parser, jd_parser
+    from parsing.feature_extractor import extract_features
+    from matching import skill_matcher, scorer
+    from matching.document_encoder import DocumentEncoder
+    from explanation import gemini_explainer
+    from pipeline.engine import DocumentFile
+    from utils import logger, skill_taxonomy
+
+    with open(corpus["jds"][0], encoding="utf-8") as f:
+        jd_text = f.read()
+    parsed_jd = jd_parser.parse_jd(jd_text)
+    parsed_jd["required_skills"] = skill_taxonomy.validate_skills(parsed_jd["required_skills"])
+    jd_embedding = skill_matcher.encode(jd_text)
+    encoder = DocumentEncoder()
+
+    samples = {stage: [] for stage in STAGES}
+    wall_start = time.perf_counter()
+
+    for path in corpus["resumes"]:
+        name = os.path.basename(path)
+        text = _timed(samples, "extract", resume_parser.extract_resume_text, DocumentFile(path))
+        skills_raw = _timed(samples, "spacy", jd_parser.extract_skills, text)
+        skills = _timed(samples, "taxonomy", skill_taxonomy.validate_skills, skills_raw)
+        jd_similarity = _timed(samples, "embed", encoder.similarities, jd_embedding, [text])[0]
+        match = _timed(samples, "match", skill_matcher.match_skills, skills, parsed_jd["required_skills"])
+
+        features = _timed(samples, "features", extract_features, text)
+        parsed_resume = {
+            "text": text,
+            "skills": skills,
+            "experience_years": jd_parser.extract_experience(text, features),
+            "jd_similarity": jd_similarity,
+            "project_score": scorer.calculate_project_score(text, features)
+        }
+
+        score_data = _timed(samples, "score", scorer.score_resume, parsed_resume, parsed_jd, match)
+        _timed(samples, "log", logger.log_scoring_decision, name, score_data, jd_text, text, parsed_jd)
+        _timed(samples, "explain", gemini_explainer.generate_explanation, score_data)
+
+    wall = time.perf_counter() - wall_start
+    return {
+        "stages": {stage: summarize(samples[stage]) for stage in STAGES},
+        "total_s": round(wall, 4),
+        "resumes_per_s": round(len(corpus["resumes"]) / wall, 2) if wall > 0 else 0
+    }
+
+
+def compare(current: dict, baseline: dict) -> str:
+    """Side-by-side p50/p95 latency and mean-time speedup against a baseline result."""
+    lines = [f"{'stage':<10} {'p50 ms':>10} {'base':>10} {'p95 ms':>10} {'base':>10} {'speedup':>8}"]
+    for stage in STAGES:
+        cur = current["stages"].get(stage)
+        base = baseline.get("stages", {}).get(stage)
+        if not cur or not base:
+            continue
+        speedup = base["mean_ms"] / cur["mean_ms"] if cur["mean_ms"] else 0
+        lines.append(
+            f"{stage:<10} {cur['p50_ms']:>10.2f} {base['p50_ms']:>10.2f} "
+            f"{cur['p95_ms']:>10.2f} {base['p95_ms']:>10.2f} {speedup:>7.2f}x"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Per-stage pipeline benchmark (offline).")
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--jds", type=int, default=1)
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--pdf-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", help="Corpus/work directory (default: a temp dir)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    # Offline: fallback explanations, no model downloads
+    os.environ["GEMINI_API_KEY"] = ""
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+    # Keep logs/ and cache/ out of the real working directory
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="resume_bench_"))
+    os.makedirs(workdir, exist_ok=True)
+    sys.path.insert(0, PROJECT_ROOT)
+    os.chdir(workdir)
+
+    from benchmarks.corpus import generate_corpus
+
+    corpus = generate_corpus(
+        os.path.join(workdir, "corpus"), args.resumes, args.jds,
+        args.words, args.pdf_ratio, args.seed
+    )
+    results = run_benchmark(corpus)
+    results["meta"] = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "resumes": args.resumes,
+        "words": args.words,
+        "pdf_ratio": args.pdf_ratio,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "platform": platform.platform()
+    }
+
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'stage':<10} {'items/s':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for stage, summary in results["stages"].items():
+        print(f"{stage:<10} {summary['throughput_per_s']:>10.1f} {summary['p50_ms']:>10.2f} {summary['p95_ms']:>10.2f}")
+    print(f"total: {results['total_s']}s ({results['resumes_per_s']} resumes/s) -> {output}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            print("\n" + compare(results, json.load(f)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark: per-document full spaCy pipeline vs batched, trimmed extraction.
+
+Usage:
+    python -m benchmarks.spacy_extraction --docs 200 --n-process 1
+"""
+
+import argparse
+import time
+
+from benchmarks.corpus import make_corpus
+from parsing import jd_parser
+
+
+def _baseline_extract(text: str) -> list:
+    """The original extract_skills: full pipeline, one document at a time."""
+    doc = jd_parser.nlp(text.lower())
+    skills = set()
+    for chunk in doc.noun_chunks:
+        if len(chunk.text.split()) <= 4:
+            skills.add(chunk.text.strip())
+    return list(skills)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--words", type=int, default=600)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    corpus = make_corpus(args.docs, args.words)
+
+    start = time.perf_counter()
+    before = [_baseline_extract(text) for text in corpus]
+    before_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    after = jd_parser.extract_skills_batch(
+        corpus, batch_size=args.batch_size, n_process=args.n_process
+    )
+    after_secs = time.perf_counter() - start
+
+    same = sum(set(a) == set(b) for a, b in zip(before, after))
+    print(f"before: {args.docs / before_secs:8.1f} docs/sec  (per-doc, full pipeline)")
+    print(f"after:  {args.docs / after_secs:8.1f} docs/sec  (nlp.pipe, ner/lemmatizer disabled)")
+    print(f"speedup: {before_secs / after_secs:.2f}x, identical skill sets: {same}/{args.docs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Startup benchmark: import time plus time to the first scored resume.
+
+Each scenario runs in a fresh interpreter so nothing is already imported
+or loaded:
+    cold     import, then score one resume (models load on first use)
+    warm-up  import, start REGISTRY.warm_up() in the background, simulate
+             the UI rendering for --render-ms, then score one resume
+
+Runs offline with fallback explanations; models must already be installed.
+
+Usage:
+    python -m benchmarks.startup --render-ms 1500 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in the child interpreter; prints one JSON line
+_PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+from pipeline.engine import ShortlistEngine
+from utils.model_registry import REGISTRY
+import_s = time.perf_counter() - start
+
+warm_up, render_s = sys.argv[1] == "1", float(sys.argv[2])
+if warm_up:
+    REGISTRY.warm_up()
+    time.sleep(render_s)
+
+from benchmarks.corpus import make_corpus
+jd_text, resume_text = make_corpus(2, 400)
+
+start = time.perf_counter()
+engine = ShortlistEngine(explain=False, cache_results=False)
+jd = engine.prepare_jd(jd_text, ["python", "sql"])
+result = engine._score_batch([("resume", resume_text, {}, None, None)], jd, False)[0]
+first_request_s = time.perf_counter() - start
+
+print(json.dumps({
+    "import_s": round(import_s, 4),
+    "first_request_s": round(first_request_s, 4),
+    "ok": not result["error"],
+    "models": REGISTRY.timings()
+}))
+"""
+
+
+def run_scenario(warm_up: bool, render_ms: int, workdir: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    env["GEMINI_API_KEY"] = ""
+    env.setdefault("HF_HUB_OFFLINE", "1")
+    env.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE, "1" if warm_up else "0", str(render_ms / 1000)],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Import and first-request latency (fresh interpreters).")
+    parser.add_argument("--render-ms", type=int, default=1500, help="Simulated UI render time before the first request")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario (best is reported)")
+    parser.add_argument("--workdir", help="Where logs/ and cache/ are written (default: a temp dir)")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="resume_startup_"))
+    os.makedirs(workdir, exist_ok=True)
+
+    results = {}
+    for name, warm_up in (("cold", False), ("warm-up", True)):
+        runs = [run_scenario(warm_up, args.render_ms, workdir) for _ in range(args.repeat)]
+        results[name] = min(runs, key=lambda run: run["import_s"] + run["first_request_s"])
+
+    print(f"{'scenario':<10} {'import s':>10} {'first req s':>12}")
+    for name, run in results.items():
+        print(f"{name:<10} {run['import_s']:>10.3f} {run['first_request_s']:>12.3f}")
+    for model, info in results["cold"]["models"].items():
+        print(f"  {model}: {info['seconds']}s" + (f" ({info['error']})" if info["error"] else ""))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"render_ms": args.render_ms, **results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Peak-memory benchmark: streaming (top-K + spill) vs in-memory ranking.
+
+Generates a synthetic corpus (1,000 resumes by default) and ranks it in a
+fresh interpreter per mode, reporting wall time and peak RSS of the
+ranking process and of its largest extraction worker.
+
+Runs offline with fallback explanations; models must already be installed.
+
+Usage:
+    python -m benchmarks.streaming --resumes 1000 --output streaming.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in the child interpreter; prints one JSON line
+_PROBE = r"""
+import json, sys, time
+from pipeline.engine import ShortlistEngine, iter_directory
+from pipeline.streaming import peak_rss_mb
+
+mode, resume_dir, jd_path, top_k = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+with open(jd_path, encoding="utf-8") as f:
+    jd_text = f.read()
+
+engine = ShortlistEngine(explain=False, cache_results=False)
+start = time.perf_counter()
+if mode == "streaming":
+    batch = engine.evaluate_streaming(jd_text, ["python", "sql"], iter_directory(resume_dir), top_k, "all.jsonl")
+else:
+    batch = engine.evaluate(jd_text, ["python", "sql"], iter_directory(resume_dir))
+print(json.dumps({
+    "seconds": round(time.perf_counter() - start, 2),
+    "successful": batch["successful"],
+    "peak_rss_mb": peak_rss_mb()
+}))
+"""
+
+
+def run_mode(mode: str, corpus: dict, top_k: int, workdir: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    env["GEMINI_API_KEY"] = ""
+    env.setdefault("HF_HUB_OFFLINE", "1")
+    env.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+    resume_dir = os.path.dirname(corpus["resumes"][0])
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE, mode, resume_dir, corpus["jds"][0], str(top_k)],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        # Show why the probe failed (e.g. a model missing from the local cache)
+        raise SystemExit(f"{mode} run failed:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _mb(value) -> str:
+    return "n/a" if value is None else f"{value:.1f}"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Peak RSS of streaming vs in-memory ranking.")
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--modes", default="streaming,in-memory")
+    parser.add_argument("--workdir", help="Corpus/work directory (default: a temp dir)")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="resume_streaming_"))
+    os.makedirs(workdir, exist_ok=True)
+
+    sys.path.insert(0, PROJECT_ROOT)
+    from benchmarks.corpus import generate_corpus
+    corpus = generate_corpus(os.path.join(workdir, "corpus"), args.resumes, 1, args.words)
+
+    results = {}
+    for mode in args.modes.split(","):
+        results[mode] = run_mode(mode, corpus, args.top_k, workdir)
+        rss = results[mode]["peak_rss_mb"]
+        print(
+            f"{mode:<10} {results[mode]['seconds']:>8.1f}s  scored {results[mode]['successful']:>5}  "
+            f"peak RSS {_mb(rss['self']):>8} MB  (largest worker {_mb(rss['workers'])} MB)"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"resumes": args.resumes, "top_k": args.top_k, **results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
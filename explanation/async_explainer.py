@@ -0,0 +1,282 @@
+"""
+Async Explanation Service - Concurrent, Cached Gemini Calls
+Explains a whole batch of candidates with bounded concurrency, retries
+with backoff, optional multi-candidate prompts and a response cache.
+Falls back to structured explanations whenever Gemini is unavailable.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import random
+import re
+import threading
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from explanation import gemini_explainer
+from explanation.gemini_explainer import _build_prompt, _generate_fallback_explanation
+from utils.logger import _convert_to_serializable
+
+DEFAULT_ENDPOINT = "https://generativelanguage.googleapis.com/v1beta"
+
+# HTTP statuses worth retrying; anything else fails straight to the fallback
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class GeminiRequestError(Exception):
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _cache_key(score_data: dict) -> str:
+    """Stable hash of a score_data dict (numpy values normalized)."""
+    payload = json.dumps(_convert_to_serializable(score_data), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _build_packed_prompt(score_datas: list) -> str:
+    sections = "\n\n".join(
+        f"### Candidate {i}\n{score_data}" for i, score_data in enumerate(score_datas, start=1)
+    )
+    return f"""
+You are an HR assistant.
+
+Explain why each candidate below was shortlisted using ONLY their own data.
+Do not assume or add information.
+Be concise and professional.
+
+Answer with one section per candidate, each starting with its exact
+"### Candidate N" heading, in the same order.
+
+{sections}
+"""
+
+
+def _split_packed_response(text: str, count: int):
+    """Split a packed answer into per-candidate explanations, or None if malformed."""
+    parts = re.split(r"^\s*#+\s*Candidate\s+(\d+)\s*:?\s*$", text, flags=re.MULTILINE)
+    found = {}
+    for number, body in zip(parts[1::2], parts[2::2]):
+        found[int(number)] = body.strip()
+
+    if sorted(found) != list(range(1, count + 1)) or not all(found.values()):
+        return None
+    return [found[i] for i in range(1, count + 1)]
+
+
+class ExplanationService:
+    """
+    Batch explainer for scored candidates.
+
+    Args:
+        api_key: Gemini API key (default: the key gemini_explainer resolved)
+        model_name: Gemini model to call
+        endpoint: API base URL (override with GEMINI_API_BASE, e.g. a local stub)
+        max_concurrency: Requests in flight at once
+        max_retries: Retries per request for rate limits, 5xx and network errors
+        backoff: Base delay in seconds, doubled on each retry (with jitter)
+        pack_size: Candidates per prompt (1 = one request per candidate)
+        timeout: Per-request timeout in seconds
+        cache_size: Cached explanations kept in memory
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        model_name: str = "gemini-1.5-flash",
+        endpoint: str = None,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        pack_size: int = 1,
+        timeout: float = 30.0,
+        cache_size: int = 1024
+    ):
+        self.api_key = api_key if api_key is not None else gemini_explainer.api_key
+        self.model_name = model_name
+        self.endpoint = (endpoint or os.getenv("GEMINI_API_BASE") or DEFAULT_ENDPOINT).rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pack_size = max(pack_size, 1)
+        self.timeout = timeout
+        self.cache_size = cache_size
+
+        # Shared by every thread that calls explain_all (e.g. service workers)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.api_calls = 0
+        self.cache_hits = 0
+
+    def _remember(self, key: str, explanation: str) -> None:
+        with self._cache_lock:
+            self._cache[key] = explanation
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _recall(self, key: str):
+        with self._cache_lock:
+            explanation = self._cache.get(key)
+            if explanation is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return explanation
+
+    def _post(self, prompt: str) -> str:
+        """Blocking generateContent call. Run in a worker thread."""
+        url = f"{self.endpoint}/models/{self.model_name}:generateContent"
+        body = json.dumps({"contents": [{"parts": [{"text": prompt}]}]}).encode()
+        # The key goes in a header so it never ends up in URL logs or error messages
+        request = urllib.request.Request(
+            url, data=body,
+            headers={"Content-Type": "application/json", "x-goog-api-key": self.api_key},
+            method="POST"
+        )
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise GeminiRequestError(f"HTTP {e.code}: {e.reason}", e.code in RETRYABLE_STATUSES)
+        except (urllib.error.URLError, TimeoutError, OSError) as e:
+            raise GeminiRequestError(str(e), retryable=True)
+        except ValueError as e:
+            raise GeminiRequestError(f"Invalid response: {e}", retryable=False)
+
+        try:
+            parts = payload["candidates"][0]["content"]["parts"]
+            return "".join(part.get("text", "") for part in parts)
+        except (KeyError, IndexError, TypeError):
+            raise GeminiRequestError("Response contained no text", retryable=False)
+
+    async def _generate(self, prompt: str, semaphore: asyncio.Semaphore) -> str:
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                self.api_calls += 1
+                try:
+                    return await asyncio.to_thread(self._post, prompt)
+                except GeminiRequestError as e:
+                    if not e.retryable or attempt == self.max_retries:
+                        raise
+            delay = self.backoff * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def _explain_one(self, score_data: dict, semaphore: asyncio.Semaphore) -> tuple:
+        """Returns (explanation, from_api)."""
+        try:
+            return await self._generate(_build_prompt(score_data), semaphore), True
+        except Exception as e:
+            # If Gemini fails for any reason, use fallback
+            print(f"Warning: Gemini API error: {e}. Using fallback explanation.")
+            return _generate_fallback_explanation(score_data), False
+
+    async def _explain_pack(self, score_datas: list, semaphore: asyncio.Semaphore) -> list:
+        if len(score_datas) == 1:
+            return [await self._explain_one(score_datas[0], semaphore)]
+
+        try:
+            answer = await self._generate(_build_packed_prompt(score_datas), semaphore)
+            explanations = _split_packed_response(answer, len(score_datas))
+        except Exception:
+            explanations = None
+
+        if explanations is None:
+            # Malformed or failed packed answer: explain each candidate on its own
+            return list(await asyncio.gather(
+                *(self._explain_one(score_data, semaphore) for score_data in score_datas)
+            ))
+        return [(explanation, True) for explanation in explanations]
+
+    async def explain_many(self, score_datas: list, semaphore: asyncio.Semaphore = None) -> list:
+        """
+        Explanations for every score_data, in input order.
+        Pass a shared semaphore to bound concurrency across several calls.
+        """
+        if not self.api_key:
+            return [_generate_fallback_explanation(score_data) for score_data in score_datas]
+
+        keys = [_cache_key(score_data) for score_data in score_datas]
+        results = {}
+        pending = OrderedDict()
+        for key, score_data in zip(keys, score_datas):
+            explanation = self._recall(key)
+            if explanation is not None:
+                results[key] = explanation
+            elif key not in pending:
+                pending[key] = score_data
+
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrency)
+        pending_keys = list(pending)
+        packs = [pending_keys[i:i + self.pack_size] for i in range(0, len(pending_keys), self.pack_size)]
+        answers = await asyncio.gather(
+            *(self._explain_pack([pending[key] for key in pack], semaphore) for pack in packs)
+        )
+
+        for pack, explanations in zip(packs, answers):
+            for key, (explanation, from_api) in zip(pack, explanations):
+                results[key] = explanation
+                # Fallbacks aren't cached so a transient outage doesn't stick
+                if from_api:
+                    self._remember(key, explanation)
+
+        return [results[key] for key in keys]
+
+    def explain_all(self, score_datas: list) -> list:
+        """Synchronous wrapper around explain_many()."""
+        if not score_datas:
+            return []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.explain_many(score_datas))
+
+        # Called from inside an event loop: run ours on a separate thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.explain_many(score_datas)).result()
+
+    def iter_explanations(self, score_datas: list):
+        """
+        Yield (index, explanation) pairs as explanations complete, so callers
+        can show each one without waiting for the slowest request.
+        """
+        done = queue.Queue()
+        step = self.pack_size
+
+        async def run():
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def explain_group(start):
+                explanations = await self.explain_many(score_datas[start:start + step], semaphore)
+                for offset, explanation in enumerate(explanations):
+                    done.put((start + offset, explanation))
+
+            await asyncio.gather(*(explain_group(start) for start in range(0, len(score_datas), step)))
+
+        def worker():
+            try:
+                asyncio.run(run())
+            finally:
+                done.put(None)
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        while True:
+            item = done.get()
+            if item is None:
+                break
+            yield item
+        thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "api_calls": self.api_calls,
+            "cache_hits": self.cache_hits,
+            "cached": len(self._cache)
+        }
@@ -1,27 +1,45 @@
 import os
-import google.generativeai as genai
-import streamlit as st
+import sys
 from dotenv import load_dotenv
 
+from utils.model_registry import REGISTRY
+
 load_dotenv()
 
 # Configure the API key
-# Priority: Streamlit Secrets > Environment Variable (.env)
-try:
-    api_key = st.secrets["GEMINI_API_KEY"]
-except (FileNotFoundError, KeyError):
+# Priority: Streamlit Secrets (only when running inside Streamlit) > Environment Variable (.env)
+api_key = None
+if "streamlit" in sys.modules:
+    try:
+        api_key = sys.modules["streamlit"].secrets["GEMINI_API_KEY"]
+    except (FileNotFoundError, KeyError):
+        pass
+if not api_key:
     api_key = os.getenv("GEMINI_API_KEY")
 
-try:
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY not found in secrets or environment.")
-    
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-1.5-flash")
-except Exception as e:
-    # Handle cases where secrets are missing
-    model = None
-    print(f"Warning: Gemini configuration failed. Details: {e}")
+
+def _load_gemini():
+    """Configured Gemini client, or None when no key is set or configuration fails."""
+    try:
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in secrets or environment.")
+
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel("gemini-1.5-flash")
+    except Exception as e:
+        # Handle cases where secrets are missing
+        print(f"Warning: Gemini configuration failed. Details: {e}")
+        return None
+
+REGISTRY.register("gemini", _load_gemini)
+
+
+def __getattr__(name):
+    # `gemini_explainer.model` is configured lazily on first access
+    if name == "model":
+        return REGISTRY.get("gemini")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def generate_explanation(match_data: dict) -> str:
@@ -30,22 +48,12 @@ def generate_explanation(match_data: dict) -> str:
     Uses Gemini 1.5 Flash with a strict prompt to avoid hallucination.
     Falls back to structured explanation if Gemini is unavailable.
     """
+    model = REGISTRY.get("gemini")
     if not model:
         # Fallback: Generate structured explanation without Gemini
         return _generate_fallback_explanation(match_data)
 
-    prompt = f"""
-You are an HR assistant.
-
-Explain why this candidate was shortlisted using ONLY the data below.
-Do not assume or add information.
-Be concise and professional.
-
-Candidate evaluation data:
-{match_data}
-
-Explanation:
-"""
+    prompt = _build_prompt(match_data)
     try:
         response = model.generate_content(prompt)
         return response.text
@@ -59,6 +67,21 @@ Explanation:
         return _generate_fallback_explanation(match_data)
 
 
+def _build_prompt(match_data: dict) -> str:
+    return f"""
+You are an HR assistant.
+
+Explain why this candidate was shortlisted using ONLY the data below.
+Do not assume or add information.
+Be concise and professional.
+
+Candidate evaluation data:
+{match_data}
+
+Explanation:
+"""
+
+
 def _generate_fallback_explanation(match_data: dict) -> str:
     """
     Generate structured explanation without Gemini.
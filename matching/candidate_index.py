@@ -0,0 +1,409 @@
+"""
+Candidate Index - Persistent Vector Index over the Resume Pool
+Stores one normalized resume embedding (same model as skill_matcher) per
+candidate, so a new JD can pull its most similar past resumes in
+milliseconds. Only that shortlist then goes through full scoring.
+
+Vectors are stored quantized (float32, float16 or int8, see
+utils.quantized_store) and memory-mapped; similarities are computed on the
+stored codes. Search is exact for small pools. Once the pool passes `ivf_threshold`
+vectors, an inverted-file (IVF) index is trained with k-means: each vector
+is listed under its nearest centroid and a query scans only the `nprobe`
+closest lists.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from utils.quantized_store import _DTYPES, dequantize, quantize, quantized_dot
+
+INDEX_DIR = os.path.join("cache", "candidate_index")
+DEFAULT_DIM = 384
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _kmeans(vectors: np.ndarray, k: int, iterations: int = 20, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on normalized vectors. Returns (k, dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(k):
+            members = vectors[assignment == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+            else:
+                # Re-seed empty clusters with a random point
+                centroids[c] = vectors[rng.integers(len(vectors))]
+        centroids = _normalize(centroids)
+    return centroids
+
+
+def stored_dim(path: str = INDEX_DIR, storage: str = "float32"):
+    """
+    Embedding dimension of the index at `path`, read from its files (no
+    model needed), or None when it holds no vectors yet. `storage` decodes
+    vectors that are still only in the database, as CandidateIndex would.
+    """
+    meta_path = os.path.join(path, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            return json.load(f)["dim"]
+
+    legacy_path = os.path.join(path, "index.npz")
+    if os.path.exists(legacy_path):
+        with np.load(legacy_path) as data:
+            return data["vectors"].shape[1]
+
+    db_path = os.path.join(path, "candidates.db")
+    if not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("SELECT code FROM vectors LIMIT 1").fetchone()
+    except sqlite3.OperationalError:
+        row = None  # Created before the vectors table existed
+    finally:
+        conn.close()
+    return len(row[0]) // np.dtype(_DTYPES[storage]).itemsize if row else None
+
+
+class CandidateIndex:
+    """
+    Persistent, incrementally updatable resume-embedding index.
+
+    `candidates.db` is the source of truth: candidate metadata, the cleaned
+    resume text (needed for full scoring) and the codes of vectors added
+    since the last snapshot are written in one transaction per add() or
+    remove(). A snapshot directory of .npy files holds the bulk of the
+    codes, ids and the IVF structure (codes are memory-mapped on load). It
+    is rewritten only after retraining or once enough changes have
+    accumulated; on load it is reconciled with the database, so a crash at
+    any point leaves vectors and metadata consistent. Adding a resume whose
+    text hash is already indexed replaces it.
+
+    Args:
+        path: Index directory
+        dim: Embedding dimension
+        ivf_threshold: Pool size at which the IVF structure is first trained
+        nprobe: IVF lists scanned per query
+        storage: Vector encoding, "float32", "float16" or "int8" (fixed when
+            the index is first created)
+    """
+
+    def __init__(
+        self,
+        path: str = INDEX_DIR,
+        dim: int = DEFAULT_DIM,
+        ivf_threshold: int = 4096,
+        nprobe: int = 8,
+        storage: str = "float32"
+    ):
+        self.path = path
+        self.dim = dim
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.storage = storage
+        os.makedirs(path, exist_ok=True)
+        self._meta_path = os.path.join(path, "meta.json")
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(path, "candidates.db"), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS candidates ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, resume_hash TEXT NOT NULL UNIQUE, "
+                "text TEXT NOT NULL, added REAL NOT NULL)"
+            )
+            # Vectors not yet in the .npy snapshot
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS vectors (id INTEGER PRIMARY KEY, code BLOB NOT NULL, scale REAL NOT NULL)"
+            )
+
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._codes, self._scales = quantize(np.zeros((0, dim), dtype=np.float32), storage)
+        self._centroids = None
+        self._lists = np.zeros(0, dtype=np.int32)  # IVF list of each row
+        self._trained_size = 0
+        self._snapshot = None  # Snapshot directory name under `path`
+        self._changes = 0  # Rows added or removed since the snapshot
+        self._load()
+
+    # Persistence
+
+    def _array_path(self, name: str, snapshot: str = None) -> str:
+        # Indexes written before snapshots kept their arrays directly in `path`
+        return os.path.join(self.path, snapshot or "", f"{name}.npy")
+
+    def _load(self) -> None:
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            if meta["dim"] != self.dim:
+                return
+            self.storage = meta["storage"]
+            self._trained_size = meta["trained_size"]
+            self._snapshot = meta.get("snapshot")
+            self._ids = np.load(self._array_path("ids", self._snapshot))
+            self._codes = np.load(self._array_path("codes", self._snapshot), mmap_mode="r")
+            self._scales = np.load(self._array_path("scales", self._snapshot))
+            self._lists = np.load(self._array_path("lists", self._snapshot))
+            centroids = np.load(self._array_path("centroids", self._snapshot))
+            self._centroids = centroids if len(centroids) else None
+            self._replay()
+            return
+
+        # Indexes written before quantized storage kept float32 vectors in one .npz
+        legacy_path = os.path.join(self.path, "index.npz")
+        if os.path.exists(legacy_path):
+            with np.load(legacy_path) as data:
+                if data["vectors"].shape[1] != self.dim:
+                    return
+                self._ids = data["ids"]
+                self._codes, self._scales = quantize(data["vectors"], self.storage)
+                self._lists = data["lists"]
+                self._centroids = data["centroids"] if len(data["centroids"]) else None
+                self._trained_size = int(data["trained_size"])
+            self._save()
+            os.remove(legacy_path)
+            return
+
+        # No snapshot yet: everything is still in the database
+        self._replay()
+
+    def _replay(self) -> None:
+        """Bring the snapshot up to date with the database: drop removed rows, append newer vectors."""
+        live = np.array([row[0] for row in self._conn.execute("SELECT id FROM candidates")], dtype=np.int64)
+        keep = np.isin(self._ids, live)
+        if not keep.all():
+            self._changes += int((~keep).sum())
+            self._ids = self._ids[keep]
+            self._codes = self._codes[keep]
+            self._scales = self._scales[keep]
+            self._lists = self._lists[keep]
+
+        dtype = self._codes.dtype
+        in_snapshot = set(self._ids.tolist())
+        rows = [
+            (candidate_id, code, scale)
+            for candidate_id, code, scale in self._conn.execute("SELECT id, code, scale FROM vectors ORDER BY id")
+            # Rows already in the snapshot are left over from an interrupted compaction
+            if candidate_id not in in_snapshot
+        ]
+        if not rows:
+            return
+        ids, codes, scales = zip(*rows)
+        codes = np.stack([np.frombuffer(code, dtype=dtype) for code in codes])
+        scales = np.asarray(scales, dtype=np.float32)
+        self._ids = np.concatenate([self._ids, np.asarray(ids, dtype=np.int64)])
+        self._codes = np.concatenate([self._codes, codes])
+        self._scales = np.concatenate([self._scales, scales])
+        self._lists = np.concatenate([self._lists, self._assign(dequantize(codes, scales))])
+        self._changes += len(rows)
+
+    def _save(self) -> None:
+        """
+        Write a new snapshot, switch meta.json to it, then clear the vectors
+        it absorbed from the database and delete older snapshots.
+        """
+        generation = int((self._snapshot or "snapshot-0").rsplit("-", 1)[1]) + 1
+        snapshot = f"snapshot-{generation}"
+        os.makedirs(os.path.join(self.path, snapshot), exist_ok=True)
+        arrays = {
+            "ids": self._ids,
+            "codes": np.asarray(self._codes),
+            "scales": self._scales,
+            "lists": self._lists,
+            "centroids": self._centroids if self._centroids is not None else np.zeros((0, self.dim), np.float32)
+        }
+        for name, array in arrays.items():
+            with open(self._array_path(name, snapshot), "wb") as f:
+                np.save(f, array)
+
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "dim": self.dim, "storage": self.storage,
+                "trained_size": self._trained_size, "snapshot": snapshot
+            }, f)
+        os.replace(tmp_path, self._meta_path)
+
+        with self._conn:
+            self._conn.execute("DELETE FROM vectors")
+        self._snapshot = snapshot
+        self._changes = 0
+
+        for entry in os.listdir(self.path):
+            if entry.startswith("snapshot-") and entry != snapshot:
+                shutil.rmtree(os.path.join(self.path, entry), ignore_errors=True)
+            elif entry in {f"{name}.npy" for name in arrays}:
+                os.remove(os.path.join(self.path, entry))
+
+        # Keep the (largest) code array on disk rather than in memory
+        self._codes = np.load(self._array_path("codes", snapshot), mmap_mode="r")
+
+    def _maybe_save(self, retrained: bool) -> None:
+        # IVF lists of every row change on retraining, so that always needs a snapshot
+        if retrained or self._changes > max(1024, len(self._ids) // 4):
+            self._save()
+
+    def vectors(self) -> np.ndarray:
+        """All stored vectors, decoded to float32 (row order matches search ids)."""
+        with self._lock:
+            return dequantize(self._codes, self._scales)
+
+    # IVF maintenance
+
+    def _train(self) -> None:
+        """(Re)build IVF lists with about sqrt(N) clusters."""
+        vectors = dequantize(self._codes, self._scales)
+        k = max(int(np.sqrt(len(vectors))), 1)
+        self._centroids = _kmeans(vectors, k)
+        self._lists = np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+        self._trained_size = len(vectors)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self._centroids is None:
+            return np.zeros(len(vectors), dtype=np.int32)
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _maybe_retrain(self) -> bool:
+        # Train once the pool is large enough, then again whenever it has doubled
+        size = len(self._ids)
+        if size >= self.ivf_threshold and (self._centroids is None or size >= 2 * self._trained_size):
+            self._train()
+            return True
+        return False
+
+    # Public API
+
+    def add(self, names: list, resume_hashes: list, texts: list, vectors: np.ndarray) -> list:
+        """Index candidates (one row per resume). Returns their ids."""
+        vectors = _normalize(vectors)
+        now = time.time()
+        with self._lock:
+            ids = []
+            replaced = []
+            # Metadata and vector codes commit together
+            with self._conn:
+                for name, resume_hash, text in zip(names, resume_hashes, texts):
+                    replaced.extend(row[0] for row in self._conn.execute(
+                        "SELECT id FROM candidates WHERE resume_hash = ?", (resume_hash,)
+                    ))
+                    self._conn.execute("DELETE FROM candidates WHERE resume_hash = ?", (resume_hash,))
+                    cursor = self._conn.execute(
+                        "INSERT INTO candidates (name, resume_hash, text, added) VALUES (?, ?, ?, ?)",
+                        (name, resume_hash, text, now)
+                    )
+                    ids.append(cursor.lastrowid)
+
+                # A hash repeated within this call keeps only its last row
+                ids = np.asarray(ids, dtype=np.int64)
+                fresh = ~np.isin(ids, replaced)
+                codes, scales = quantize(vectors[fresh], self.storage)
+                self._conn.executemany("DELETE FROM vectors WHERE id = ?", [(int(i),) for i in replaced])
+                self._conn.executemany(
+                    "INSERT INTO vectors (id, code, scale) VALUES (?, ?, ?)",
+                    [(int(i), code.tobytes(), float(scale)) for i, code, scale in zip(ids[fresh], codes, scales)]
+                )
+
+            keep = ~np.isin(self._ids, replaced)
+            self._ids = np.concatenate([self._ids[keep], ids[fresh]])
+            self._codes = np.concatenate([self._codes[keep], codes])
+            self._scales = np.concatenate([self._scales[keep], scales])
+            self._lists = np.concatenate([self._lists[keep], self._assign(vectors[fresh])])
+            self._changes += int(fresh.sum()) + int((~keep).sum())
+            self._maybe_save(self._maybe_retrain())
+        return [int(i) for i in ids[fresh]]
+
+    def remove(self, ids: list = None, names: list = None) -> int:
+        """Delete candidates by id and/or name. Returns the number removed."""
+        with self._lock:
+            removed = {int(i) for i in ids or []}
+            for name in names or []:
+                removed.update(row[0] for row in self._conn.execute(
+                    "SELECT id FROM candidates WHERE name = ?", (name,)
+                ))
+            with self._conn:
+                self._conn.executemany("DELETE FROM candidates WHERE id = ?", [(i,) for i in removed])
+                self._conn.executemany("DELETE FROM vectors WHERE id = ?", [(i,) for i in removed])
+
+            keep = ~np.isin(self._ids, list(removed))
+            count = int((~keep).sum())
+            self._ids = self._ids[keep]
+            self._codes = self._codes[keep]
+            self._scales = self._scales[keep]
+            self._lists = self._lists[keep]
+            self._changes += count
+            self._maybe_save(False)
+        return count
+
+    def search(self, query: np.ndarray, top_k: int = 300, exact: bool = False) -> list:
+        """
+        Most similar candidates to `query` (e.g. a JD embedding).
+
+        Returns [(id, cosine_similarity), ...], best first.
+        """
+        query = _normalize(query)[0]
+        with self._lock:
+            if self._centroids is not None and not exact:
+                probe = np.argsort(-(self._centroids @ query))[:self.nprobe]
+                rows = np.flatnonzero(np.isin(self._lists, probe))
+            else:
+                rows = np.arange(len(self._ids))
+            if not len(rows):
+                return []
+
+            scores = quantized_dot(self._codes[rows], self._scales[rows], query)[:, 0]
+            k = min(top_k, len(rows))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            return [(int(self._ids[rows[i]]), float(scores[i])) for i in best]
+
+    def get(self, ids: list) -> list:
+        """Metadata and text for candidate ids, in the given order (missing ids skipped)."""
+        with self._lock:
+            found = {}
+            for candidate_id in ids:
+                row = self._conn.execute(
+                    "SELECT id, name, resume_hash, text, added FROM candidates WHERE id = ?",
+                    (int(candidate_id),)
+                ).fetchone()
+                if row:
+                    found[row[0]] = dict(zip(("id", "name", "resume_hash", "text", "added"), row))
+        return [found[int(i)] for i in ids if int(i) in found]
+
+    def contains(self, resume_hash: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM candidates WHERE resume_hash = ?", (resume_hash,)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def stats(self) -> dict:
+        return {
+            "candidates": len(self._ids),
+            "ivf_lists": 0 if self._centroids is None else len(self._centroids),
+            "nprobe": self.nprobe,
+            "trained_size": self._trained_size,
+            "storage": self.storage
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,179 @@
+"""
+Document Encoder - Whole-Document Embeddings for Long Resumes
+The sentence encoder truncates input at `max_seq_length` tokens (256 for
+all-MiniLM-L6-v2), so most of a long resume never affected jd_similarity.
+
+Here each text is split into overlapping token windows. Windows from all
+documents in a batch are grouped into length buckets so each encode call
+pads to a similar length, encoded in large batches (through the embedding
+cache) and pooled back per document.
+"""
+
+import numpy as np
+
+from matching import skill_matcher
+
+POOLING_MODES = ("mean", "max")
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+class DocumentEncoder:
+    """
+    Sliding-window, length-bucketed encoder.
+
+    Args:
+        model: SentenceTransformer (default: skill_matcher.model)
+        encode: Callable(texts, batch_size=...) used to embed window texts
+            (default: the cached skill_matcher.encode)
+        window_tokens: Tokens per window (default: the model's max_seq_length
+            minus the [CLS]/[SEP] pair)
+        stride_tokens: Overlap between consecutive windows
+        bucket_width: Token-length range grouped into one encode call
+        batch_size: Windows per forward pass
+        max_windows: Cap per document (later text is ignored beyond it)
+    """
+
+    def __init__(
+        self,
+        model=None,
+        encode=None,
+        window_tokens: int = None,
+        stride_tokens: int = 32,
+        bucket_width: int = 32,
+        batch_size: int = 64,
+        max_windows: int = 32
+    ):
+        self._model = model
+        self.encode_fn = encode or skill_matcher.encode
+        self._window_tokens = window_tokens
+        self._stride_tokens = stride_tokens
+        self.bucket_width = bucket_width
+        self.batch_size = batch_size
+        self.max_windows = max_windows
+
+    # The model (and so the window size) is only resolved on first use, so
+    # creating an encoder never forces the sentence encoder to load.
+
+    @property
+    def model(self):
+        return self._model or skill_matcher.load_model()
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer
+
+    @property
+    def window_tokens(self) -> int:
+        return self._window_tokens or max(self.model.max_seq_length - 2, 16)
+
+    @property
+    def stride_tokens(self) -> int:
+        return min(self._stride_tokens, self.window_tokens // 2)
+
+    def windows(self, text: str) -> list:
+        """
+        Split `text` into overlapping windows of at most window_tokens tokens.
+        Returns [(window_text, token_count), ...]; windows are slices of
+        the original text.
+        """
+        if not text.strip():
+            return [(text, 0)]
+
+        if getattr(self.tokenizer, "is_fast", False):
+            encoding = self.tokenizer(
+                text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+            )
+            offsets = encoding["offset_mapping"]
+        else:
+            # Slow tokenizers have no offsets; approximate tokens with words
+            offsets = []
+            position = 0
+            for word in text.split():
+                start = text.index(word, position)
+                position = start + len(word)
+                offsets.append((start, position))
+
+        if len(offsets) <= self.window_tokens:
+            return [(text, len(offsets))]
+
+        step = self.window_tokens - self.stride_tokens
+        result = []
+        for start in range(0, len(offsets), step):
+            end = min(start + self.window_tokens, len(offsets))
+            result.append((text[offsets[start][0]:offsets[end - 1][1]], end - start))
+            if end == len(offsets) or len(result) >= self.max_windows:
+                break
+        return result
+
+    def _encode_windows(self, windows: list) -> np.ndarray:
+        """Encode (text, token_count) windows bucketed by length; rows keep input order."""
+        order = sorted(range(len(windows)), key=lambda i: windows[i][1])
+        buckets = []
+        for i in order:
+            if (not buckets or len(buckets[-1]) >= self.batch_size
+                    or windows[i][1] - windows[buckets[-1][0]][1] >= self.bucket_width):
+                buckets.append([])
+            buckets[-1].append(i)
+
+        embeddings = [None] * len(windows)
+        for bucket in buckets:
+            vectors = self.encode_fn([windows[i][0] for i in bucket], batch_size=len(bucket))
+            for i, vector in zip(bucket, vectors):
+                embeddings[i] = vector
+        return _normalize(np.stack(embeddings))
+
+    def encode_windows(self, texts: list):
+        """
+        Window every text and encode all windows together.
+        Returns (normalized window embeddings, per-text (start, end) row slices).
+        """
+        windows = []
+        bounds = []
+        for text in texts:
+            parts = self.windows(text)
+            bounds.append((len(windows), len(windows) + len(parts)))
+            windows.extend(parts)
+        if not windows:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), np.float32), bounds
+        return self._encode_windows(windows), bounds
+
+    def encode_documents(self, texts: list) -> np.ndarray:
+        """One normalized embedding per text: the mean of its window embeddings."""
+        if not texts:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), np.float32)
+        embeddings, bounds = self.encode_windows(texts)
+        return _normalize(np.stack([embeddings[start:end].mean(axis=0) for start, end in bounds]))
+
+    def similarities(self, query: np.ndarray, texts: list, pooling: str = "mean") -> np.ndarray:
+        """
+        Cosine similarity of `query` (e.g. the JD embedding) to each whole
+        text: the mean (or max) over the text's windows.
+        """
+        return self.similarity_matrix(np.atleast_2d(query), texts, pooling)[:, 0]
+
+    def similarity_matrix(self, queries: np.ndarray, texts: list, pooling: str = "mean") -> np.ndarray:
+        """
+        (len(texts), len(queries)) cosine similarities of each whole text to
+        each query (e.g. several JD embeddings), pooled over the text's
+        windows. Texts are windowed and encoded once for all queries.
+        """
+        if pooling not in POOLING_MODES:
+            raise ValueError(f"pooling must be one of {POOLING_MODES}")
+        queries = _normalize(np.atleast_2d(queries))
+        if not texts:
+            return np.zeros((0, len(queries)), np.float32)
+
+        embeddings, bounds = self.encode_windows(texts)
+        window_scores = embeddings @ queries.T
+        # Every text has at least one window, so the bounds tile the rows
+        starts = [start for start, _ in bounds]
+        if pooling == "max":
+            return np.maximum.reduceat(window_scores, starts, axis=0).astype(np.float32)
+        counts = np.array([end - start for start, end in bounds], dtype=np.float32)
+        return (np.add.reduceat(window_scores, starts, axis=0) / counts[:, None]).astype(np.float32)
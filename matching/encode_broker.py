@@ -0,0 +1,244 @@
+"""
+Encode Broker - Dynamic Micro-Batching for the Sentence Encoder
+Callers (pipeline stages, concurrent sessions, service jobs) each encode a
+handful of texts at a time, so the model rarely sees an efficient batch.
+
+The broker queues every request and a single thread coalesces them: a
+batch is sent to the model once it holds `max_batch_size` texts or the
+oldest request has waited `max_wait_ms`. Each caller gets its rows back
+through a Future.
+
+Threads that hold a ModelLock step out of it while they wait on the
+broker, so one job's encode requests can batch with another's.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+# The ModelLock (if any) each thread currently holds
+_held = threading.local()
+
+
+class ModelLock:
+    """
+    Non-reentrant lock for model stages shared by several threads (e.g. an
+    engine's model_lock in the scoring service).
+
+    While a holder is blocked in EncodeBroker.encode() the lock is released,
+    so other threads can run their own stages and send encode requests that
+    join the same forward pass; it is re-acquired before encode() returns.
+    Only use it around code that holds no other lock while encoding.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        self._lock.acquire()
+        _held.lock = self
+
+    def release(self) -> None:
+        _held.lock = None
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+
+class _Request:
+    __slots__ = ("texts", "single", "kwargs", "key", "future", "enqueued")
+
+    def __init__(self, texts: list, single: bool, kwargs: dict):
+        self.texts = texts
+        self.single = single
+        self.kwargs = kwargs
+        # Requests are only coalesced with others that use the same encode options
+        self.key = tuple(sorted(kwargs.items()))
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class EncodeBroker:
+    """
+    Coalesces encode requests from many threads into shared forward passes.
+
+    Drop-in for a model wherever `.encode(texts, **kwargs)` is called (e.g.
+    EmbeddingCache.encode). A caller's `batch_size` is ignored: the broker
+    sizes its own batches.
+
+    Args:
+        encode_fn: Callable(texts, batch_size=..., **kwargs) -> array, e.g.
+            a SentenceTransformer's encode
+        max_batch_size: Texts per forward pass before a batch is sent at once
+        max_wait_ms: Longest a request waits for others to join its batch
+        stats_window: Recent batches kept for the size/delay statistics
+    """
+
+    def __init__(
+        self,
+        encode_fn,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        stats_window: int = 1024
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = deque(maxlen=stats_window)
+        self._delays = deque(maxlen=stats_window)
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="encode-broker", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts, **encode_kwargs) -> Future:
+        """Queue texts for encoding; the Future resolves to their embeddings."""
+        if self._closed:
+            raise RuntimeError("EncodeBroker is closed")
+        single = isinstance(texts, str)
+        encode_kwargs.pop("batch_size", None)
+        request = _Request([texts] if single else list(texts), single, encode_kwargs)
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, texts, **encode_kwargs):
+        """
+        Blocking form of submit(), with model.encode()'s signature. A
+        ModelLock held by the caller is released while it waits.
+        """
+        future = self.submit(texts, **encode_kwargs)
+        lock = getattr(_held, "lock", None)
+        if lock is None:
+            return future.result()
+        lock.release()
+        try:
+            return future.result()
+        finally:
+            lock.acquire()
+
+    def close(self) -> None:
+        """Finish queued requests, then stop the batching thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def _collect(self, first: _Request, pending: deque) -> tuple:
+        """
+        Gather requests compatible with `first` until the batch is full or
+        `first` has waited max_wait: earlier deferred requests in `pending`
+        first, then new ones from the queue. Incompatible requests are left
+        in (or appended to) `pending`. Returns (batch, stop).
+        """
+        batch = [first]
+        size = len(first.texts)
+        deadline = first.enqueued + self.max_wait
+
+        held = deque()
+        while pending and size < self.max_batch_size:
+            request = pending.popleft()
+            if request.key == first.key:
+                batch.append(request)
+                size += len(request.texts)
+            else:
+                held.append(request)
+        pending.extendleft(reversed(held))
+
+        while size < self.max_batch_size:
+            try:
+                # Take whatever is already waiting before blocking on the deadline
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+            if request is None:
+                return batch, True
+            if request.key != first.key:
+                pending.append(request)
+                continue
+            batch.append(request)
+            size += len(request.texts)
+        return batch, False
+
+    def _run(self) -> None:
+        pending = deque()
+        stop = False
+        while pending or not stop:
+            first = pending.popleft() if pending else self._queue.get()
+            if first is None:
+                stop = True
+                continue
+
+            batch, stopped = self._collect(first, pending)
+            stop = stop or stopped
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: list) -> None:
+        start = time.perf_counter()
+
+        # One forward pass over the distinct texts of every request
+        unique = list(dict.fromkeys(text for request in batch for text in request.texts))
+        try:
+            vectors = np.asarray(
+                self.encode_fn(unique, batch_size=self.max_batch_size, **batch[0].kwargs)
+            ) if unique else None
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        row_of = {text: row for row, text in enumerate(unique)}
+        for request in batch:
+            if not request.texts:
+                width = vectors.shape[1] if vectors is not None and vectors.ndim == 2 else 0
+                request.future.set_result(np.zeros((0, width), dtype=np.float32))
+                continue
+            rows = vectors[[row_of[text] for text in request.texts]]
+            request.future.set_result(rows[0] if request.single else rows)
+
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.texts += len(unique)
+            self._batch_sizes.append(len(unique))
+            self._delays.extend(start - request.enqueued for request in batch)
+
+    def stats(self) -> dict:
+        """Batch size and queueing delay (ms) over recent batches, plus lifetime counters."""
+        with self._stats_lock:
+            sizes = np.array(self._batch_sizes, dtype=np.float64)
+            delays = np.array(self._delays, dtype=np.float64) * 1000
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "texts": self.texts,
+                "mean_batch_size": round(float(sizes.mean()), 2) if len(sizes) else 0,
+                "max_batch_size": int(sizes.max()) if len(sizes) else 0,
+                "mean_queue_ms": round(float(delays.mean()), 3) if len(delays) else 0,
+                "p95_queue_ms": round(float(np.percentile(delays, 95)), 3) if len(delays) else 0
+            }
@@ -1,50 +1,79 @@
-import re
+import numpy as np
 
-def calculate_project_score(resume_text: str) -> float:
+from parsing.feature_extractor import extract_features
+
+# Weight of each component in the final score
+DEFAULT_WEIGHTS = {"skill": 0.4, "experience": 0.25, "similarity": 0.25, "project": 0.1}
+
+# Columns of a stored component feature matrix (see feature_row)
+FEATURE_COLUMNS = ("skill_ratio", "experience_years", "jd_similarity", "project_score")
+
+
+def calculate_project_score(resume_text: str, features: dict = None) -> float:
     """
     Scoring based on action verbs in the resume.
     Proxy for "Doer" vs "Watcher".
+
+    Pass a precomputed extract_features() record to skip rescanning the text.
     """
-    action_keywords = [
-        "led", "managed", "created", "built", "developed", 
-        "designed", "architected", "delivered", "implemented", 
-        "engineered", "spearheaded", "deployed", "launched"
-    ]
-    
-    count = 0
-    text_lower = resume_text.lower()
-    for word in action_keywords:
-        # Simple word boundary regex
-        if re.search(r'\b' + word + r'\b', text_lower):
-            count += 1
-            
+    if features is None:
+        features = extract_features(resume_text)
+    count = len(features["action_verbs"])
+
     # Cap at 1.0 (e.g. 5 action words = full score)
     return min(count * 0.2, 1.0)
 
 
-def score_resume(parsed_resume: dict, parsed_jd: dict, skill_match: dict) -> dict:
-    skill_score = skill_match["match_ratio"]
+def resolve_weights(weights: dict = None) -> np.ndarray:
+    """
+    Component weights as a vector in DEFAULT_WEIGHTS order, normalized to
+    sum to 1 so final scores stay on a 0-100 scale. Components missing
+    from `weights` keep their default.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    unknown = set(weights) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown score weights {sorted(unknown)}; expected {list(DEFAULT_WEIGHTS)}")
+    vector = np.array([weights[name] for name in DEFAULT_WEIGHTS], dtype=np.float64)
+    if (vector < 0).any() or vector.sum() <= 0:
+        raise ValueError("Score weights must be non-negative and not all zero")
+    return vector / vector.sum()
 
-    experience_years = parsed_resume.get("experience_years", 0)
-    required_years = parsed_jd.get("min_experience", 0)
 
-    experience_score = (
-        min(experience_years / required_years, 1.0)
-        if required_years > 0 else 1.0
-    )
+def feature_row(parsed_resume: dict, skill_match: dict) -> list:
+    """One FEATURE_COLUMNS row for a parsed resume and its skill match."""
+    return [
+        skill_match["match_ratio"],
+        parsed_resume.get("experience_years", 0),
+        parsed_resume.get("jd_similarity", 0.0),
+        parsed_resume.get("project_score", 0.0)
+    ]
+
 
+def rerank(features: np.ndarray, min_experience: float = 0, weights: dict = None) -> np.ndarray:
+    """
+    Final scores (0-100) for a stored (n, len(FEATURE_COLUMNS)) feature
+    matrix under the given weights and minimum-experience threshold.
+    Nothing is re-parsed or re-embedded.
+    """
+    features = np.asarray(features, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+    components = features.copy()
+    if min_experience > 0:
+        components[:, 1] = np.minimum(features[:, 1] / min_experience, 1.0)
+    else:
+        components[:, 1] = 1.0
+    return np.round(components @ resolve_weights(weights) * 100, 2)
+
+
+def score_resume(parsed_resume: dict, parsed_jd: dict, skill_match: dict, weights: dict = None) -> dict:
+    experience_years = parsed_resume.get("experience_years", 0)
+    required_years = parsed_jd.get("min_experience", 0)
     jd_similarity = parsed_resume.get("jd_similarity", 0.0)
-    project_score = parsed_resume.get("project_score", 0.0)
 
-    final_score = (
-        0.4 * skill_score +
-        0.25 * experience_score +
-        0.25 * jd_similarity +
-        0.1 * project_score
-    )
+    final_score = rerank(feature_row(parsed_resume, skill_match), required_years, weights)[0]
 
     return {
-        "final_score": round(final_score * 100, 2),
+        "final_score": float(final_score),
         "skill_match": f"{len(skill_match['matched'])}/{len(parsed_jd['required_skills'])}",
         "experience_match": f"{experience_years} vs {required_years}+",
         "jd_similarity": round(jd_similarity, 2),
@@ -0,0 +1,115 @@
+"""
+Skill Embeddings - Precomputed Vectors for the Canonical Skill Table
+One normalized embedding per canonical skill ID, stored next to the other
+caches. Known skills are then compared by ID: exact and alias hits by set
+intersection, and near-synonyms (e.g. "deep learning" vs "neural
+networks") through neighbour sets precomputed from this matrix. Only
+phrases outside the taxonomy are embedded at match time.
+
+Build (or rebuild after editing the taxonomy):
+    python -m matching.skill_embeddings
+A missing or stale file is rebuilt automatically on first use.
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+
+from utils.skill_taxonomy import SkillTable, skill_table
+
+EMBEDDINGS_PATH = os.path.join("cache", "skill_embeddings.npz")
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+class SkillEmbeddings:
+    """
+    Normalized (n_skills, dim) embedding matrix in skill-ID order.
+
+    Args:
+        table: SkillTable the rows belong to
+        matrix: One embedding per canonical skill, row i = skill ID i
+        model_name: Encoder that produced the matrix
+    """
+
+    def __init__(self, table: SkillTable, matrix: np.ndarray, model_name: str):
+        self.table = table
+        self.matrix = _normalize(matrix)
+        self.model_name = model_name
+        self._neighbors = {}
+
+    def neighbors(self, threshold: float) -> list:
+        """
+        For each skill ID, the set of IDs whose embeddings are at least
+        `threshold` similar (always including itself).
+        """
+        if threshold not in self._neighbors:
+            hits = (self.matrix @ self.matrix.T) >= threshold
+            np.fill_diagonal(hits, True)
+            self._neighbors[threshold] = [set(np.flatnonzero(row).tolist()) for row in hits]
+        return self._neighbors[threshold]
+
+    def save(self, path: str = EMBEDDINGS_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Per-thread temp name: concurrent first-use builds each write their own
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            matrix=self.matrix,
+            names=np.array(self.table.names),
+            fingerprint=np.array(self.table.fingerprint()),
+            model_name=np.array(self.model_name)
+        )
+        os.replace(tmp_path, path)
+
+
+def build(encode, model_name: str, table: SkillTable = None, path: str = EMBEDDINGS_PATH) -> SkillEmbeddings:
+    """Embed every canonical skill with `encode(texts)` and store the matrix at `path`."""
+    table = table or skill_table()
+    embeddings = SkillEmbeddings(table, encode(table.names), model_name)
+    if path:
+        embeddings.save(path)
+    return embeddings
+
+
+def load(encode, model_name: str, table: SkillTable = None, path: str = EMBEDDINGS_PATH) -> SkillEmbeddings:
+    """
+    Stored matrix for the current skill table, rebuilding it when the file
+    is missing or was built for other skills or another model.
+    """
+    table = table or skill_table()
+    try:
+        with np.load(path) as data:
+            if str(data["fingerprint"]) == table.fingerprint() and str(data["model_name"]) == model_name:
+                return SkillEmbeddings(table, data["matrix"], model_name)
+    except (OSError, KeyError, ValueError):
+        pass
+    return build(encode, model_name, table, path)
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute embeddings for the canonical skill table.")
+    parser.add_argument("--output", default=EMBEDDINGS_PATH, help=f"Output file (default: {EMBEDDINGS_PATH})")
+    args = parser.parse_args(argv)
+
+    from matching import skill_matcher
+    embeddings = build(skill_matcher.encode, skill_matcher.MODEL_NAME, path=args.output)
+    print(
+        f"{len(embeddings.table)} canonical skills ({len(embeddings.table.ids)} names incl. aliases), "
+        f"dim {embeddings.matrix.shape[1]} -> {args.output}",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
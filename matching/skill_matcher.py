@@ -1,44 +1,182 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+from functools import lru_cache
+
 import numpy as np
-import streamlit as st
 
-import streamlit as st
+from matching import skill_embeddings
+from matching.encode_broker import EncodeBroker
+from utils import skill_taxonomy
+from utils.embedding_cache import EmbeddingCache
+from utils.model_registry import ALLOW_DOWNLOADS, REGISTRY, ModelUnavailableError
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+# SHORTLIST_ENCODE_BROKER=1 routes all encoding through one micro-batching
+# broker, so concurrent callers share forward passes
+ENCODE_BROKER = os.getenv("SHORTLIST_ENCODE_BROKER", "0") == "1"
+
 
-# Load the model directly. In a real cold-start scenario, this might take a moment.
-# Caching appropriately in Streamlit app.py will be important later.
-@st.cache_resource
+def _load_sentence_encoder():
+    # Imported here: sentence_transformers pulls in torch, which dominates import time
+    from sentence_transformers import SentenceTransformer
+    try:
+        return SentenceTransformer(MODEL_NAME, local_files_only=not ALLOW_DOWNLOADS)
+    except OSError as e:
+        raise ModelUnavailableError(
+            f"Sentence encoder '{MODEL_NAME}' is not in the local model cache ({e}). "
+            "Run once with SHORTLIST_ALLOW_DOWNLOADS=1 to fetch it."
+        ) from e
+
+REGISTRY.register("sentence_encoder", _load_sentence_encoder)
+
+
+# The model is loaded once per process, on first use, through the shared
+# registry. This keeps it free of any Streamlit dependency so the same model
+# serves the UI, the CLI and workers.
 def load_model():
-    return SentenceTransformer("all-MiniLM-L6-v2")
+    return REGISTRY.get("sentence_encoder")
+
+
+@lru_cache(maxsize=None)
+def load_cache():
+    # EMBEDDING_STORAGE=float16|int8 trades a little accuracy for a smaller cache
+    return EmbeddingCache(
+        MODEL_NAME, load_model().get_sentence_embedding_dimension(),
+        storage=os.getenv("EMBEDDING_STORAGE", "float32")
+    )
+
+
+@lru_cache(maxsize=None)
+def load_broker():
+    return EncodeBroker(
+        lambda texts, **encode_kwargs: load_model().encode(texts, **encode_kwargs),
+        max_batch_size=int(os.getenv("SHORTLIST_ENCODE_MAX_BATCH", "64")),
+        max_wait_ms=float(os.getenv("SHORTLIST_ENCODE_MAX_WAIT_MS", "2"))
+    )
+
+
+_skill_embeddings = None
+
+
+def load_skill_embeddings() -> skill_embeddings.SkillEmbeddings:
+    """Canonical skill embeddings for the current taxonomy (built once if missing or stale)."""
+    global _skill_embeddings
+    table = skill_taxonomy.skill_table()
+    if _skill_embeddings is None or _skill_embeddings.table is not table:
+        _skill_embeddings = skill_embeddings.load(encode, MODEL_NAME, table)
+    return _skill_embeddings
 
-model = load_model()
+
+def __getattr__(name):
+    # `skill_matcher.model` / `skill_matcher.cache` load lazily on first access
+    if name == "model":
+        return load_model()
+    if name == "cache":
+        return load_cache()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def encode(texts, **encode_kwargs):
+    """Encode text(s) through the persistent embedding cache (and the broker, if enabled)."""
+    return load_cache().encode(load_broker() if ENCODE_BROKER else load_model(), texts, **encode_kwargs)
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so a dot product equals cosine similarity."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
 
 
 def match_skills(resume_skills: list, jd_skills: list, threshold: float = 0.7) -> dict:
     if not resume_skills or not jd_skills:
         return {"matched": [], "missing": jd_skills, "match_ratio": 0.0}
 
-    resume_emb = model.encode(resume_skills)
-    jd_emb = model.encode(jd_skills)
+    return match_skills_batch([resume_skills], jd_skills, threshold)[0]
+
+
+def match_skills_batch(resume_skill_lists: list, jd_skills: list, threshold: float = 0.7) -> list:
+    """
+    Match many resumes against one JD in a single pass.
+
+    Known skills and aliases resolve to canonical IDs and match through
+    precomputed neighbour sets; only phrases outside the taxonomy are
+    encoded, once each across the batch (see match_skills_matrix).
+
+    Returns one match_skills()-style dict per resume, in input order.
+    """
+    return [row[0] for row in match_skills_matrix(resume_skill_lists, [jd_skills], threshold)]
+
+
+def match_skills_matrix(resume_skill_lists: list, jd_skill_lists: list, threshold: float = 0.7) -> list:
+    """
+    Match many resumes against many JDs in a single pass.
+
+    Skills in the taxonomy are resolved to canonical IDs (aliases included):
+    a known JD skill is found when the resume's ID set intersects its
+    neighbour set, the IDs whose precomputed embeddings are at least
+    `threshold` similar. Only phrases outside the taxonomy are encoded,
+    once each, and compared against the canonical matrix and each other.
+
+    Returns results[resume][jd], each a match_skills()-style dict.
+    """
+    results = [[{"matched": [], "missing": jd_skills, "match_ratio": 0.0} for jd_skills in jd_skill_lists]
+               for _ in resume_skill_lists]
+    if not any(resume_skill_lists) or not any(jd_skill_lists):
+        return results
+
+    vocabulary = load_skill_embeddings()
+    table = vocabulary.table
+    neighbors = vocabulary.neighbors(threshold)
+
+    # Unknown phrases (both sides) get one row each in a shared matrix
+    unknown_rows = {}
 
-    matched = []
-    missing = []
+    def resolve(skill):
+        skill_id = table.lookup(skill)
+        if skill_id is not None:
+            return ("id", skill_id)
+        return ("row", unknown_rows.setdefault(skill, len(unknown_rows)))
 
-    for i, jd_skill in enumerate(jd_skills):
-        # We need to reshape jd_emb[i] to be (1, embedding_dim)
-        similarities = cosine_similarity(
-            [jd_emb[i]], resume_emb
-        )[0]
+    resumes = []
+    for skills in resume_skill_lists:
+        ids, rows = set(), []
+        for kind, value in map(resolve, skills or []):
+            if kind == "id":
+                ids.add(value)
+            else:
+                rows.append(value)
+        resumes.append((ids, rows))
+    jds = [[resolve(skill) for skill in jd_skills or []] for jd_skills in jd_skill_lists]
 
-        if max(similarities) >= threshold:
-            matched.append(jd_skill)
-        else:
-            missing.append(jd_skill)
+    if unknown_rows:
+        unknown_emb = _normalize(encode(list(unknown_rows)))
+        # (n_unknown, n_skills) and (n_unknown, n_unknown) boolean hit matrices
+        unknown_vs_known = (unknown_emb @ vocabulary.matrix.T) >= threshold
+        unknown_vs_unknown = (unknown_emb @ unknown_emb.T) >= threshold
 
-    match_ratio = len(matched) / len(jd_skills)
+    for i, (ids, rows) in enumerate(resumes):
+        if not ids and not rows:
+            continue
+        known = sorted(ids)
+        for j, (jd_skills, resolved) in enumerate(zip(jd_skill_lists, jds)):
+            if not jd_skills:
+                continue
+            found = []
+            for kind, value in resolved:
+                if kind == "id":
+                    hit = (not neighbors[value].isdisjoint(ids)
+                           or bool(rows and unknown_vs_known[rows, value].any()))
+                else:
+                    hit = (bool(known and unknown_vs_known[value, known].any())
+                           or bool(rows and unknown_vs_unknown[value, rows].any()))
+                found.append(hit)
+            matched = [skill for skill, hit in zip(jd_skills, found) if hit]
+            results[i][j] = {
+                "matched": matched,
+                "missing": [skill for skill, hit in zip(jd_skills, found) if not hit],
+                "match_ratio": round(len(matched) / len(jd_skills), 2)
+            }
 
-    return {
-        "matched": matched,
-        "missing": missing,
-        "match_ratio": round(match_ratio, 2)
-    }
+    return results
@@ -0,0 +1,68 @@
+"""
+Feature Extractor - Single-Pass Regex Features
+Scans a document once for every pattern the scorer and experience logic
+need: action verbs, explicit "X years", date ranges and present/current ranges.
+"""
+
+import re
+
+ACTION_VERBS = [
+    "led", "managed", "created", "built", "developed",
+    "designed", "architected", "delivered", "implemented",
+    "engineered", "spearheaded", "deployed", "launched"
+]
+
+# All patterns live in one zero-width lookahead, so the scanner tries each
+# position exactly once and overlapping hits of different kinds are all seen.
+# At any position at most one alternative can match.
+_FEATURE_PATTERN = re.compile(
+    r"(?=(?:"
+    r"\b(?P<verb>" + "|".join(ACTION_VERBS) + r")\b"
+    r"|(?P<years>\d+)\s*\+?\s*years?"
+    r"|(?P<start>\d{4})\s*[-–—]\s*(?:(?P<end>\d{4})|(?P<current>present|current|now))"
+    r"))"
+)
+
+
+def extract_features(text: str) -> dict:
+    """
+    Scan `text` once and collect regex features.
+
+    Returns:
+        {
+            "action_verbs": distinct action verbs found (sorted),
+            "explicit_years": every "X years" value, in order,
+            "date_ranges": non-overlapping (start, end) year pairs, in order,
+            "current_ranges": start years of "YYYY - present/current/now", in order
+        }
+    """
+    verbs = set()
+    explicit_years = []
+    date_ranges = []
+    current_ranges = []
+    range_end = 0
+
+    for match in _FEATURE_PATTERN.finditer(text.lower()):
+        if match.group("verb"):
+            verbs.add(match.group("verb"))
+        elif match.group("years"):
+            explicit_years.append(int(match.group("years")))
+        elif match.group("end"):
+            # Date ranges don't overlap each other (same as re.findall)
+            if match.start() >= range_end:
+                date_ranges.append((int(match.group("start")), int(match.group("end"))))
+                range_end = match.end("end")
+        elif match.group("current"):
+            current_ranges.append(int(match.group("start")))
+
+    return {
+        "action_verbs": sorted(verbs),
+        "explicit_years": explicit_years,
+        "date_ranges": date_ranges,
+        "current_ranges": current_ranges
+    }
+
+
+def extract_features_batch(texts: list) -> list:
+    """extract_features() over many texts, in input order."""
+    return [extract_features(text) for text in texts]
@@ -1,58 +1,131 @@
-import re
-import spacy
-
-# Try to load spaCy model with error handling
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    # If model not found, try to download it
+from parsing.feature_extractor import extract_features
+from utils.model_registry import ALLOW_DOWNLOADS, REGISTRY, ModelUnavailableError
+
+SPACY_MODEL = "en_core_web_sm"
+
+
+def _load_spacy():
+    import spacy
+    try:
+        return spacy.load(SPACY_MODEL)
+    except OSError as e:
+        if not ALLOW_DOWNLOADS:
+            raise ModelUnavailableError(
+                f"spaCy model '{SPACY_MODEL}' is not installed. "
+                f"Run: python -m spacy download {SPACY_MODEL}"
+            ) from e
     import subprocess
     import sys
     print("Downloading spaCy model...")
-    subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
+    subprocess.check_call([sys.executable, "-m", "spacy", "download", SPACY_MODEL])
+    return spacy.load(SPACY_MODEL)
+
+REGISTRY.register("spacy", _load_spacy)
+
+
+def load_nlp():
+    return REGISTRY.get("spacy")
+
+
+def __getattr__(name):
+    # `jd_parser.nlp` loads lazily on first access
+    if name == "nlp":
+        return load_nlp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def experience_from_features(features: dict) -> int:
+    """
+    Years of experience from an extract_features() record.
+    Explicit "X years" wins, then summed date ranges, then present/current ranges.
+    """
+    from datetime import datetime
+
+    if features["explicit_years"]:
+        return features["explicit_years"][0]
+
+    if features["date_ranges"]:
+        total_years = sum(end - start for start, end in features["date_ranges"])
+        return max(total_years, 0)  # Ensure non-negative
+
+    if features["current_ranges"]:
+        current_year = datetime.now().year
+        return max(current_year - features["current_ranges"][0], 0)
+
+    return 0
 
 
-def extract_experience(jd_text: str) -> int:
+def extract_experience(jd_text: str, features: dict = None) -> int:
     """
     Extract years of experience from text.
     Handles multiple patterns:
     - Explicit: "3+ years", "5 years"
     - Date ranges: "2018-2023", "2020 - 2024"
     - Present/Current: "2020-present", "2019 - current"
+
+    Pass a precomputed extract_features() record to skip rescanning the text.
     """
-    from datetime import datetime
-    
-    # Try explicit "X years" pattern first
-    match = re.search(r'(\d+)\s*\+?\s*years?', jd_text.lower())
-    if match:
-        return int(match.group(1))
-    
-    # Try date range pattern (YYYY-YYYY or YYYY - YYYY)
-    date_ranges = re.findall(r'(\d{4})\s*[-–—]\s*(\d{4})', jd_text)
-    if date_ranges:
-        total_years = sum(int(end) - int(start) for start, end in date_ranges)
-        return max(total_years, 0)  # Ensure non-negative
-    
-    # Try "present" or "current" pattern
-    current_match = re.search(r'(\d{4})\s*[-–—]\s*(present|current|now)', jd_text.lower())
-    if current_match:
-        start_year = int(current_match.group(1))
-        current_year = datetime.now().year
-        return max(current_year - start_year, 0)
-    
-    return 0
+    if features is None:
+        features = extract_features(jd_text)
+    return experience_from_features(features)
 
 
-def extract_skills(jd_text: str) -> list:
-    doc = nlp(jd_text.lower())
-    skills = set()
+# Only the components noun_chunks depends on (POS tags + dependency parse) are kept
+UNUSED_COMPONENTS = ["ner", "lemmatizer"]
+MAX_CHUNK_CHARS = 5000
+
 
-    for chunk in doc.noun_chunks:
-        if len(chunk.text.split()) <= 4:
-            skills.add(chunk.text.strip())
+def _split_long_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> list:
+    """Split text into pieces of at most max_chars, preferring sentence then word breaks."""
+    chunks = []
+    while len(text) > max_chars:
+        cut = text.rfind(". ", 0, max_chars)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, max_chars)
+        cut = cut + 1 if cut > 0 else max_chars
+        chunks.append(text[:cut])
+        text = text[cut:]
+    chunks.append(text)
+    return chunks
 
-    return list(skills)
+
+def extract_skills_batch(
+    texts: list,
+    batch_size: int = 32,
+    n_process: int = 1,
+    max_chunk_chars: int = MAX_CHUNK_CHARS
+) -> list:
+    """
+    Extract candidate skill phrases from many texts in one spaCy pass.
+
+    Runs nlp.pipe with NER and lemmatization disabled, since only noun_chunks
+    are used. Long texts are split into chunks of at most max_chunk_chars and
+    their phrases merged back per text.
+
+    Returns one list of phrases per input text, in input order.
+    """
+    pieces = []
+    owners = []
+    for i, text in enumerate(texts):
+        for chunk in _split_long_text(text.lower(), max_chunk_chars):
+            pieces.append(chunk)
+            owners.append(i)
+
+    nlp = load_nlp()
+    disabled = [name for name in UNUSED_COMPONENTS if name in nlp.pipe_names]
+    skills = [set() for _ in texts]
+    docs = nlp.pipe(pieces, batch_size=batch_size, n_process=n_process, disable=disabled)
+
+    for owner, doc in zip(owners, docs):
+        for chunk in doc.noun_chunks:
+            if len(chunk.text.split()) <= 4:
+                skills[owner].add(chunk.text.strip())
+
+    return [list(found) for found in skills]
+
+
+def extract_skills(jd_text: str) -> list:
+    return extract_skills_batch([jd_text])[0]
 
 
 def parse_jd(jd_text: str) -> dict:
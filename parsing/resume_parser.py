@@ -1,8 +1,15 @@
 import io
+import json
+import os
 import re
-import fitz  # PyMuPDF
-import pdfplumber
-from docx import Document
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# The PDF/DOCX libraries are imported where they are used: the UI and CLI
+# processes only launch extraction workers and never need them.
 
 
 def _clean_text(text: str) -> str:
@@ -12,30 +19,123 @@ def _clean_text(text: str) -> str:
     return text.strip()
 
 
+# Pages with less text than this are re-read with pdfplumber
+MIN_PAGE_CHARS = 50
+# Oversized documents: stop after this many pages or characters of raw text
+MAX_PDF_PAGES = 50
+MAX_PDF_CHARS = 200_000
+
+
+def _extract_pdf_pages(
+    file_bytes: bytes,
+    max_pages: int = MAX_PDF_PAGES,
+    max_chars: int = MAX_PDF_CHARS,
+    min_page_chars: int = MIN_PAGE_CHARS
+) -> dict:
+    """
+    Stream a PDF page by page with PyMuPDF. Only pages that yield fewer
+    than `min_page_chars` characters are re-extracted with pdfplumber (which
+    is opened lazily, at most once). Stops early after `max_pages` pages or
+    `max_chars` characters.
+
+    Returns:
+        {"text": str, "truncated": bool,
+         "pages": [{"page", "chars", "seconds", "source"}, ...]}
+    """
+    import fitz  # PyMuPDF
+
+    parts = []
+    pages = []
+    total_chars = 0
+    truncated = False
+    plumber = None
+
+    try:
+        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            for index, page in enumerate(doc):
+                if (max_pages and index >= max_pages) or (max_chars and total_chars >= max_chars):
+                    truncated = True
+                    break
+
+                start = time.perf_counter()
+                page_text = page.get_text()
+                source = "pymupdf"
+
+                if len(page_text.strip()) < min_page_chars:
+                    if plumber is None:
+                        import pdfplumber
+                        plumber = pdfplumber.open(io.BytesIO(file_bytes))
+                    fallback = plumber.pages[index].extract_text() if index < len(plumber.pages) else None
+                    if fallback and len(fallback.strip()) > len(page_text.strip()):
+                        page_text = fallback + "\n"
+                        source = "pdfplumber"
+
+                parts.append(page_text)
+                total_chars += len(page_text)
+                pages.append({
+                    "page": index + 1,
+                    "chars": len(page_text),
+                    "seconds": round(time.perf_counter() - start, 6),
+                    "source": source
+                })
+    finally:
+        if plumber is not None:
+            plumber.close()
+
+    return {"text": "".join(parts), "truncated": truncated, "pages": pages}
+
+
 def _extract_pdf_pymupdf(file_bytes: bytes) -> str:
-    text = ""
-    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
+    return _extract_pdf_pages(file_bytes, max_pages=0, max_chars=0, min_page_chars=0)["text"]
 
 
 def _extract_pdf_pdfplumber(file_bytes: bytes) -> str:
-    text = ""
+    import pdfplumber
+    parts = []
     with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
         for page in pdf.pages:
             page_text = page.extract_text()
             if page_text:
-                text += page_text + "\n"
-    return text
+                parts.append(page_text + "\n")
+    return "".join(parts)
 
 
 def _extract_docx(file_bytes: bytes) -> str:
+    from docx import Document
     doc = Document(io.BytesIO(file_bytes))
     return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
 
 
+def _extract_document(filename: str, file_bytes: bytes, max_pages: int = 0, max_chars: int = 0) -> dict:
+    """
+    Cleaned text plus an extraction report.
+    PDFs report per-page timings ("pages") and whether the page/character
+    caps cut them short (0 = no cap, the default).
+    """
+    filename = filename.lower()
+
+    if filename.endswith(".pdf"):
+        result = _extract_pdf_pages(file_bytes, max_pages=max_pages, max_chars=max_chars)
+
+    elif filename.endswith(".docx"):
+        result = {"text": _extract_docx(file_bytes), "truncated": False, "pages": None}
+
+    else:
+        raise ValueError("Unsupported file type")
+
+    result["text"] = _clean_text(result["text"])
+    return result
+
+
+def _extract_text(filename: str, file_bytes: bytes) -> str:
+    return _extract_document(filename, file_bytes)["text"]
+
+
 def extract_resume_text(file) -> str:
+    """
+    Full cleaned text of one PDF/DOCX file, in this process and without
+    the page/character caps that extract_many applies.
+    """
     file_bytes = file.read()
     try:
         filename = file.name.lower()
@@ -46,18 +146,253 @@ def extract_resume_text(file) -> str:
         else:
             raise ValueError("File object missing name attribute")
 
-    if filename.endswith(".pdf"):
-        text = _extract_pdf_pymupdf(file_bytes)
-        if len(text.strip()) < 200:
-            text = _extract_pdf_pdfplumber(file_bytes)
+    return _extract_text(filename, file_bytes)
 
-    elif filename.endswith(".docx"):
-        text = _extract_docx(file_bytes)
 
+# Worker processes run a fresh interpreter that imports only this module, so
+# they never re-import the launching script (app.py, the CLI) or its models.
+_WORKER_COMMAND = "from parsing.resume_parser import _worker_main; _worker_main()"
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _worker_main() -> None:
+    """
+    Child process entry. Serves documents until stdin closes: each request
+    is a JSON header line {"name", "size", "max_pages"} followed by `size`
+    bytes; each reply is one JSON line on stdout.
+    """
+    memory_limit_mb = int(sys.argv[1])
+    if memory_limit_mb:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass  # Not supported on this platform
+
+    # Keep the real stdout for replies; anything libraries print goes to stderr
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    requests = sys.stdin.buffer
+
+    while True:
+        header = requests.readline()
+        if not header:
+            return
+        request = json.loads(header)
+        file_bytes = requests.read(request["size"])
+        fatal = False
+        try:
+            result = _extract_document(request["name"], file_bytes, request["max_pages"], MAX_PDF_CHARS)
+        except MemoryError:
+            result = {"error": f"Memory limit of {memory_limit_mb}MB exceeded"}
+            fatal = True
+        except Exception as e:
+            result = {"error": str(e) or type(e).__name__}
+        replies.write((json.dumps(result) + "\n").encode())
+        replies.flush()
+        if fatal:
+            return  # Leave a fresh process to the pool rather than a damaged heap
+
+
+class _WorkerProcess:
+    """One long-lived extraction process, serving a document at a time."""
+
+    def __init__(self, memory_limit_mb: int):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [_PROJECT_ROOT, env.get("PYTHONPATH")]))
+        self.timed_out = False
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", _WORKER_COMMAND, str(memory_limit_mb)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env=env
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def extract(self, name: str, file_bytes: bytes, timeout: float, max_pages: int) -> dict:
+        """
+        Send one document and wait for its reply. After `timeout` seconds the
+        process is killed, which also unblocks the read.
+        """
+        header = json.dumps({"name": name, "size": len(file_bytes), "max_pages": max_pages})
+        self.timed_out = False
+        watchdog = threading.Timer(timeout, self._expire) if timeout else None
+        if watchdog:
+            watchdog.start()
+        try:
+            self.process.stdin.write(header.encode() + b"\n")
+            self.process.stdin.write(file_bytes)
+            self.process.stdin.flush()
+            reply = self.process.stdout.readline()
+        except OSError:
+            reply = b""
+        finally:
+            if watchdog:
+                watchdog.cancel()
+        if reply:
+            try:
+                return json.loads(reply)
+            except ValueError:
+                pass
+
+        self.kill()
+        if self.timed_out:
+            return {"error": f"Extraction timed out after {timeout}s"}
+        return {"error": f"Extraction process crashed (exit code {self.process.wait()})"}
+
+    def _expire(self) -> None:
+        self.timed_out = True
+        self.kill()
+
+    def kill(self) -> None:
+        if self.alive:
+            self.process.kill()
+
+    def close(self) -> None:
+        self.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class _WorkerPool:
+    """
+    Reusable worker processes, one per concurrent caller. A process that
+    timed out, crashed or hit the memory limit is discarded and replaced
+    on demand.
+    """
+
+    def __init__(self, memory_limit_mb: int):
+        self.memory_limit_mb = memory_limit_mb
+        self._idle = []
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self) -> _WorkerProcess:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is closed")
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+                self._all.remove(worker)
+                worker.close()
+            worker = _WorkerProcess(self.memory_limit_mb)
+            self._all.append(worker)
+            return worker
+
+    def release(self, worker: _WorkerProcess) -> None:
+        with self._lock:
+            if worker.alive and not self._closed:
+                self._idle.append(worker)
+                return
+            if worker in self._all:
+                self._all.remove(worker)
+        worker.close()
+
+    def close(self) -> None:
+        """Kill every worker, including ones still busy with a document."""
+        with self._lock:
+            self._closed = True
+            workers, self._all, self._idle = self._all, [], []
+        for worker in workers:
+            worker.close()
+
+
+def _result_record(name, file, result: dict, seconds: float) -> dict:
+    """One extract_many() result; every path builds it here so the keys always match."""
+    return {
+        "name": name,
+        "text": result.get("text"),
+        "error": result.get("error"),
+        "pages": result.get("pages"),
+        "truncated": result.get("truncated", False),
+        "seconds": seconds,
+        "file": file
+    }
+
+
+def _run_worker(pool: _WorkerPool, file, timeout: float, max_pages: int = MAX_PDF_PAGES) -> dict:
+    """Extract one file on a pooled worker process and time it."""
+    start = time.perf_counter()
+    name = file.name
+    try:
+        worker = pool.acquire()
+    except RuntimeError as e:
+        result = {"error": str(e)}
     else:
-        raise ValueError("Unsupported file type")
+        try:
+            result = worker.extract(name, file.read(), timeout, max_pages)
+        finally:
+            pool.release(worker)
+    return _result_record(name, file, result, time.perf_counter() - start)
+
+
+def extract_many(
+    files,
+    max_workers: int = 2,
+    timeout: float = 30.0,
+    memory_limit_mb: int = 1024,
+    max_pages: int = MAX_PDF_PAGES
+):
+    """
+    Extract text from many resumes in isolated worker processes.
+
+    A pool of at most `max_workers` long-lived processes handles the batch,
+    one document per process at a time, so interpreter start-up is paid
+    once per worker rather than once per file. A file that hangs past
+    `timeout` seconds, exceeds `memory_limit_mb` or crashes the parser
+    takes its process down with it and is reported as an error; the pool
+    starts a replacement and the rest of the batch is unaffected. PDFs are
+    read page by page and stop after `max_pages` pages (0 = no cap).
+
+    If the consumer stops early (a `break`, or an exception raised while
+    handling a result), all worker processes are killed on exit.
+
+    Yields one dict per file as soon as it finishes (completion order):
+        {"name": str, "text": str or None, "error": str or None, "seconds": float,
+         "file": the input file object,
+         "pages": per-page [{"page", "chars", "seconds", "source"}] for PDFs, else None,
+         "truncated": True if the page/size cap cut the document short}
+    """
+    queue = iter(files)
+    running = set()
+    exhausted = False
+
+    pool = _WorkerPool(memory_limit_mb)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while running or not exhausted:
+            # Keep the pool full
+            while not exhausted and len(running) < max_workers:
+                file = next(queue, None)
+                if file is None:
+                    exhausted = True
+                    break
+                if getattr(file, "name", None) is None:
+                    yield _result_record(None, file, {"error": "File object missing name attribute"}, 0.0)
+                    continue
+                running.add(executor.submit(_run_worker, pool, file, timeout, max_pages))
+
+            if not running:
+                continue
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        # Killing the processes unblocks any thread still waiting on one
+        pool.close()
+        executor.shutdown(wait=True, cancel_futures=True)
 
-    return _clean_text(text)
 
 if __name__ == "__main__":
     # Basic sanity check
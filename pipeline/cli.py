@@ -0,0 +1,194 @@
+"""
+Command-line batch shortlisting.
+
+Example:
+    python -m pipeline.cli --jd jd.txt --skills "python, sql" \
+        --resumes ./resumes --output ranked.jsonl --workers 4
+
+Repeat --jd to rank the same resumes against several roles in one pass.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+from utils.logger import _convert_to_serializable
+
+CSV_FIELDS = [
+    "rank", "name", "final_score", "skill_match", "experience_match",
+    "jd_similarity", "matched_skills", "missing_skills", "truncated", "explanation"
+]
+
+
+def _to_row(rank: int, result: dict) -> dict:
+    score_data = result["score_data"]
+    return _convert_to_serializable({
+        "rank": rank,
+        "name": result["name"],
+        "final_score": score_data["final_score"],
+        "skill_match": score_data["skill_match"],
+        "experience_match": score_data["experience_match"],
+        "jd_similarity": score_data["jd_similarity"],
+        "matched_skills": score_data["matched_skills"],
+        "missing_skills": score_data["missing_skills"],
+        "truncated": result.get("truncated", False),
+        "explanation": result["explanation"]
+    })
+
+
+def write_results(rows: list, path: str, fmt: str, fields: list = CSV_FIELDS) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({
+                    **row,
+                    "matched_skills": ", ".join(row["matched_skills"]),
+                    "missing_skills": ", ".join(row["missing_skills"])
+                })
+        else:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+
+def write_best_roles(best_roles: list, titles: list, path: str, fmt: str) -> None:
+    """One row per candidate: their best role plus their score for every role."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=["name", "role", "final_score"] + titles)
+            writer.writeheader()
+            for row in best_roles:
+                writer.writerow({"name": row["name"], "role": row["role"],
+                                 "final_score": row["final_score"], **row["scores"]})
+        else:
+            for row in best_roles:
+                f.write(json.dumps(row) + "\n")
+
+
+def parse_weights(spec: str) -> dict:
+    """"skill=0.5,experience=0.3" -> {"skill": 0.5, "experience": 0.3}"""
+    weights = {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        name, sep, value = part.partition("=")
+        if not sep:
+            raise ValueError(f"Expected name=value in --weights, got '{part}'")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+def _role_title(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _output_path(output: str, suffix: str) -> str:
+    """`ranked.jsonl` -> `ranked.<suffix>`; extensionless paths such as `./out` get it appended."""
+    return os.path.splitext(output)[0] + "." + suffix
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Rank a directory of resumes against a job description.")
+    parser.add_argument("--jd", required=True, action="append",
+                        help="Path to a text file containing the job description; repeat to score "
+                             "against several roles in one pass (role = file name, numbered if repeated)")
+    parser.add_argument("--skills", required=True, help="Required skills, comma-separated")
+    parser.add_argument("--resumes", required=True, help="Directory of PDF/DOCX resumes")
+    parser.add_argument("--output", required=True, help="Output file (.jsonl or .csv)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Output format (default: from extension)")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent extraction processes")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-document extraction timeout (s)")
+    parser.add_argument("--memory-limit", type=int, default=1024, help="Per-document extraction memory cap (MB)")
+    parser.add_argument("--max-pages", type=int, default=50, help="PDF pages extracted per resume (0 = all)")
+    parser.add_argument("--batch-size", type=int, default=64, help="Resumes matched per vectorized pass")
+    parser.add_argument("--explain", action="store_true", help="Generate explanations (Gemini or fallback)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Bounded memory: keep only the top K in memory, spill all results to disk")
+    parser.add_argument("--top-k", type=int, default=100, help="Candidates written to --output in --stream mode")
+    parser.add_argument("--spill", help="JSONL file for every result in --stream mode (default: <output>.all.jsonl)")
+    parser.add_argument("--weights",
+                        help="Score weights, e.g. skill=0.5,experience=0.3 (others keep their defaults)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-run every stage instead of reusing stored results")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    # Imported here so --help and argument errors don't pay for loading the NLP models
+    from pipeline.engine import ShortlistEngine, iter_directory, unique_title
+
+    if len(args.jd) > 1 and args.stream:
+        print("--stream supports a single --jd", file=sys.stderr)
+        return 2
+    roles = {}
+    for path in args.jd:
+        with open(path, encoding="utf-8") as f:
+            # JDs with the same file name in different directories are numbered, not merged
+            roles[unique_title(_role_title(path), roles)] = f.read()
+    skills = [s.strip() for s in args.skills.split(",") if s.strip()]
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+
+    engine = ShortlistEngine(
+        max_workers=args.workers,
+        timeout=args.timeout,
+        memory_limit_mb=args.memory_limit,
+        max_pages=args.max_pages,
+        batch_size=args.batch_size,
+        explain=args.explain,
+        cache_results=not args.no_cache,
+        weights=parse_weights(args.weights)
+    )
+
+    def progress(done, name):
+        print(f"[{done}] {name}", file=sys.stderr)
+
+    if len(roles) > 1:
+        batch = engine.evaluate_multi(roles, skills, iter_directory(args.resumes), progress)
+        rows = [
+            {"role": title, **_to_row(rank, result)}
+            for title, results in batch["roles"].items()
+            for rank, result in enumerate(results, start=1)
+        ]
+        write_results(rows, args.output, fmt, ["role"] + CSV_FIELDS)
+        best_path = _output_path(args.output, "best_roles." + fmt)
+        write_best_roles(batch["best_roles"], list(roles), best_path, fmt)
+        print(f"Best role per candidate -> {best_path}", file=sys.stderr)
+    else:
+        jd_text = next(iter(roles.values()))
+        if args.stream:
+            spill_path = args.spill or _output_path(args.output, "all.jsonl")
+            batch = engine.evaluate_streaming(
+                jd_text, skills, iter_directory(args.resumes), args.top_k, spill_path, progress
+            )
+        else:
+            batch = engine.evaluate(jd_text, skills, iter_directory(args.resumes), progress)
+
+        rows = [_to_row(rank, result) for rank, result in enumerate(batch["results"], start=1)]
+        write_results(rows, args.output, fmt)
+
+    for error in batch.get("errors", []):
+        print(f"Failed: {error['name']}: {error['error']}", file=sys.stderr)
+    if batch["truncated"]:
+        print(
+            f"Warning: {len(batch['truncated'])} resume(s) cut short at --max-pages {args.max_pages}: "
+            + ", ".join(batch["truncated"]),
+            file=sys.stderr
+        )
+    print(
+        f"Scored {batch['successful']}/{batch['total']} resumes -> {args.output}",
+        file=sys.stderr
+    )
+    if args.stream:
+        rss = batch["peak_rss_mb"]
+        print(
+            f"Kept top {batch['kept']}, all results -> {batch['spill_path']} "
+            f"(peak RSS {rss['self']} MB, largest worker {rss['workers']} MB)",
+            file=sys.stderr
+        )
+    return 0 if batch["successful"] or not batch["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,809 @@
+"""
+Shortlisting Engine - Headless Batch Pipeline
+Parse JD -> extract -> match -> score -> log, with no UI dependency.
+Used by the Streamlit app and the command-line entry point alike.
+"""
+
+import os
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+from parsing import resume_parser, jd_parser, feature_extractor
+from matching import skill_matcher, scorer
+from matching.candidate_index import CandidateIndex
+from matching.document_encoder import DocumentEncoder
+from explanation.async_explainer import ExplanationService
+from pipeline.streaming import StreamingRanker
+from utils import logger, skill_taxonomy
+from utils.instrumentation import (
+    BatchMetrics, export_prometheus, record_stage, stage_timer, timed, to_milliseconds
+)
+from utils.logger import _convert_to_serializable, _hash_text
+from utils.result_cache import ResultCache, jd_key, pipeline_version, result_key
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+
+class DocumentFile:
+    """File-like handle for a resume on disk. Bytes are read only when needed."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+class BufferedDocument:
+    """
+    Already-read document bytes plus their result-cache key.
+    The bytes are handed over (and dropped) on the first read().
+    """
+
+    def __init__(self, name: str, data: bytes, cache_key: str = None):
+        self.name = name
+        self.cache_key = cache_key
+        self._data = data
+
+    def read(self) -> bytes:
+        data, self._data = self._data, None
+        return data
+
+
+def iter_directory(directory: str):
+    """Yield a DocumentFile for every PDF/DOCX in `directory`, in name order."""
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if entry.is_file() and entry.name.lower().endswith(SUPPORTED_EXTENSIONS):
+            yield DocumentFile(entry.path)
+
+
+def feature_matrix(results: list) -> np.ndarray:
+    """
+    (n, len(scorer.FEATURE_COLUMNS)) component features of scored results,
+    in result order, for instant re-ranking with scorer.rerank().
+    """
+    return np.array(
+        [[result["features"][column] for column in scorer.FEATURE_COLUMNS] for result in results],
+        dtype=np.float64
+    ).reshape(len(results), len(scorer.FEATURE_COLUMNS))
+
+
+def rerank_results(results: list, features: np.ndarray, min_experience: float, weights: dict = None) -> list:
+    """
+    Re-sort scored results under new weights / minimum experience without
+    re-running the pipeline. Returns (final_score, result) pairs, best first;
+    the stored score_data is left unchanged.
+    """
+    scores = scorer.rerank(features, min_experience, weights)
+    order = np.argsort(-scores, kind="stable")
+    return [(float(scores[i]), results[i]) for i in order]
+
+
+def unique_title(title: str, taken) -> str:
+    """`title`, or "title (2)", "title (3)", ... if already in `taken`, so roles never overwrite each other."""
+    candidate = title
+    suffix = 2
+    while candidate in taken:
+        candidate = f"{title} ({suffix})"
+        suffix += 1
+    return candidate
+
+
+def _extraction_fields(report: dict) -> dict:
+    """The "pages"/"truncated" result fields from an extraction report or cached payload."""
+    report = report or {}
+    return {"pages": report.get("pages"), "truncated": bool(report.get("truncated"))}
+
+
+class ShortlistEngine:
+    """
+    Library-level shortlisting pipeline.
+
+    Models are loaded once per process (see skill_matcher.load_model), so a
+    single engine can score any number of batches.
+
+    Args:
+        max_workers: Concurrent document extraction processes
+        timeout: Per-document extraction timeout in seconds
+        memory_limit_mb: Per-document extraction memory cap
+        max_pages: PDF pages extracted per document (0 = all)
+        batch_size: Resumes parsed, embedded and matched together in one pass
+        explain: Generate a Gemini (or fallback) explanation per candidate
+        explainer: ExplanationService to use (default: one with standard settings)
+        result_cache: ResultCache for whole-pipeline memoization (default: the
+            on-disk cache under cache/; pass cache_results=False to disable)
+        cache_results: Reuse stored results for unchanged (JD, resume, pipeline) triples
+        similarity_pooling: How window similarities combine into jd_similarity
+            for long resumes, "mean" or "max"
+        document_encoder: DocumentEncoder for resume texts (default: sliding
+            windows over the shared sentence encoder)
+        weights: Score component weights, e.g. {"skill": 0.5, "experience": 0.3}
+            (see scorer.DEFAULT_WEIGHTS; missing components keep their default)
+        model_lock: Held while a batch runs through spaCy, the encoder and the
+            embedding cache; pass a shared threading.Lock when several threads
+            use one engine, or an encode_broker.ModelLock to let other
+            threads in while this one waits on the encode broker (default:
+            no locking)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        timeout: float = 30.0,
+        memory_limit_mb: int = 1024,
+        max_pages: int = resume_parser.MAX_PDF_PAGES,
+        batch_size: int = 64,
+        explain: bool = True,
+        explainer: ExplanationService = None,
+        result_cache: ResultCache = None,
+        cache_results: bool = True,
+        similarity_pooling: str = "mean",
+        document_encoder: DocumentEncoder = None,
+        weights: dict = None,
+        model_lock=None
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_pages = max_pages
+        self.batch_size = batch_size
+        self.explain = explain
+        self.explainer = explainer or ExplanationService()
+        self.result_cache = (result_cache or ResultCache()) if cache_results else None
+        self.similarity_pooling = similarity_pooling
+        self.document_encoder = document_encoder or DocumentEncoder()
+        scorer.resolve_weights(weights)  # Fail fast on unknown or invalid weights
+        self.weights = weights
+        self.model_lock = model_lock or nullcontext()
+
+    def prepare_jd(self, jd_text: str, required_skills: list) -> dict:
+        """
+        Parse the JD, merge in the manually entered skills and embed it in
+        windows like the resumes, so a long JD isn't cut off at the model's
+        max_seq_length.
+        """
+        return self.prepare_jds([jd_text], required_skills)[0]
+
+    @timed("prepare_jd")
+    def prepare_jds(self, jd_texts: list, required_skills: list) -> list:
+        """prepare_jd() for several JDs, embedding all JD texts in one call."""
+        embeddings = self.document_encoder.encode_documents(list(jd_texts))
+        return [
+            self._prepared_jd(jd_text, required_skills, embedding)
+            for jd_text, embedding in zip(jd_texts, embeddings)
+        ]
+
+    def _prepared_jd(self, jd_text: str, required_skills: list, embedding) -> dict:
+        parsed_jd = jd_parser.parse_jd(jd_text)
+
+        # VALIDATION: Filter JD skills through taxonomy
+        jd_skills_validated = skill_taxonomy.validate_skills(parsed_jd["required_skills"])
+        parsed_jd["required_skills"] = list(set(jd_skills_validated + list(required_skills)))
+
+        return {
+            "text": jd_text,
+            "parsed": parsed_jd,
+            "embedding": embedding,
+            "cache_key": (
+                jd_key(
+                    jd_text, parsed_jd["required_skills"],
+                    pipeline_version({
+                        "pooling": self.similarity_pooling,
+                        "weights": scorer.resolve_weights(self.weights).tolist(),
+                        "max_pages": self.max_pages
+                    })
+                )
+                if self.result_cache is not None else None
+            )
+        }
+
+    def parse_resumes(self, texts: list, jd: dict, records: list = None, batch_metrics=None) -> list:
+        """
+        Extract skills, experience, similarity and project score for many
+        resume texts. spaCy and the sentence encoder each run once per batch,
+        and each text is regex-scanned once for all scoring features.
+
+        `records` (one dict per text) receives per-resume stage durations;
+        batched stages are split evenly across the batch.
+        """
+        parsed, similarities = self._parse_batch(texts, jd["embedding"], records, batch_metrics)
+        for parsed_resume, jd_similarity in zip(parsed, similarities[:, 0]):
+            parsed_resume["jd_similarity"] = jd_similarity
+        return parsed
+
+    def _parse_batch(self, texts: list, jd_embeddings, records: list = None, batch_metrics=None):
+        """
+        JD-independent parsing of a batch of texts plus their whole-text
+        similarity to every JD embedding.
+
+        Returns (parsed dicts without "jd_similarity", (len(texts), n_jds) similarities).
+        """
+        with stage_timer("spacy", records, batch_metrics):
+            skills_raw = jd_parser.extract_skills_batch(texts)
+        with stage_timer("features", records, batch_metrics):
+            features = feature_extractor.extract_features_batch(texts)
+        # Semantic Similarity (Whole Text, in overlapping windows)
+        with stage_timer("embed", records, batch_metrics):
+            similarities = self.document_encoder.similarity_matrix(
+                jd_embeddings, texts, self.similarity_pooling
+            )
+
+        parsed = []
+        for i, (text, raw, feats) in enumerate(zip(texts, skills_raw, features)):
+            # VALIDATION: Filter skills through taxonomy
+            with stage_timer("taxonomy", records and [records[i]], batch_metrics):
+                skills = skill_taxonomy.validate_skills(raw)
+            parsed.append({
+                "text": text,
+                "skills": skills,
+                "experience_years": jd_parser.extract_experience(text, feats),
+                "project_score": scorer.calculate_project_score(text, feats)
+            })
+        return parsed, similarities
+
+    def parse_resume(self, resume_text: str, jd: dict, record: dict = None, batch_metrics=None) -> dict:
+        """Single-resume form of parse_resumes()."""
+        records = [record] if record is not None else None
+        return self.parse_resumes([resume_text], jd, records, batch_metrics)[0]
+
+    def _score_batch(self, batch: list, jd: dict, explain: bool, batch_metrics=None) -> list:
+        """
+        Parse, match, score, log and explain a batch of (name, resume_text,
+        timings, cache_key, extraction) items, where `extraction` is the
+        {"pages", "truncated"} report from extract_many (or None). Results
+        with a cache_key are memoized.
+        """
+        with self.model_lock:
+            results = self._score_parsed(batch, jd, batch_metrics)
+        self._explain(results, explain, batch_metrics)
+        return results
+
+    def _score_parsed(self, batch: list, jd: dict, batch_metrics=None) -> list:
+        """_score_batch() without explanations: everything that runs through the models."""
+        parsed_jd = jd["parsed"]
+        results = []
+
+        try:
+            parsed_batch = list(zip(
+                batch,
+                self.parse_resumes(
+                    [item[1] for item in batch], jd,
+                    [item[2] for item in batch], batch_metrics
+                )
+            ))
+        except Exception:
+            # Fall back to one at a time so a single bad document can't fail the batch
+            parsed_batch = []
+            for item in batch:
+                name, text, record = item[:3]
+                try:
+                    parsed_batch.append((item, self.parse_resume(text, jd, record, batch_metrics)))
+                except Exception as e:
+                    logger.log_error(name, str(e))
+                    results.append({"name": name, "error": str(e)})
+
+        records = [item[2] for item, _ in parsed_batch]
+        with stage_timer("match", records, batch_metrics):
+            match_results = skill_matcher.match_skills_batch(
+                [parsed_resume["skills"] for _, parsed_resume in parsed_batch],
+                parsed_jd["required_skills"]
+            )
+
+        for ((name, _, record, cache_key, extraction), parsed_resume), match_result in zip(parsed_batch, match_results):
+            extraction = _extraction_fields(extraction)
+            try:
+                with stage_timer("score", [record], batch_metrics):
+                    score_data = scorer.score_resume(parsed_resume, parsed_jd, match_result, self.weights)
+
+                # AUDIT LOGGING: Log scoring decision
+                with stage_timer("log", [record], batch_metrics):
+                    logger.log_scoring_decision(
+                        resume_name=name,
+                        score_data=score_data,
+                        jd_text=jd["text"],
+                        resume_text=parsed_resume["text"],
+                        parsed_jd=parsed_jd,
+                        stage_timings=to_milliseconds(record),
+                        extraction=extraction
+                    )
+
+                result = {
+                    "name": name,
+                    "score_data": score_data,
+                    "features": {
+                        **{key: value for key, value in parsed_resume.items() if key != "text"},
+                        "skill_ratio": match_result["match_ratio"]
+                    },
+                    "explanation": None,
+                    "preview": parsed_resume["text"][:500] + "...",
+                    "timings": record,
+                    **extraction,
+                    "error": None
+                }
+                if cache_key and self.result_cache is not None:
+                    self.result_cache.put(cache_key, _convert_to_serializable({
+                        "score_data": result["score_data"],
+                        "features": result["features"],
+                        "preview": result["preview"],
+                        "resume_hash": _hash_text(parsed_resume["text"]),
+                        **extraction
+                    }))
+                results.append(result)
+            except Exception as e:
+                logger.log_error(name, str(e))
+                results.append({"name": name, "error": str(e)})
+
+        return results
+
+    def _explain(self, results: list, explain: bool, batch_metrics=None) -> None:
+        """Explain the scored results concurrently (cached, with fallback)."""
+        if not explain:
+            return
+        scored = [result for result in results if not result["error"]]
+        with stage_timer("explain", [result["timings"] for result in scored], batch_metrics):
+            explanations = self.explainer.explain_all([result["score_data"] for result in scored])
+        for result, explanation in zip(scored, explanations):
+            result["explanation"] = explanation
+
+    def _cached_results(self, hits: deque, jd: dict, explain: bool, batch_metrics=None) -> list:
+        """Turn result-cache hits into results, logging each decision as if freshly scored."""
+        results = []
+        while hits:
+            name, payload, record = hits.popleft()
+            extraction = _extraction_fields(payload)
+            with stage_timer("log", [record], batch_metrics):
+                logger.log_scoring_decision(
+                    resume_name=name,
+                    score_data=payload["score_data"],
+                    jd_text=jd["text"],
+                    resume_text="",
+                    parsed_jd=jd["parsed"],
+                    stage_timings=to_milliseconds(record),
+                    resume_hash=payload["resume_hash"],
+                    extraction=extraction
+                )
+            results.append({
+                "name": name,
+                "score_data": payload["score_data"],
+                "features": payload["features"],
+                "explanation": None,
+                "preview": payload["preview"],
+                "timings": record,
+                **extraction,
+                "error": None
+            })
+        self._explain(results, explain, batch_metrics)
+        return results
+
+    def _lookup(self, files, jd: dict, hits: deque, batch_metrics=None):
+        """
+        Read each file once and check the result cache. Hits are queued on
+        `hits` as (name, payload, timings); misses are yielded as
+        BufferedDocuments for extraction.
+        """
+        for file in files:
+            if getattr(file, "name", None) is None:
+                yield file
+                continue
+
+            record = {}
+            with stage_timer("cache", [record], batch_metrics):
+                data = file.read()
+                key = result_key(jd["cache_key"], data)
+                payload = self.result_cache.get(key)
+
+            if payload is None:
+                yield BufferedDocument(file.name, data, key)
+            else:
+                hits.append((file.name, payload, record))
+
+    def iter_results(
+        self,
+        jd: dict,
+        files,
+        progress=None,
+        batch_size: int = None,
+        explain: bool = None,
+        batch_metrics: BatchMetrics = None
+    ):
+        """
+        Stream results for `files` against a prepared JD.
+
+        Yields one dict per file: scored candidates have "score_data",
+        "features" (skills, experience, similarity, project score),
+        "explanation", "preview", per-stage "timings" (seconds), the per-page
+        extraction report "pages" (PDFs; None otherwise) and "truncated"
+        (True if max_pages cut the document short); failures have only
+        "name" and "error".
+        `progress(done, name)` is called after each document is extracted
+        or found in the result cache.
+
+        `batch_size` and `explain` override the engine defaults for this call,
+        e.g. a small batch_size (8) and explain=False to rank candidates
+        shortly after they finish and explain them afterwards, while still
+        encoding several resumes per pass. Pass a BatchMetrics to
+        collect per-stage durations for the whole run.
+        """
+        batch_size = batch_size or self.batch_size
+        explain = self.explain if explain is None else explain
+
+        hits = deque()
+        if self.result_cache is not None and jd.get("cache_key"):
+            files = self._lookup(files, jd, hits, batch_metrics)
+
+        extracted = resume_parser.extract_many(
+            files,
+            max_workers=self.max_workers,
+            timeout=self.timeout,
+            memory_limit_mb=self.memory_limit_mb,
+            max_pages=self.max_pages
+        )
+
+        done = 0
+        batch = []
+        for extraction in extracted:
+            # Cached candidates found while the extraction pool was busy
+            for result in self._cached_results(hits, jd, explain, batch_metrics):
+                done += 1
+                if progress:
+                    progress(done, result["name"])
+                yield result
+
+            name = extraction["name"]
+            record = {}
+            record_stage("extract", extraction["seconds"], [record], batch_metrics)
+
+            if extraction["error"]:
+                logger.log_error(name, extraction["error"])
+                yield {"name": name, "error": extraction["error"]}
+            else:
+                cache_key = getattr(extraction["file"], "cache_key", None)
+                batch.append((name, extraction["text"], record, cache_key, extraction))
+
+            done += 1
+            if progress:
+                progress(done, name)
+
+            if len(batch) >= batch_size:
+                yield from self._score_batch(batch, jd, explain, batch_metrics)
+                batch = []
+
+        if batch:
+            yield from self._score_batch(batch, jd, explain, batch_metrics)
+
+        for result in self._cached_results(hits, jd, explain, batch_metrics):
+            done += 1
+            if progress:
+                progress(done, result["name"])
+            yield result
+
+    def evaluate(self, jd_text: str, required_skills: list, files, progress=None) -> dict:
+        """
+        Run the whole pipeline and return ranked results.
+
+        Returns:
+            {"results": [...] sorted by final score, "errors": [...],
+             "total": int, "successful": int, "failed": int,
+             "truncated": [names of documents cut short by max_pages]}
+        """
+        jd = self.prepare_jd(jd_text, required_skills)
+
+        batch_metrics = BatchMetrics()
+        return self._rank(self.iter_results(jd, files, progress, batch_metrics=batch_metrics), batch_metrics)
+
+    def _rank(self, results_iter, batch_metrics: BatchMetrics) -> dict:
+        """Collect streamed results, sort by score and log the batch summary."""
+        results = []
+        errors = []
+        for result in results_iter:
+            if result["error"]:
+                errors.append(result)
+            else:
+                results.append(result)
+
+        results.sort(key=lambda r: r["score_data"]["final_score"], reverse=True)
+
+        total = len(results) + len(errors)
+        logger.log_batch_summary(total, len(results), len(errors), batch_metrics.summary())
+        export_prometheus()
+
+        return {
+            "results": results,
+            "errors": errors,
+            "total": total,
+            "successful": len(results),
+            "failed": len(errors),
+            "truncated": [result["name"] for result in results if result.get("truncated")],
+            "feature_matrix": feature_matrix(results)
+        }
+
+    def evaluate_streaming(
+        self,
+        jd_text: str,
+        required_skills: list,
+        files,
+        top_k: int = 50,
+        spill_path: str = None,
+        progress=None
+    ) -> dict:
+        """
+        Bounded-memory form of evaluate() for batches of any size.
+
+        Files are read one at a time and their bytes released after
+        extraction; only the best `top_k` results stay in memory and every
+        result (scored or failed) is appended to `spill_path` as JSONL.
+        Explanations, if enabled, are generated for the kept top K only.
+
+        Returns:
+            {"results": [...] top K by final score, "total", "successful",
+             "failed", "kept", "truncated", "spill_path",
+             "peak_rss_mb": {"self", "workers"}}
+        """
+        jd = self.prepare_jd(jd_text, required_skills)
+
+        batch_metrics = BatchMetrics()
+        ranker = StreamingRanker(top_k, spill_path)
+        try:
+            for result in self.iter_results(jd, files, progress, explain=False, batch_metrics=batch_metrics):
+                ranker.add(result)
+        finally:
+            ranker.close()
+
+        results = ranker.ranked()
+        self._explain(results, self.explain, batch_metrics)
+
+        summary = ranker.summary()
+        logger.log_batch_summary(summary["total"], summary["successful"], summary["failed"], batch_metrics.summary())
+        export_prometheus()
+        return {"results": results, **summary}
+
+    def evaluate_multi(self, roles: dict, required_skills: list, files, progress=None) -> dict:
+        """
+        Score every resume against several JDs in one pass.
+
+        Each resume is extracted, parsed and window-encoded once; skill
+        matches and jd_similarity for every (resume, JD) pair come from a
+        few matrix products, then each pair is scored and logged as usual.
+        The result cache is not used. Explanations, if enabled, are
+        generated for each candidate's best role only.
+
+        Args:
+            roles: {role title: JD text}, in display order
+            required_skills: Manually entered skills, merged into every JD
+
+        Returns:
+            {"roles": {title: [...] results sorted by final score},
+             "best_roles": [{"name", "role", "final_score", "scores": {title: score}}, ...] best first,
+             "names": [...], "skill_match", "jd_similarity", "final_scores":
+             (n_candidates, n_roles) arrays in "names" x "roles" order,
+             "errors": [...], "total", "successful", "failed",
+             "truncated": [names of documents cut short by max_pages]}
+        """
+        titles = list(roles)
+        jds = self.prepare_jds([roles[title] for title in titles], required_skills)
+        jd_embeddings = np.stack([np.asarray(jd["embedding"], dtype=np.float32) for jd in jds])
+
+        batch_metrics = BatchMetrics()
+        scored = []
+        errors = []
+
+        def score(batch):
+            with self.model_lock:
+                try:
+                    scored.extend(self._score_roles(batch, titles, jds, jd_embeddings, batch_metrics))
+                except Exception:
+                    # Fall back to one at a time so a single bad document can't fail the batch
+                    for item in batch:
+                        try:
+                            scored.extend(self._score_roles([item], titles, jds, jd_embeddings, batch_metrics))
+                        except Exception as e:
+                            logger.log_error(item[0], str(e))
+                            errors.append({"name": item[0], "error": str(e)})
+
+        batch = []
+        extracted = resume_parser.extract_many(
+            files,
+            max_workers=self.max_workers,
+            timeout=self.timeout,
+            memory_limit_mb=self.memory_limit_mb,
+            max_pages=self.max_pages
+        )
+        for done, extraction in enumerate(extracted, start=1):
+            name = extraction["name"]
+            record = {}
+            record_stage("extract", extraction["seconds"], [record], batch_metrics)
+            if extraction["error"]:
+                logger.log_error(name, extraction["error"])
+                errors.append({"name": name, "error": extraction["error"]})
+            else:
+                batch.append((name, extraction["text"], record, extraction))
+            if progress:
+                progress(done, name)
+
+            if len(batch) >= self.batch_size:
+                score(batch)
+                batch = []
+        if batch:
+            score(batch)
+
+        names = [name for name, _ in scored]
+        per_role = [[results[j] for _, results in scored] for j in range(len(titles))]
+        final_scores = np.array(
+            [[result["score_data"]["final_score"] for result in results] for _, results in scored],
+            dtype=float
+        ).reshape(len(scored), len(titles))
+
+        best = final_scores.argmax(axis=1) if len(titles) else np.zeros(len(scored), dtype=int)
+        best_results = [results[j] for (_, results), j in zip(scored, best)]
+        self._explain(best_results, self.explain, batch_metrics)
+
+        best_roles = sorted(
+            (
+                {
+                    "name": name,
+                    "role": titles[j],
+                    "final_score": float(final_scores[i, j]),
+                    "scores": dict(zip(titles, final_scores[i].tolist()))
+                }
+                for i, (name, j) in enumerate(zip(names, best))
+            ),
+            key=lambda row: row["final_score"], reverse=True
+        )
+
+        total = len(scored) + len(errors)
+        logger.log_batch_summary(total, len(scored), len(errors), batch_metrics.summary())
+        export_prometheus()
+
+        return {
+            "roles": {
+                title: sorted(results, key=lambda r: r["score_data"]["final_score"], reverse=True)
+                for title, results in zip(titles, per_role)
+            },
+            "best_roles": best_roles,
+            "names": names,
+            "skill_match": np.array(
+                [[result["features"]["skill_ratio"] for result in results] for _, results in scored],
+                dtype=np.float32
+            ).reshape(len(scored), len(titles)),
+            "jd_similarity": np.array(
+                [[result["features"]["jd_similarity"] for result in results] for _, results in scored],
+                dtype=np.float32
+            ).reshape(len(scored), len(titles)),
+            "final_scores": final_scores,
+            "errors": errors,
+            "total": total,
+            "successful": len(scored),
+            "failed": len(errors),
+            "truncated": [name for name, results in scored if results and results[0]["truncated"]]
+        }
+
+    def _score_roles(self, batch: list, titles: list, jds: list, jd_embeddings, batch_metrics=None) -> list:
+        """
+        Parse a batch of (name, resume_text, timings, extraction) items once
+        and score each against every prepared JD.
+
+        Returns [(name, [result per JD, in `jds` order]), ...].
+        """
+        texts = [item[1] for item in batch]
+        records = [item[2] for item in batch]
+        parsed, similarities = self._parse_batch(texts, jd_embeddings, records, batch_metrics)
+        with stage_timer("match", records, batch_metrics):
+            matches = skill_matcher.match_skills_matrix(
+                [parsed_resume["skills"] for parsed_resume in parsed],
+                [jd["parsed"]["required_skills"] for jd in jds]
+            )
+
+        scored = []
+        for (name, _, record, extraction), parsed_resume, row_similarities, row_matches in zip(
+            batch, parsed, similarities, matches
+        ):
+            extraction = _extraction_fields(extraction)
+            results = []
+            for title, jd, jd_similarity, match_result in zip(titles, jds, row_similarities, row_matches):
+                features = {**parsed_resume, "jd_similarity": jd_similarity}
+                with stage_timer("score", [record], batch_metrics):
+                    score_data = scorer.score_resume(features, jd["parsed"], match_result, self.weights)
+                with stage_timer("log", [record], batch_metrics):
+                    logger.log_scoring_decision(
+                        resume_name=name,
+                        score_data=score_data,
+                        jd_text=jd["text"],
+                        resume_text=parsed_resume["text"],
+                        parsed_jd=jd["parsed"],
+                        stage_timings=to_milliseconds(record),
+                        extraction=extraction
+                    )
+                features.pop("text")
+                features["skill_ratio"] = match_result["match_ratio"]
+                results.append({
+                    "name": name,
+                    "role": title,
+                    "score_data": score_data,
+                    "features": features,
+                    "explanation": None,
+                    "preview": parsed_resume["text"][:500] + "...",
+                    "timings": record,
+                    **extraction,
+                    "error": None
+                })
+            scored.append((name, results))
+        return scored
+
+    def index_resumes(self, files, index: CandidateIndex, progress=None) -> dict:
+        """
+        Extract and embed resumes into a candidate pool index.
+
+        Returns:
+            {"added": int, "errors": [{"name", "error"}, ...]}
+        """
+        added = 0
+        errors = []
+        batch = []
+
+        def flush():
+            texts = [text for _, text in batch]
+            index.add(
+                [name for name, _ in batch],
+                [_hash_text(text) for text in texts],
+                texts,
+                self.document_encoder.encode_documents(texts)
+            )
+            return len(batch)
+
+        extracted = resume_parser.extract_many(
+            files,
+            max_workers=self.max_workers,
+            timeout=self.timeout,
+            memory_limit_mb=self.memory_limit_mb,
+            max_pages=self.max_pages
+        )
+        for done, extraction in enumerate(extracted, start=1):
+            if extraction["error"]:
+                errors.append({"name": extraction["name"], "error": extraction["error"]})
+            else:
+                batch.append((extraction["name"], extraction["text"]))
+            if progress:
+                progress(done, extraction["name"])
+
+            if len(batch) >= self.batch_size:
+                added += flush()
+                batch = []
+
+        if batch:
+            added += flush()
+        return {"added": added, "errors": errors}
+
+    def evaluate_pool(
+        self,
+        jd_text: str,
+        required_skills: list,
+        index: CandidateIndex,
+        top_k: int = 300
+    ) -> dict:
+        """
+        Two-stage ranking over an indexed candidate pool: retrieve the
+        `top_k` resumes most similar to the JD from the index, then run the
+        full parse/match/score pipeline on those only.
+
+        Returns evaluate()'s dict plus "retrieved" (stage-one count).
+        """
+        jd = self.prepare_jd(jd_text, required_skills)
+
+        batch_metrics = BatchMetrics()
+        with stage_timer("retrieve", None, batch_metrics):
+            candidates = index.get([candidate_id for candidate_id, _ in index.search(jd["embedding"], top_k)])
+
+        def scored():
+            for start in range(0, len(candidates), self.batch_size):
+                chunk = candidates[start:start + self.batch_size]
+                yield from self._score_batch(
+                    [(c["name"], c["text"], {}, None, None) for c in chunk], jd, self.explain, batch_metrics
+                )
+
+        ranked = self._rank(scored(), batch_metrics)
+        ranked["retrieved"] = len(candidates)
+        return ranked
@@ -0,0 +1,105 @@
+"""
+Command-line candidate pool: index past resumes once, then rank the pool
+against new job descriptions without re-uploading anything.
+
+Example:
+    python -m pipeline.pool add --resumes ./archive
+    python -m pipeline.pool search --jd jd.txt --skills "python, sql" \
+        --top-k 300 --output ranked.jsonl
+    python -m pipeline.pool remove --name old_resume.pdf
+"""
+
+import argparse
+import sys
+
+from pipeline.cli import _to_row, write_results
+
+DEFAULT_INDEX = "cache/candidate_index"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Maintain and query the indexed candidate pool.")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help=f"Index directory (default: {DEFAULT_INDEX})")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF lists scanned per query")
+    parser.add_argument("--storage", choices=["float32", "float16", "int8"], default="float32",
+                        help="Vector encoding for a new index (an existing index keeps its own)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Extract, embed and index a directory of resumes")
+    add.add_argument("--resumes", required=True, help="Directory of PDF/DOCX resumes")
+    add.add_argument("--workers", type=int, default=2, help="Concurrent extraction processes")
+    add.add_argument("--timeout", type=float, default=30.0, help="Per-document extraction timeout (s)")
+
+    remove = commands.add_parser("remove", help="Delete candidates from the pool")
+    remove.add_argument("--name", action="append", default=[], help="Resume file name (repeatable)")
+    remove.add_argument("--id", action="append", type=int, default=[], help="Candidate id (repeatable)")
+
+    search = commands.add_parser("search", help="Rank the pool against a job description")
+    search.add_argument("--jd", required=True, help="Path to a text file containing the job description")
+    search.add_argument("--skills", required=True, help="Required skills, comma-separated")
+    search.add_argument("--top-k", type=int, default=300, help="Candidates retrieved for full scoring")
+    search.add_argument("--output", required=True, help="Output file (.jsonl or .csv)")
+    search.add_argument("--format", choices=["jsonl", "csv"], help="Output format (default: from extension)")
+    search.add_argument("--explain", action="store_true", help="Generate explanations (Gemini or fallback)")
+
+    commands.add_parser("stats", help="Show pool size and IVF layout")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    # Imported here so --help and argument errors don't pay for loading the NLP models
+    from matching.candidate_index import DEFAULT_DIM, CandidateIndex, stored_dim
+
+    if args.command in ("add", "search"):
+        from matching import skill_matcher
+        from pipeline.engine import ShortlistEngine, iter_directory
+        dim = skill_matcher.model.get_sentence_embedding_dimension()
+    else:
+        # stats / remove never encode: take the dimension from the index files
+        # (an index without vectors reads the same under any dimension)
+        dim = stored_dim(args.index, args.storage) or DEFAULT_DIM
+
+    index = CandidateIndex(args.index, dim=dim, nprobe=args.nprobe, storage=args.storage)
+
+    if args.command == "add":
+        engine = ShortlistEngine(max_workers=args.workers, timeout=args.timeout, explain=False)
+        report = engine.index_resumes(
+            iter_directory(args.resumes), index,
+            lambda done, name: print(f"[{done}] {name}", file=sys.stderr)
+        )
+        for error in report["errors"]:
+            print(f"Failed: {error['name']}: {error['error']}", file=sys.stderr)
+        print(f"Indexed {report['added']} resumes ({len(index)} in pool)", file=sys.stderr)
+
+    elif args.command == "remove":
+        removed = index.remove(ids=args.id, names=args.name)
+        print(f"Removed {removed} candidates ({len(index)} in pool)", file=sys.stderr)
+
+    elif args.command == "search":
+        with open(args.jd, encoding="utf-8") as f:
+            jd_text = f.read()
+        skills = [s.strip() for s in args.skills.split(",") if s.strip()]
+        fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+
+        engine = ShortlistEngine(explain=args.explain)
+        batch = engine.evaluate_pool(jd_text, skills, index, top_k=args.top_k)
+
+        rows = [_to_row(rank, result) for rank, result in enumerate(batch["results"], start=1)]
+        write_results(rows, args.output, fmt)
+        print(
+            f"Retrieved {batch['retrieved']} of {len(index)}, scored {batch['successful']} -> {args.output}",
+            file=sys.stderr
+        )
+
+    else:
+        for key, value in index.stats().items():
+            print(f"{key}: {value}")
+
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
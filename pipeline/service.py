@@ -0,0 +1,520 @@
+"""
+Scoring Service - Shared Local HTTP Backend
+One long-running process loads spaCy and the sentence encoder once and
+scores jobs for every client (Streamlit sessions, scripts), instead of
+each session loading its own models and competing for CPU.
+
+Jobs wait in a bounded queue and run on a fixed pool of worker threads.
+Document extraction runs concurrently (in subprocesses); model stages are
+serialized through one lock, which a job gives up while it waits on the
+encode broker (SHORTLIST_ENCODE_BROKER=1) so concurrent jobs share batches. When the queue is full, submissions are
+rejected with 429 and a Retry-After hint.
+
+API (JSON):
+    POST   /jobs               {"jd_text", "skills": [...], "resumes": [{"name", "content"}],
+                                "explain": bool}; content is base64
+                               -> 202 {"job_id", ...} | 429 queue full | 400 bad request
+                                  | 413 body over --max-body-mb
+    GET    /jobs/<id>          job status and progress
+    GET    /jobs/<id>/results  200 ranked results once finished, else 202 with the status
+    DELETE /jobs/<id>          cancel a queued or running job
+    GET    /health             queue depth, workers and model load status
+
+Example:
+    python -m pipeline.service --port 8765 --workers 2 --queue-size 16
+"""
+
+import argparse
+import base64
+import binascii
+import json
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import error as urlerror
+from urllib import request as urlrequest
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 256 * 1024 * 1024
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+
+class QueueFullError(Exception):
+    """The job queue is at capacity; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled."""
+
+
+class UploadedDocument:
+    """In-memory resume received over HTTP (the file interface extract_many expects)."""
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self._data = data
+
+    def read(self) -> bytes:
+        data, self._data = self._data, None
+        return data
+
+
+class Job:
+    """One submitted batch: inputs, progress and, once finished, its results."""
+
+    def __init__(self, jd_text: str, skills: list, documents: list, explain: bool):
+        self.id = uuid.uuid4().hex
+        self.jd_text = jd_text
+        self.skills = skills
+        self.documents = documents
+        self.explain = explain
+        self.state = "queued"
+        self.total = len(documents)
+        self.done = 0
+        self.error = None
+        self.results = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.cancel_event = threading.Event()
+
+    def status(self) -> dict:
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "done": self.done,
+            "total": self.total,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished
+        }
+
+
+class ScoringService:
+    """
+    Bounded job queue plus worker pool around one ShortlistEngine.
+
+    Args:
+        engine: Engine shared by all workers (default: a standard engine whose
+            model stages are serialized through a ModelLock)
+        workers: Jobs processed concurrently
+        queue_size: Jobs waiting beyond the running ones; more are rejected
+        max_finished: Finished jobs (and their results) kept for fetching;
+            the oldest are dropped first
+    """
+
+    def __init__(self, engine=None, workers: int = 2, queue_size: int = 16, max_finished: int = 256):
+        if engine is None:
+            from matching.encode_broker import ModelLock
+            from pipeline.engine import ShortlistEngine
+            engine = ShortlistEngine(model_lock=ModelLock())
+        self.engine = engine
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_finished = max_finished
+
+        # Unbounded: capacity is enforced on `_waiting`, so a cancelled job
+        # stops counting against queue_size before a worker dequeues it
+        self._queue = queue.Queue()
+        self._waiting = 0
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._seconds_per_job = None
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"scoring-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, jd_text: str, skills: list, documents: list, explain: bool = True) -> Job:
+        """Queue a job; raises QueueFullError when the queue is at capacity."""
+        job = Job(jd_text, skills, documents, explain)
+        with self._lock:
+            if self._waiting >= self.queue_size:
+                raise QueueFullError(self._retry_after())
+            self._waiting += 1
+            self._jobs[job.id] = job
+            self._queue.put_nowait(job)
+            self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Cancel a job. A queued job never starts; a running job stops after
+        the document in progress. Finished jobs are left unchanged.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state in FINISHED_STATES:
+                return job
+            job.cancel_event.set()
+            if job.state == "queued":
+                self._waiting -= 1
+                self._set_finished(job, "cancelled")
+        return job
+
+    def health(self) -> dict:
+        from utils.model_registry import REGISTRY
+        with self._lock:
+            states = [job.state for job in self._jobs.values()]
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "jobs": {state: states.count(state) for state in JOB_STATES},
+            "models": REGISTRY.timings()
+        }
+
+    def _retry_after(self) -> int:
+        # Time for one job slot to free up, from recent job durations
+        return max(1, round(self._seconds_per_job or 5))
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.state in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def _finish(self, job: Job, state: str, error: str = None) -> None:
+        with self._lock:
+            self._set_finished(job, state, error)
+
+    def _set_finished(self, job: Job, state: str, error: str = None) -> None:
+        # Caller holds self._lock
+        if job.state in FINISHED_STATES:
+            return
+        job.state = state
+        job.error = error
+        job.finished = time.time()
+        job.documents = None  # Release the uploaded bytes
+        self._prune()
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if not job.cancel_event.is_set():
+                    self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job: Job) -> None:
+        from pipeline.streaming import spill_record
+        from utils import logger
+        from utils.instrumentation import BatchMetrics, export_prometheus
+
+        with self._lock:
+            if job.state != "queued":
+                return
+            self._waiting -= 1
+            job.state = "running"
+            job.started = time.time()
+
+        def progress(done, name):
+            job.done = done
+            if job.cancel_event.is_set():
+                raise JobCancelled()
+
+        engine = self.engine
+        results = []
+        errors = []
+        try:
+            with engine.model_lock:
+                jd = engine.prepare_jd(job.jd_text, job.skills)
+            batch_metrics = BatchMetrics()
+            for result in engine.iter_results(
+                jd, job.documents, progress, explain=job.explain, batch_metrics=batch_metrics
+            ):
+                (errors if result["error"] else results).append(result)
+        except JobCancelled:
+            self._finish(job, "cancelled")
+            return
+        except Exception as e:
+            logger.log_error(f"job {job.id}", str(e))
+            self._finish(job, "failed", str(e) or type(e).__name__)
+            return
+
+        results.sort(key=lambda r: r["score_data"]["final_score"], reverse=True)
+
+        logger.log_batch_summary(job.total, len(results), len(errors), batch_metrics.summary())
+        export_prometheus()
+
+        job.results = {
+            "results": [spill_record(result) for result in results],
+            "errors": [{"name": error["name"], "error": error["error"]} for error in errors],
+            "total": len(results) + len(errors),
+            "successful": len(results),
+            "failed": len(errors),
+            "min_experience": jd["parsed"].get("min_experience", 0)
+        }
+        seconds = time.time() - job.started
+        self._seconds_per_job = seconds if self._seconds_per_job is None else 0.8 * self._seconds_per_job + 0.2 * seconds
+        self._finish(job, "done")
+
+
+def _parse_submission(body: dict) -> dict:
+    """Validate a POST /jobs body; raises ValueError with a client-facing message."""
+    jd_text = body.get("jd_text")
+    if not isinstance(jd_text, str) or not jd_text.strip():
+        raise ValueError("'jd_text' is required")
+    skills = body.get("skills", [])
+    if not isinstance(skills, list) or not all(isinstance(s, str) for s in skills):
+        raise ValueError("'skills' must be a list of strings")
+
+    resumes = body.get("resumes")
+    if not isinstance(resumes, list) or not resumes:
+        raise ValueError("'resumes' must be a non-empty list")
+    documents = []
+    for resume in resumes:
+        try:
+            documents.append(UploadedDocument(resume["name"], base64.b64decode(resume["content"], validate=True)))
+        except (KeyError, TypeError, binascii.Error):
+            raise ValueError("each resume needs a 'name' and base64 'content'") from None
+    return {
+        "jd_text": jd_text,
+        "skills": skills,
+        "documents": documents,
+        "explain": bool(body.get("explain", True))
+    }
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Routes the JSON API onto the server's ScoringService."""
+
+    server_version = "ShortlistService/1.0"
+
+    @property
+    def service(self) -> ScoringService:
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, payload: dict, headers: dict = None) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _job_or_404(self, job_id: str):
+        job = self.service.get(job_id)
+        if job is None:
+            self._send(404, {"error": f"Unknown job '{job_id}'"})
+        return job
+
+    def _path_parts(self) -> list:
+        return [part for part in self.path.split("?", 1)[0].split("/") if part]
+
+    def do_GET(self):
+        parts = self._path_parts()
+        if parts == ["health"]:
+            self._send(200, self.service.health())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                self._send(200, job.status())
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "results":
+            job = self._job_or_404(parts[1])
+            if job is None:
+                return
+            if job.state == "done":
+                self._send(200, {**job.status(), **job.results})
+            elif job.state in FINISHED_STATES:
+                self._send(409, job.status())
+            else:
+                self._send(202, job.status())
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self._path_parts() != ["jobs"]:
+            self._send(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send(400, {"error": "Invalid Content-Length header"})
+            return
+        if length > self.server.max_body_bytes:
+            self._send(413, {"error": f"Request body over {self.server.max_body_bytes} bytes"})
+            return
+        try:
+            submission = _parse_submission(json.loads(self.rfile.read(length) or b"{}"))
+        except (ValueError, AttributeError) as e:
+            self._send(400, {"error": str(e)})
+            return
+
+        try:
+            job = self.service.submit(**submission)
+        except QueueFullError as e:
+            self._send(429, {"error": str(e), "retry_after": e.retry_after},
+                       {"Retry-After": str(e.retry_after)})
+            return
+        self._send(202, {
+            **job.status(),
+            "status_url": f"/jobs/{job.id}",
+            "results_url": f"/jobs/{job.id}/results"
+        })
+
+    def do_DELETE(self):
+        parts = self._path_parts()
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._send(404, {"error": "Not found"})
+            return
+        job = self.service.cancel(parts[1])
+        if job is None:
+            self._send(404, {"error": f"Unknown job '{parts[1]}'"})
+        else:
+            self._send(200, job.status())
+
+
+def make_server(service: ScoringService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                verbose: bool = False, max_body_bytes: int = MAX_BODY_BYTES) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    server.max_body_bytes = max_body_bytes
+    return server
+
+
+class ServiceBusyError(Exception):
+    """The service rejected a job with 429; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ServiceClient:
+    """
+    Minimal client for the scoring service (stdlib only).
+
+    Args:
+        base_url: e.g. "http://127.0.0.1:8765"
+        timeout: Per-request socket timeout in seconds
+    """
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, payload: dict = None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urlrequest.Request(
+            self.base_url + path, data=data, method=method,
+            headers={"Content-Type": "application/json"} if data else {}
+        )
+        try:
+            with urlrequest.urlopen(request, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read())
+        except urlerror.HTTPError as e:
+            body = json.loads(e.read() or b"{}")
+            if e.code == 429:
+                raise ServiceBusyError(body.get("error", "Service busy"), int(body.get("retry_after", 1))) from None
+            if e.code in (404, 409):
+                return e.code, body
+            raise RuntimeError(f"Scoring service error {e.code}: {body.get('error')}") from None
+
+    def submit(self, jd_text: str, skills: list, files, explain: bool = True) -> dict:
+        """Upload resumes (objects with .name and .read()) and queue a job."""
+        resumes = [
+            {"name": file.name, "content": base64.b64encode(file.read()).decode("ascii")}
+            for file in files
+        ]
+        _, body = self._request("POST", "/jobs", {
+            "jd_text": jd_text, "skills": skills, "resumes": resumes, "explain": explain
+        })
+        return body
+
+    def status(self, job_id: str) -> dict:
+        return self._request("GET", f"/jobs/{job_id}")[1]
+
+    def results(self, job_id: str) -> dict:
+        return self._request("GET", f"/jobs/{job_id}/results")[1]
+
+    def cancel(self, job_id: str) -> dict:
+        return self._request("DELETE", f"/jobs/{job_id}")[1]
+
+    def health(self) -> dict:
+        return self._request("GET", "/health")[1]
+
+    def wait(self, job_id: str, poll_interval: float = 0.5, on_status=None) -> dict:
+        """Poll until the job finishes; returns the results (or final status if it did not succeed)."""
+        while True:
+            status = self.status(job_id)
+            if on_status:
+                on_status(status)
+            if status.get("state") in FINISHED_STATES or "state" not in status:
+                break
+            time.sleep(poll_interval)
+        return self.results(job_id) if status.get("state") == "done" else status
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run the local resume scoring service.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Bind address (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=2, help="Jobs processed concurrently")
+    parser.add_argument("--queue-size", type=int, default=16, help="Waiting jobs before submissions get 429")
+    parser.add_argument("--extract-workers", type=int, default=2, help="Extraction processes per job")
+    parser.add_argument("--max-body-mb", type=int, default=MAX_BODY_BYTES // (1024 * 1024),
+                        help="Largest accepted submission; bigger ones get 413")
+    parser.add_argument("--no-warm-up", action="store_true", help="Load models on the first job instead of at start")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from matching.encode_broker import ModelLock
+    from pipeline.engine import ShortlistEngine
+    from utils.model_registry import REGISTRY
+
+    if not args.no_warm_up:
+        REGISTRY.warm_up()
+    service = ScoringService(
+        ShortlistEngine(max_workers=args.extract_workers, model_lock=ModelLock()),
+        workers=args.workers,
+        queue_size=args.queue_size
+    )
+    server = make_server(service, args.host, args.port, args.verbose, args.max_body_mb * 1024 * 1024)
+    print(f"Scoring service on http://{args.host}:{args.port} "
+          f"({args.workers} workers, queue {args.queue_size})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
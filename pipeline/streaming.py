@@ -0,0 +1,125 @@
+"""
+Streaming Ranker - Bounded-Memory Batch Ranking
+Keeps only the best `top_k` candidates in memory while every full result
+is appended to a JSONL spill file, so a batch of any size runs in a fixed
+memory budget.
+"""
+
+import heapq
+import json
+import os
+import sys
+from array import array
+
+import numpy as np
+
+from matching.scorer import FEATURE_COLUMNS
+from utils.instrumentation import to_milliseconds
+from utils.logger import _convert_to_serializable
+
+
+def peak_rss_mb() -> dict:
+    """
+    Peak resident set size of this process and of its largest finished
+    child (MB). Both are None where `resource` is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return {"self": None, "workers": None}
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit, 1),
+        "workers": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit, 1)
+    }
+
+
+def spill_record(result: dict) -> dict:
+    """JSON-safe full record for a result (scored or failed)."""
+    record = {key: value for key, value in result.items() if key != "timings"}
+    if result.get("timings"):
+        record["timings_ms"] = to_milliseconds(result["timings"])
+    return _convert_to_serializable(record)
+
+
+class StreamingRanker:
+    """
+    Top-K heap plus on-disk spill of every result.
+
+    Besides the top K, every scored candidate's name, final score and
+    FEATURE_COLUMNS row (4 floats) are kept, so the whole batch can be
+    re-ranked under new weights (see feature_table()).
+
+    Args:
+        top_k: Candidates kept in memory (the best by final score)
+        spill_path: JSONL file receiving every result, scored or failed
+            (None = keep nothing beyond the top K)
+    """
+
+    def __init__(self, top_k: int = 50, spill_path: str = None):
+        self.top_k = top_k
+        self.spill_path = spill_path
+        self._heap = []  # (final_score, seq, result); min-heap, so the worst is on top
+        self._seq = 0
+        self.successful = 0
+        self.failed = 0
+        self.truncated = []  # Names of documents cut short by the page cap
+        self._names = []
+        self._scores = array("d")
+        self._features = array("d")  # Flat FEATURE_COLUMNS rows
+
+        self._spill = None
+        if spill_path:
+            os.makedirs(os.path.dirname(spill_path) or ".", exist_ok=True)
+            self._spill = open(spill_path, "w", encoding="utf-8")
+
+    def add(self, result: dict) -> None:
+        if self._spill is not None:
+            self._spill.write(json.dumps(spill_record(result)) + "\n")
+
+        if result["error"]:
+            self.failed += 1
+            return
+        self.successful += 1
+        if result.get("truncated"):
+            self.truncated.append(result["name"])
+        self._names.append(result["name"])
+        self._scores.append(result["score_data"]["final_score"])
+        self._features.extend(result["features"][column] for column in FEATURE_COLUMNS)
+
+        # Earlier results win ties, as with a stable sort
+        self._seq += 1
+        item = (result["score_data"]["final_score"], -self._seq, result)
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def ranked(self) -> list:
+        """The kept results, best first."""
+        return [result for _, _, result in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+    def feature_table(self) -> tuple:
+        """
+        (names, final scores, (n, len(FEATURE_COLUMNS)) float64 features) for
+        every scored candidate, in arrival order, for scorer.rerank().
+        """
+        features = np.frombuffer(self._features, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+        return list(self._names), np.array(self._scores), features.copy()
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def summary(self) -> dict:
+        return {
+            "total": self.successful + self.failed,
+            "successful": self.successful,
+            "failed": self.failed,
+            "kept": len(self._heap),
+            "truncated": self.truncated,
+            "spill_path": self.spill_path,
+            "peak_rss_mb": peak_rss_mb()
+        }
@@ -0,0 +1,190 @@
+"""
+ExplanationService against a local http.server stub of generateContent.
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import json
+import re
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from explanation.async_explainer import ExplanationService
+from explanation.gemini_explainer import _generate_fallback_explanation
+
+
+class _StubGemini(ThreadingHTTPServer):
+    """
+    Answers generateContent requests with one "explained <name>" line per
+    candidate in the prompt. Statuses queued in `failures` are returned
+    (one per request) before any success.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.delay = delay
+        self.failures = []
+        self.always_fail = None
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1beta"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["contents"][0]["parts"][0]["text"]
+
+        with server.lock:
+            server.requests.append({
+                "path": self.path,
+                "headers": {key.lower(): value for key, value in self.headers.items()},
+                "prompt": prompt
+            })
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            status = server.failures.pop(0) if server.failures else server.always_fail
+        try:
+            time.sleep(server.delay)
+            if status:
+                self.send_response(status)
+                self.end_headers()
+                return
+
+            names = re.findall(r"'name': '([^']+)'", prompt)
+            if len(names) == 1 and "### Candidate" not in prompt:
+                text = f"explained {names[0]}"
+            else:
+                text = "\n".join(f"### Candidate {i}\nexplained {name}" for i, name in enumerate(names, 1))
+            payload = json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+def _score_data(name: str) -> dict:
+    return {
+        "name": name,
+        "final_score": 72.5,
+        "skill_match": "3/4",
+        "experience_match": "4 years (min 2)",
+        "matched_skills": ["python", "sql", "docker"],
+        "missing_skills": ["kubernetes"]
+    }
+
+
+class ExplanationServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = _StubGemini()
+        self.thread = threading.Thread(target=self.stub.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.stub.shutdown()
+        self.stub.server_close()
+        self.thread.join()
+
+    def service(self, **kwargs) -> ExplanationService:
+        kwargs.setdefault("backoff", 0.01)
+        kwargs.setdefault("timeout", 5.0)
+        return ExplanationService(api_key="test-key", endpoint=self.stub.url, **kwargs)
+
+    def test_explains_in_input_order(self):
+        datas = [_score_data(f"c{i}") for i in range(5)]
+        explanations = self.service().explain_all(datas)
+        self.assertEqual(explanations, [f"explained c{i}" for i in range(5)])
+
+    def test_api_key_sent_in_header(self):
+        self.service().explain_all([_score_data("c0")])
+        request = self.stub.requests[0]
+        self.assertEqual(request["headers"].get("x-goog-api-key"), "test-key")
+        self.assertNotIn("test-key", request["path"])
+        self.assertTrue(request["path"].endswith("/models/gemini-1.5-flash:generateContent"))
+
+    def test_concurrency_limit(self):
+        self.stub.delay = 0.1
+        datas = [_score_data(f"c{i}") for i in range(8)]
+        self.service(max_concurrency=2).explain_all(datas)
+        self.assertEqual(len(self.stub.requests), 8)
+        self.assertEqual(self.stub.max_in_flight, 2)
+
+    def test_retries_rate_limits_and_server_errors(self):
+        self.stub.failures = [429, 503, 500]
+        service = self.service(max_retries=3)
+        self.assertEqual(service.explain_all([_score_data("c0")]), ["explained c0"])
+        self.assertEqual(len(self.stub.requests), 4)
+        self.assertEqual(service.stats()["api_calls"], 4)
+
+    def test_backoff_grows_between_retries(self):
+        self.stub.failures = [503, 503]
+        start = time.perf_counter()
+        self.service(max_retries=2, backoff=0.1).explain_all([_score_data("c0")])
+        # 0.1s then 0.2s, each plus up to 50% jitter
+        self.assertGreaterEqual(time.perf_counter() - start, 0.3)
+
+    def test_client_errors_are_not_retried(self):
+        self.stub.failures = [400]
+        data = _score_data("c0")
+        self.assertEqual(self.service().explain_all([data]), [_generate_fallback_explanation(data)])
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_packed_prompts(self):
+        datas = [_score_data(f"c{i}") for i in range(6)]
+        explanations = self.service(pack_size=3).explain_all(datas)
+        self.assertEqual(explanations, [f"explained c{i}" for i in range(6)])
+        self.assertEqual(len(self.stub.requests), 2)
+        for request in self.stub.requests:
+            self.assertEqual(len(re.findall(r"^### Candidate \d+$", request["prompt"], re.MULTILINE)), 3)
+
+    def test_cache_never_calls_stub_twice(self):
+        service = self.service()
+        datas = [_score_data("c0"), _score_data("c1"), _score_data("c0")]
+        first = service.explain_all(datas)
+        self.assertEqual(len(self.stub.requests), 2)
+
+        second = service.explain_all(datas + [dict(_score_data("c1"))])
+        self.assertEqual(second[:3], first)
+        self.assertEqual(len(self.stub.requests), 2)
+        self.assertEqual(service.stats()["cache_hits"], 4)
+
+    def test_fallback_when_stub_fails(self):
+        self.stub.always_fail = 503
+        service = self.service(max_retries=1)
+        datas = [_score_data("c0"), _score_data("c1")]
+        self.assertEqual(service.explain_all(datas), [_generate_fallback_explanation(d) for d in datas])
+        self.assertEqual(len(self.stub.requests), 4)
+
+        # Fallbacks are not cached: the next call tries the API again
+        self.stub.always_fail = None
+        self.assertEqual(service.explain_all(datas), ["explained c0", "explained c1"])
+
+    def test_packed_fallback_to_single_prompts(self):
+        self.stub.failures = [500]
+        datas = [_score_data(f"c{i}") for i in range(3)]
+        explanations = self.service(pack_size=3, max_retries=0).explain_all(datas)
+        self.assertEqual(explanations, [f"explained c{i}" for i in range(3)])
+        self.assertEqual(len(self.stub.requests), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
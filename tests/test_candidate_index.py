@@ -0,0 +1,123 @@
+"""
+CandidateIndex: IVF search against brute force, removal and reload.
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from matching.candidate_index import CandidateIndex, stored_dim
+
+DIM = 32
+
+
+def _clustered(n: int, clusters: int = 40, seed: int = 0) -> np.ndarray:
+    """Unit vectors scattered around `clusters` random centres, like real resume embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, DIM))
+    vectors = centres[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, DIM))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _add(index: CandidateIndex, vectors: np.ndarray, start: int = 0) -> list:
+    names = [f"r{i}.pdf" for i in range(start, start + len(vectors))]
+    return index.add(names, [f"hash-{i}" for i in range(start, start + len(vectors))], names, vectors)
+
+
+class CandidateIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def index(self, **kwargs) -> CandidateIndex:
+        kwargs.setdefault("dim", DIM)
+        index = CandidateIndex(self.path, **kwargs)
+        self.addCleanup(index.close)
+        return index
+
+    def test_small_pool_search_is_exact(self):
+        index = self.index()
+        vectors = _clustered(200)
+        ids = _add(index, vectors)
+        query = vectors[17]
+        results = index.search(query, top_k=5)
+        self.assertEqual(results[0][0], ids[17])
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+        self.assertEqual([r[0] for r in results], [r[0] for r in index.search(query, top_k=5, exact=True)])
+
+    def test_ivf_recall_against_brute_force(self):
+        index = self.index(ivf_threshold=1000, nprobe=8)
+        vectors = _clustered(3000)
+        ids = np.asarray(_add(index, vectors))
+        self.assertGreater(index.stats()["ivf_lists"], 1)
+
+        queries = _clustered(50, seed=1)
+        recalls = []
+        for query in queries:
+            exact = ids[np.argsort(-(vectors @ query))[:10]]
+            found = [candidate_id for candidate_id, _ in index.search(query, top_k=10)]
+            recalls.append(len(set(found) & set(exact.tolist())) / 10)
+        self.assertGreaterEqual(np.mean(recalls), 0.9)
+
+    def test_removed_candidates_are_never_returned(self):
+        index = self.index(ivf_threshold=500)
+        vectors = _clustered(800)
+        ids = _add(index, vectors)
+        removed = ids[:100]
+        self.assertEqual(index.remove(ids=removed), 100)
+        self.assertEqual(len(index), 700)
+        for query in vectors[:20]:
+            found = {candidate_id for candidate_id, _ in index.search(query, top_k=50)}
+            self.assertFalse(found & set(removed))
+
+    def test_readding_a_hash_replaces_it(self):
+        index = self.index()
+        vectors = _clustered(10)
+        _add(index, vectors)
+        new_id = _add(index, vectors[3:4] * -1, start=3)[0]
+        self.assertEqual(len(index), 10)
+        self.assertEqual(index.search(-vectors[3], top_k=1)[0][0], new_id)
+
+    def test_reload_matches_before_and_after_snapshot(self):
+        for storage in ("float32", "int8"):
+            with self.subTest(storage=storage):
+                shutil.rmtree(self.path, ignore_errors=True)
+                index = CandidateIndex(self.path, dim=DIM, ivf_threshold=1000, storage=storage)
+                vectors = _clustered(1500)
+                # Retraining writes a snapshot; later changes stay in the database only
+                _add(index, vectors[:1200])
+                _add(index, vectors[1200:], start=1200)
+                index.remove(names=["r5.pdf"])
+                queries = vectors[:10]
+                before = [index.search(query, top_k=10) for query in queries]
+                index.close()
+
+                self.assertEqual(stored_dim(self.path, storage), DIM)
+                reloaded = CandidateIndex(self.path, dim=DIM, ivf_threshold=1000, storage=storage)
+                self.assertEqual(len(reloaded), 1499)
+                self.assertEqual(reloaded.storage, storage)
+                after = [reloaded.search(query, top_k=10) for query in queries]
+                reloaded.close()
+                self.assertEqual(
+                    [[r[0] for r in result] for result in before],
+                    [[r[0] for r in result] for result in after]
+                )
+
+    def test_get_returns_metadata_in_order(self):
+        index = self.index()
+        ids = _add(index, _clustered(3))
+        rows = index.get([ids[2], ids[0], 999])
+        self.assertEqual([row["name"] for row in rows], ["r2.pdf", "r0.pdf"])
+        self.assertTrue(index.contains("hash-1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+EmbeddingCache: memory-mapped store, journal replay and slot reuse.
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from utils.embedding_cache import EmbeddingCache
+
+DIM = 8
+
+
+class _CountingModel:
+    """Stand-in encoder: a fixed vector per text, counting what it encodes."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **encode_kwargs):
+        self.encoded.extend(texts)
+        return np.stack([_vector(text) for text in texts])
+
+
+def _vector(text: str) -> np.ndarray:
+    rng = np.random.default_rng(sum(map(ord, text)) * 7919 + len(text))
+    return rng.normal(size=DIM).astype(np.float32)
+
+
+class EmbeddingCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def cache(self, **kwargs) -> EmbeddingCache:
+        return EmbeddingCache("test-model", DIM, cache_dir=self.cache_dir, **kwargs)
+
+    def test_encodes_each_text_once(self):
+        cache = self.cache()
+        model = _CountingModel()
+        vectors = cache.encode(model, ["python", "sql", "python"])  # Three misses, two encoded
+        self.assertEqual(model.encoded, ["python", "sql"])
+        np.testing.assert_allclose(vectors[2], _vector("python"))
+
+        single = cache.encode(model, "sql")
+        self.assertEqual(single.shape, (DIM,))
+        self.assertEqual(model.encoded, ["python", "sql"])
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_reload_replays_the_journal(self):
+        cache = self.cache()
+        texts = [f"skill {i}" for i in range(20)]
+        cache.encode(_CountingModel(), texts)
+        # New entries are journaled, not folded into the snapshot
+        with open(os.path.join(cache.path, "index.log")) as f:
+            self.assertEqual(len(f.readlines()), 20)
+
+        model = _CountingModel()
+        reloaded = self.cache()
+        vectors = reloaded.encode(model, texts)
+        self.assertEqual(model.encoded, [])
+        np.testing.assert_allclose(vectors, np.stack([_vector(text) for text in texts]))
+
+    def test_torn_journal_line_is_ignored(self):
+        cache = self.cache()
+        cache.encode(_CountingModel(), ["a", "b"])
+        with open(os.path.join(cache.path, "index.log"), "a") as f:
+            f.write('["partial", 5')
+
+        model = _CountingModel()
+        self.cache().encode(model, ["a", "b", "c"])
+        self.assertEqual(model.encoded, ["c"])
+
+    def test_full_store_reuses_least_recently_used_slots(self):
+        cache = self.cache(max_entries=4, memory_entries=0)
+        cache.encode(_CountingModel(), ["a", "b", "c", "d"])
+        cache.get("a")  # "b" is now the least recently used
+        cache.encode(_CountingModel(), ["e"])
+
+        reloaded = self.cache(max_entries=4, memory_entries=0)
+        self.assertIsNone(reloaded.get("b"))
+        for text in ("a", "c", "d", "e"):
+            np.testing.assert_allclose(reloaded.get(text), _vector(text))
+
+    def test_journal_is_compacted_into_the_snapshot(self):
+        cache = self.cache(max_entries=3000)
+        for start in range(0, 1500, 100):
+            cache.encode(_CountingModel(), [f"t{i}" for i in range(start, start + 100)])
+        # Folded into index.json once the journal passed 1024 lines
+        with open(os.path.join(cache.path, "index.log")) as f:
+            self.assertLess(len(f.readlines()), 1024)
+
+        model = _CountingModel()
+        self.cache(max_entries=3000).encode(model, [f"t{i}" for i in range(0, 1500, 100)])
+        self.assertEqual(model.encoded, [])
+
+    def test_quantized_storage_round_trip(self):
+        for storage in ("float16", "int8"):
+            with self.subTest(storage=storage):
+                cache = self.cache(storage=storage, memory_entries=0)
+                cache.encode(_CountingModel(), ["python"])
+                stored = self.cache(storage=storage, memory_entries=0).get("python")
+                np.testing.assert_allclose(stored, _vector("python"), atol=0.05)
+
+    def test_shape_change_discards_the_index(self):
+        self.cache(max_entries=10).encode(_CountingModel(), ["a"])
+        model = _CountingModel()
+        self.cache(max_entries=20).encode(model, ["a"])
+        self.assertEqual(model.encoded, ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+EncodeBroker: coalescing concurrent requests, option grouping and
+ModelLock release while waiting.
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import threading
+import unittest
+
+import numpy as np
+
+from matching.encode_broker import EncodeBroker, ModelLock
+
+
+class _RecordingEncoder:
+    """Stand-in model: row i is [len(text), batch position]; records every forward pass."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, batch_size=None, **encode_kwargs):
+        self.calls.append((list(texts), encode_kwargs))
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+class EncodeBrokerTest(unittest.TestCase):
+
+    def broker(self, encoder, **kwargs) -> EncodeBroker:
+        broker = EncodeBroker(encoder, **kwargs)
+        self.addCleanup(broker.close)
+        return broker
+
+    def test_rows_match_each_request(self):
+        broker = self.broker(_RecordingEncoder())
+        rows = broker.encode(["a", "bbb", "a"])
+        self.assertEqual(rows[:, 0].tolist(), [1, 3, 1])
+        self.assertEqual(broker.encode("cc").shape, (2,))
+        self.assertEqual(len(broker.encode([])), 0)
+
+    def test_concurrent_requests_share_a_forward_pass(self):
+        encoder = _RecordingEncoder()
+        broker = self.broker(encoder, max_wait_ms=200)
+        futures = [broker.submit([f"text {i}", "shared"]) for i in range(10)]
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(len(encoder.calls), 1)
+        # Duplicates across requests are encoded once
+        self.assertEqual(len(encoder.calls[0][0]), 11)
+        self.assertTrue(all(result.shape == (2, 2) for result in results))
+        self.assertEqual(broker.stats()["requests"], 10)
+
+    def test_batch_is_sent_when_full(self):
+        encoder = _RecordingEncoder()
+        broker = self.broker(encoder, max_batch_size=4, max_wait_ms=200)
+        futures = [broker.submit([f"t{i}"]) for i in range(8)]
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual([len(texts) for texts, _ in encoder.calls], [4, 4])
+
+    def test_requests_with_other_options_are_deferred_and_merged(self):
+        encoder = _RecordingEncoder()
+        broker = self.broker(encoder, max_wait_ms=200)
+        futures = [
+            broker.submit([f"t{i}"], normalize_embeddings=bool(i % 2)) for i in range(6)
+        ]
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(
+            sorted((len(texts), tuple(kwargs.items())) for texts, kwargs in encoder.calls),
+            [(3, (("normalize_embeddings", False),)), (3, (("normalize_embeddings", True),))]
+        )
+
+    def test_errors_reach_every_caller_in_the_batch(self):
+        def failing(texts, **encode_kwargs):
+            raise RuntimeError("model failed")
+
+        broker = self.broker(failing, max_wait_ms=50)
+        futures = [broker.submit(["a"]), broker.submit(["b"])]
+        for future in futures:
+            with self.assertRaisesRegex(RuntimeError, "model failed"):
+                future.result(timeout=5)
+
+    def test_model_lock_is_released_while_waiting(self):
+        encoder = _RecordingEncoder()
+        broker = self.broker(encoder, max_wait_ms=300)
+        lock = ModelLock()
+        shapes = []
+
+        def job(i):
+            with lock:
+                shapes.append(broker.encode([f"job {i}"]).shape)
+                self.assertTrue(lock.locked())
+
+        threads = [threading.Thread(target=job, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        # Had the lock been held across encode, each job would get its own pass
+        self.assertEqual(len(encoder.calls), 1)
+        self.assertEqual(shapes, [(1, 2)] * 4)
+
+    def test_closed_broker_rejects_requests(self):
+        broker = EncodeBroker(_RecordingEncoder())
+        broker.close()
+        with self.assertRaises(RuntimeError):
+            broker.submit(["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+ResultCache: keying on the pipeline version, expiry and the size budget.
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utils import result_cache, skill_taxonomy
+from utils.result_cache import ResultCache, jd_key, pipeline_version, result_key
+
+RESUME = b"%PDF-1.4 resume bytes"
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        # Stands in for the hash of the scoring code and model versions
+        patcher = mock.patch.object(result_cache, "_code_fingerprint", return_value="code-v1")
+        self.code_fingerprint = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def cache(self, **kwargs) -> ResultCache:
+        cache = ResultCache(os.path.join(self.tmp, "results.db"), **kwargs)
+        self.addCleanup(cache._conn.close)
+        return cache
+
+    def key(self, extra: dict = None) -> str:
+        return result_key(jd_key("Python developer", ["python"], pipeline_version(extra)), RESUME)
+
+    def test_hit_under_the_same_version(self):
+        cache = self.cache()
+        cache.put(self.key(), {"score": 80})
+        self.assertEqual(cache.get(self.key()), {"score": 80})
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_miss_when_the_code_changes(self):
+        cache = self.cache()
+        cache.put(self.key(), {"score": 80})
+        self.code_fingerprint.return_value = "code-v2"
+        self.assertIsNone(cache.get(self.key()))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_miss_when_settings_or_skills_change(self):
+        cache = self.cache()
+        cache.put(self.key({"weights": [0.5, 0.3, 0.2]}), {"score": 80})
+        self.assertIsNone(cache.get(self.key({"weights": [0.4, 0.4, 0.2]})))
+
+        key = self.key()
+        cache.put(key, {"score": 80})
+        with mock.patch.object(skill_taxonomy, "TECH_SKILLS", skill_taxonomy.TECH_SKILLS | {"zig"}):
+            self.assertNotEqual(self.key(), key)
+
+    def test_key_covers_jd_skills_and_document(self):
+        version = pipeline_version()
+        base = jd_key("Python developer", ["python"], version)
+        self.assertNotEqual(base, jd_key("Python developer", ["python", "sql"], version))
+        self.assertEqual(base, jd_key("Python developer", ["python"], version))
+        self.assertNotEqual(result_key(base, RESUME), result_key(base, RESUME + b" "))
+
+    def test_expired_entries_are_not_returned(self):
+        cache = self.cache(max_age_days=1)
+        cache.put("k", {"score": 1})
+        with mock.patch.object(result_cache.time, "time", return_value=time.time() + 2 * 86400):
+            self.assertIsNone(cache.get("k"))
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache = self.cache(max_bytes=100)
+        for key in ("a", "b", "c"):
+            cache.put(key, {"pad": "x" * 20})
+            time.sleep(0.01)
+        cache.get("a")
+        cache.put("d", {"pad": "x" * 20})
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertLessEqual(cache.stats()["bytes"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
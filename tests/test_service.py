@@ -0,0 +1,148 @@
+"""
+ScoringService over HTTP with a stand-in engine: queue limits (429),
+cancellation and request validation.
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import http.client
+import json
+import threading
+import time
+import unittest
+from contextlib import nullcontext
+
+from pipeline.service import (
+    ScoringService, ServiceBusyError, ServiceClient, UploadedDocument, make_server
+)
+
+
+class _Upload:
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self._data = data
+
+    def read(self) -> bytes:
+        return self._data
+
+
+class _BlockingEngine:
+    """Holds every job in prepare_jd until `release` is set; reports progress so jobs can be cancelled."""
+
+    model_lock = nullcontext()
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+
+    def prepare_jd(self, jd_text, skills):
+        self.started.release()
+        self.release.wait(10)
+        return {"parsed": {"min_experience": 0}}
+
+    def iter_results(self, jd, documents, progress, **kwargs):
+        progress(0, None)  # Raises JobCancelled for a cancelled job
+        return iter([])
+
+
+class ScoringServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = _BlockingEngine()
+        self.service = ScoringService(self.engine, workers=1, queue_size=2)
+        self.server = make_server(self.service, port=0, max_body_bytes=4096)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = ServiceClient(f"http://127.0.0.1:{self.server.server_address[1]}", timeout=5)
+
+    def tearDown(self):
+        # Cancel before releasing so no job reaches result logging
+        with self.service._lock:
+            jobs = list(self.service._jobs.values())
+        for job in jobs:
+            self.service.cancel(job.id)
+        self.engine.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def submit(self) -> dict:
+        return self.client.submit("Python developer", ["python"], [_Upload("a.pdf", b"%PDF")])
+
+    def test_queue_full_returns_429_until_a_job_is_cancelled(self):
+        running = self.submit()
+        self.assertTrue(self.engine.started.acquire(timeout=5))
+        waiting = [self.submit(), self.submit()]
+        self.assertEqual([job["state"] for job in waiting], ["queued", "queued"])
+
+        with self.assertRaises(ServiceBusyError) as raised:
+            self.submit()
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+
+        cancelled = self.client.cancel(waiting[0]["job_id"])
+        self.assertEqual(cancelled["state"], "cancelled")
+        # The cancelled job's slot is free before any worker dequeues it
+        self.assertEqual(self.submit()["state"], "queued")
+        self.assertEqual(self.client.status(running["job_id"])["state"], "running")
+
+    def test_cancel_running_job(self):
+        job = self.submit()
+        self.assertTrue(self.engine.started.acquire(timeout=5))
+        self.client.cancel(job["job_id"])
+        self.engine.release.set()
+
+        final = self.client.wait(job["job_id"], poll_interval=0.05)
+        self.assertEqual(final["state"], "cancelled")
+        status, _ = self.client._request("GET", f"/jobs/{job['job_id']}/results")
+        self.assertEqual(status, 409)
+
+    def test_cancelled_queued_job_never_starts(self):
+        self.submit()
+        self.assertTrue(self.engine.started.acquire(timeout=5))
+        queued = self.submit()
+        self.client.cancel(queued["job_id"])
+        self.engine.release.set()
+        time.sleep(0.2)
+        self.assertFalse(self.engine.started.acquire(timeout=0))
+        self.assertEqual(self.client.status(queued["job_id"])["state"], "cancelled")
+
+    def test_unknown_job_is_404(self):
+        status, body = self.client._request("GET", "/jobs/missing")
+        self.assertEqual(status, 404)
+        self.assertIn("error", body)
+
+    def post(self, body: bytes, content_length: str):
+        connection = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+        self.addCleanup(connection.close)
+        connection.putrequest("POST", "/jobs")
+        connection.putheader("Content-Length", content_length)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_malformed_content_length_is_400(self):
+        for value in ("abc", "-1"):
+            with self.subTest(content_length=value):
+                status, body = self.post(b"{}", value)
+                self.assertEqual(status, 400)
+                self.assertIn("Content-Length", body["error"])
+
+    def test_oversized_body_is_413(self):
+        status, _ = self.post(b"{}", "5000")
+        self.assertEqual(status, 413)
+
+    def test_invalid_submission_is_400(self):
+        body = json.dumps({"jd_text": "Python developer", "skills": ["python"], "resumes": []}).encode()
+        status, response = self.post(body, str(len(body)))
+        self.assertEqual(status, 400)
+        self.assertIn("resumes", response["error"])
+
+    def test_uploaded_document_is_read_once(self):
+        document = UploadedDocument("a.pdf", b"data")
+        self.assertEqual(document.read(), b"data")
+        self.assertIsNone(document.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,237 @@
+"""
+Audit Store - Indexed Lookup of Past Scoring Decisions
+SQLite (stdlib) copy of the JSONL audit trail, indexed by jd_hash,
+resume_hash, resume_name and timestamp, so compliance questions such as
+"what did we score candidate X against JD Y last quarter?" are answered
+without scanning the log.
+
+Each row keeps the original JSON entry verbatim; the indexed columns are
+only a lookup aid. The JSONL file remains the primary record.
+
+Usage:
+    python -m utils.audit_store import logs/audit_log.jsonl logs/audit_log.*.jsonl.gz
+    python -m utils.audit_store query --resume-name alice.pdf --since 2026-07-01
+    python -m utils.audit_store query --jd-hash 3f2a9c0d1b7e4a55 --limit 20
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+DB_PATH = os.path.join("logs", "audit.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY,
+    entry_hash TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    resume_name TEXT,
+    jd_hash TEXT,
+    resume_hash TEXT,
+    final_score REAL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_decisions_timestamp ON decisions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_decisions_jd ON decisions (jd_hash, timestamp);
+CREATE INDEX IF NOT EXISTS idx_decisions_resume_hash ON decisions (resume_hash, timestamp);
+CREATE INDEX IF NOT EXISTS idx_decisions_resume_name ON decisions (resume_name, timestamp);
+"""
+
+
+def _row(entry: dict, raw: str = None) -> tuple:
+    """
+    Map an audit entry to a decisions row. Entries without event_type are
+    scoring decisions. `raw` defaults to the entry's JSONL line, so live and
+    imported copies of the same entry deduplicate.
+    """
+    raw = raw if raw is not None else json.dumps(entry)
+    return (
+        hashlib.sha256(raw.encode()).hexdigest(),
+        entry.get("timestamp", ""),
+        entry.get("event_type", "decision"),
+        entry.get("resume_name"),
+        entry.get("jd_hash"),
+        entry.get("resume_hash"),
+        entry.get("final_score"),
+        raw
+    )
+
+
+def _open_log(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+class AuditStore:
+    """
+    SQLite-backed audit index.
+
+    Safe to share between threads: all access goes through one connection
+    guarded by a lock. Inserting an entry that is already stored is a no-op,
+    so re-importing a log never creates duplicates.
+
+    Args:
+        path: Database file (created if missing)
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def add_many(self, entries: list) -> int:
+        """Insert JSON-safe audit entries in one transaction. Returns rows added."""
+        return self._insert([_row(entry) for entry in entries])
+
+    def _insert(self, rows: list) -> int:
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO decisions "
+                "(entry_hash, timestamp, event_type, resume_name, jd_hash, resume_hash, final_score, entry) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return self._conn.total_changes - before
+
+    def import_jsonl(self, path: str, chunk_size: int = 5000) -> int:
+        """
+        Load an existing audit log (plain or gzipped rotated segment).
+        Malformed lines are skipped. Returns rows added.
+        """
+        added = 0
+        rows = []
+        with _open_log(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                rows.append(_row(entry, line))
+                if len(rows) >= chunk_size:
+                    added += self._insert(rows)
+                    rows = []
+        if rows:
+            added += self._insert(rows)
+        return added
+
+    def query(
+        self,
+        jd_hash: str = None,
+        resume_hash: str = None,
+        resume_name: str = None,
+        since: str = None,
+        until: str = None,
+        event_type: str = "decision",
+        limit: int = 100
+    ) -> list:
+        """
+        Return matching audit entries (as originally logged), newest first.
+
+        `since`/`until` are ISO-8601 timestamps or dates compared against the
+        entry timestamp (UTC); `until` is exclusive. Pass event_type=None to
+        include errors and batch summaries.
+        """
+        clauses = []
+        params = []
+        for column, value in (
+            ("jd_hash", jd_hash),
+            ("resume_hash", resume_hash),
+            ("resume_name", resume_name),
+            ("event_type", event_type)
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until)
+
+        sql = "SELECT entry FROM decisions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row["entry"]) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Import and query the indexed audit store.")
+    parser.add_argument("--db", default=DB_PATH, help=f"Database path (default: {DB_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Load JSONL audit logs (.jsonl or .jsonl.gz)")
+    importer.add_argument("logs", nargs="+", help="Audit log files")
+
+    query = commands.add_parser("query", help="Look up past decisions (JSONL to stdout)")
+    query.add_argument("--jd-hash")
+    query.add_argument("--resume-hash")
+    query.add_argument("--resume-name")
+    query.add_argument("--since", help="ISO date/time, inclusive")
+    query.add_argument("--until", help="ISO date/time, exclusive")
+    query.add_argument("--event-type", default="decision",
+                       help="decision, error, batch_summary or 'any' (default: decision)")
+    query.add_argument("--limit", type=int, default=100)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    store = AuditStore(args.db)
+
+    if args.command == "import":
+        for path in args.logs:
+            added = store.import_jsonl(path)
+            print(f"{path}: {added} new entries", file=sys.stderr)
+        print(f"{store.count()} entries in {args.db}", file=sys.stderr)
+    else:
+        entries = store.query(
+            jd_hash=args.jd_hash,
+            resume_hash=args.resume_hash,
+            resume_name=args.resume_name,
+            since=args.since,
+            until=args.until,
+            event_type=None if args.event_type == "any" else args.event_type,
+            limit=args.limit
+        )
+        for entry in entries:
+            print(json.dumps(entry))
+
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
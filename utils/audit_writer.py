@@ -0,0 +1,279 @@
+"""
+Audit Writer - Non-Blocking JSONL Audit Log
+A background thread encodes queued entries, writes them in batches and
+rotates/compresses full segments, so scoring never waits on disk I/O.
+Batches that fail to write are kept and retried with backoff.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+
+_STOP = object()
+
+FSYNC_POLICIES = ("never", "batch", "interval")
+
+# Backoff between attempts to write a batch that failed (seconds)
+RETRY_INITIAL = 0.5
+RETRY_MAX = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """
+    Queue-backed JSONL writer.
+
+    Args:
+        path: Active log file (e.g. logs/audit_log.jsonl)
+        serialize: Callable turning an entry into a JSON-safe object. Runs
+            in write(), on the caller's thread, so later changes to the
+            caller's lists and dicts never reach the log
+        max_batch: Write once this many entries are pending
+        flush_interval: ...or once the oldest pending entry is this old (s)
+        fsync: "never" (leave it to the OS), "batch" (after every write) or
+            "interval" (at most once per fsync_interval seconds)
+        fsync_interval: Seconds between fsyncs for the "interval" policy
+        max_bytes: Rotate when the active file reaches this size (0 = never)
+        rotate_daily: Also rotate when the UTC date changes
+        compress: Gzip rotated segments
+        queue_size: Pending entries before write() blocks (entries are never
+            dropped; while writes are failing, at most this many are held)
+        sinks: Callables given each written batch of serialized entries, after
+            the JSONL write (e.g. AuditStore.add_many)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        serialize=None,
+        max_batch: int = 256,
+        flush_interval: float = 0.5,
+        fsync: str = "interval",
+        fsync_interval: float = 5.0,
+        max_bytes: int = 50 * 1024 * 1024,
+        rotate_daily: bool = False,
+        compress: bool = True,
+        queue_size: int = 10000,
+        sinks: list = None
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+
+        self.path = path
+        self.serialize = serialize or (lambda entry: entry)
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self.sinks = list(sinks or [])
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._segment_date = None
+        self._last_fsync = time.monotonic()
+        self._closed = False
+        self._queue_size = queue_size
+        # Last write failure, or None once a batch has been written again
+        self.error = None
+
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # Producer side
+
+    def write(self, entry: dict) -> None:
+        """Snapshot an entry with `serialize` and queue it. JSON encoding and I/O happen on the writer thread."""
+        if self._closed:
+            raise RuntimeError("Audit log writer is closed")
+        try:
+            entry = self.serialize(entry)
+        except (TypeError, ValueError) as e:
+            logger.error("Unserializable audit entry dropped: %s", e)
+            return
+        self._queue.put(entry)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Block until everything queued so far is written. Returns False on
+        timeout, or if the write failed (the entries are kept and retried;
+        see `error`).
+        """
+        if self._closed:
+            return self.error is None
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout) and request.ok
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Drain the queue, write the final batch and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # Writer thread
+
+    def _open(self) -> None:
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._segment_date = datetime.utcnow().date()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        base, ext = os.path.splitext(self.path)
+        target = f"{base}.{stamp}{ext}"
+        counter = 1
+        while os.path.exists(target) or os.path.exists(target + ".gz"):
+            target = f"{base}.{stamp}-{counter}{ext}"
+            counter += 1
+        os.replace(self.path, target)
+
+        if self.compress:
+            with open(target, "rb") as src, gzip.open(target + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(target)
+
+        self._open()
+
+    def _write_batch(self, batch: list) -> None:
+        if self._file is None:
+            self._open()
+
+        if self.rotate_daily and datetime.utcnow().date() != self._segment_date and self._file.tell() > 0:
+            self._rotate()
+
+        lines = []
+        entries = []
+        for entry in batch:
+            try:
+                lines.append(json.dumps(entry) + "\n")
+                entries.append(entry)
+            except (TypeError, ValueError) as e:
+                logger.error("Unserializable audit entry dropped: %s", e)
+        # Every batch ends flushed, so the on-disk size is where this one starts
+        offset = os.path.getsize(self.path)
+        try:
+            self._file.write("".join(lines))
+            self._file.flush()
+        except OSError:
+            # Reopen on the next attempt; the caller keeps the batch for a retry
+            try:
+                self._file.close()
+            except OSError:
+                pass  # The unwritten tail is discarded with the file object
+            self._file = None
+            # Cut off any partial write so the retry doesn't duplicate lines
+            try:
+                os.truncate(self.path, offset)
+            except OSError as e:
+                logger.error("Could not roll back a partial audit write: %s", e)
+            raise
+
+        # The batch is written; failing to sync or rotate must not cause a duplicate retry
+        try:
+            now = time.monotonic()
+            if self.fsync == "batch" or (self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval):
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            logger.error("Audit log sync/rotation failed: %s", e)
+
+        # Secondary copies never hold up or fail the primary JSONL record
+        for sink in self.sinks:
+            try:
+                sink(entries)
+            except Exception as e:
+                logger.error("Audit sink %r failed: %s", sink, e)
+
+    def _run(self) -> None:
+        pending = []
+        waiters = []
+        deadline = None
+        stopping = False
+        retry_delay = 0.0  # > 0 while backing off after a failed write
+
+        while not stopping:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if retry_delay and len(pending) >= self._queue_size:
+                # Hold at most queue_size entries while failing; write() blocks on the full queue
+                time.sleep(timeout)
+                item = None
+            else:
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, _FlushRequest):
+                waiters.append(item)
+            elif item is not None:
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if retry_delay and not (due or stopping):
+                # Backing off: don't retry early for new entries or flush requests
+                ready = False
+            else:
+                ready = pending and (stopping or waiters or due or len(pending) >= self.max_batch)
+            if ready:
+                try:
+                    self._write_batch(pending)
+                except OSError as e:
+                    retry_delay = min(max(retry_delay * 2, RETRY_INITIAL), RETRY_MAX)
+                    logger.error(
+                        "Audit log write failed (%d entries kept, retrying in %.1fs): %s",
+                        len(pending), retry_delay, e
+                    )
+                    self.error = e
+                    deadline = time.monotonic() + retry_delay
+                else:
+                    self.error = None
+                    retry_delay = 0.0
+                    pending = []
+                    deadline = None
+
+            if self.error is not None or not pending or ready:
+                for waiter in waiters:
+                    waiter.ok = self.error is None
+                    waiter.done.set()
+                waiters = []
+
+        if pending:
+            # The final attempt on close failed too; nothing is left to retry it
+            logger.error("Audit log closed with %d unwritten entries", len(pending))
+
+        if self._file is not None:
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
+
+
+class _FlushRequest:
+    """Queued by flush(); `ok` is False if the entries before it could not be written."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = True
@@ -0,0 +1,263 @@
+"""
+Embedding Cache - Persistent, Content-Addressed Vector Store
+Avoids re-encoding the same skills and documents across runs.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.logger import _hash_text
+from utils.quantized_store import QuantizedStore
+
+CACHE_DIR = os.path.join("cache", "embeddings")
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by model name + text hash.
+
+    Vectors live in a memory-mapped QuantizedStore (float32, float16 or
+    int8 per `storage`) with a JSON index mapping each key to its slot. A bounded in-process LRU sits in front of the
+    disk store. When the disk store is full, the least recently used slots
+    are reused.
+
+    New index entries are appended to a journal (index.log) and folded
+    into the JSON snapshot once the journal grows past the snapshot's
+    size, so a miss costs one appended line rather than a full rewrite.
+
+    Safe to share between threads; the model runs outside the lock, so
+    concurrent callers can be batched together (see EncodeBroker).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        dim: int,
+        cache_dir: str = CACHE_DIR,
+        max_entries: int = 50000,
+        memory_entries: int = 2048,
+        storage: str = "float32"
+    ):
+        self.model_name = model_name
+        self.dim = dim
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.storage = storage
+
+        self.path = os.path.join(cache_dir, model_name.replace("/", "__"))
+        os.makedirs(self.path, exist_ok=True)
+        self._index_path = os.path.join(self.path, "index.json")
+        self._log_path = os.path.join(self.path, "index.log")
+
+        self._lock = threading.RLock()
+        self._memory = OrderedDict()
+        self._index = {}  # key -> [slot, last_used]
+        self._tick = 0
+        self._log_lines = 0
+        self._snapshot_entries = 0  # Entries in index.json, excluding the journal
+        loaded = self._load_index()
+
+        self._vectors = QuantizedStore(
+            os.path.join(self.path, "vectors"), self.max_entries, self.dim, storage
+        )
+        if self._vectors.reset:
+            self._index = {}
+            loaded = False
+        if not loaded:
+            # Start a fresh snapshot so the journal always has a valid header
+            self._save_index()
+
+        used = {slot for slot, _ in self._index.values()}
+        # Popped from the end, so the lowest slots are handed out first
+        self._free = [slot for slot in range(self.max_entries - 1, -1, -1) if slot not in used]
+
+        self.hits = 0
+        self.misses = 0
+
+    def _load_index(self) -> bool:
+        """Load the snapshot and replay the journal; False if there is nothing valid to load."""
+        if not os.path.exists(self._index_path):
+            return False
+        try:
+            with open(self._index_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        # Discard an index written for a different shape
+        if (data.get("dim") != self.dim or data.get("max_entries") != self.max_entries
+                or data.get("storage", "float32") != self.storage):
+            return False
+        self._index = data.get("entries", {})
+        self._snapshot_entries = len(self._index)
+        self._tick = data.get("tick", 0)
+        self._replay_log()
+        return True
+
+    def _replay_log(self) -> None:
+        if not os.path.exists(self._log_path):
+            return
+        owner = {slot: key for key, (slot, _) in self._index.items()}
+        try:
+            with open(self._log_path) as f:
+                for line in f:
+                    try:
+                        key, slot, tick = json.loads(line)
+                    except ValueError:
+                        break  # Torn final line from an interrupted write
+                    # A reused slot evicts whichever key held it before
+                    previous = owner.get(slot)
+                    if previous is not None and previous != key:
+                        self._index.pop(previous, None)
+                    self._index[key] = [slot, tick]
+                    owner[slot] = key
+                    self._tick = max(self._tick, tick)
+                    self._log_lines += 1
+        except OSError:
+            pass
+
+    def _save_index(self) -> None:
+        """Write a full snapshot (including last-used ticks) and empty the journal."""
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "model_name": self.model_name,
+                "dim": self.dim,
+                "max_entries": self.max_entries,
+                "storage": self.storage,
+                "tick": self._tick,
+                "entries": self._index
+            }, f)
+        os.replace(tmp_path, self._index_path)
+        open(self._log_path, "w").close()
+        self._log_lines = 0
+        self._snapshot_entries = len(self._index)
+
+    def _append_index(self, entries: list) -> None:
+        """Journal new (key, slot, tick) entries, compacting when the journal outgrows the snapshot."""
+        if self._log_lines + len(entries) > max(1024, self._snapshot_entries):
+            self._save_index()
+            return
+        with open(self._log_path, "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self._log_lines += len(entries)
+
+    def _key(self, text: str) -> str:
+        return _hash_text(f"{self.model_name}\x00{text}")
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _free_slots(self, count: int) -> list:
+        """Return `count` writable slots, evicting least recently used keys if needed."""
+        free = [self._free.pop() for _ in range(min(count, len(self._free)))]
+
+        if len(free) < count:
+            victims = sorted(self._index.items(), key=lambda item: item[1][1])
+            for key, (slot, _) in victims[:count - len(free)]:
+                del self._index[key]
+                self._memory.pop(key, None)
+                free.append(slot)
+        return free
+
+    def get(self, text: str):
+        """Return the cached vector for `text`, or None."""
+        key = self._key(text)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+
+            self._tick += 1
+            entry[1] = self._tick
+            vector = self._vectors.read([entry[0]])[0]
+            self._remember(key, vector)
+            return vector
+
+    def put_many(self, texts: list, vectors: np.ndarray) -> None:
+        """Store vectors for texts, then journal their index entries."""
+        with self._lock:
+            self._put_many(texts, vectors)
+
+    def _put_many(self, texts: list, vectors: np.ndarray) -> None:
+        keys = []
+        for text in texts:
+            key = self._key(text)
+            if key not in self._index and key not in keys:
+                keys.append(key)
+
+        # Never store more than fits; keep the most recent ones
+        keys = keys[-self.max_entries:]
+        slots = dict(zip(keys, self._free_slots(len(keys))))
+
+        entries = []
+        for text, vector in zip(texts, vectors):
+            key = self._key(text)
+            vector = np.asarray(vector, dtype=np.float32)
+            if key in slots and key not in self._index:
+                self._tick += 1
+                self._vectors.write([slots[key]], vector)
+                self._index[key] = [slots[key], self._tick]
+                entries.append([key, slots[key], self._tick])
+            self._remember(key, vector)
+
+        self._vectors.flush()
+        if entries:
+            self._append_index(entries)
+
+    def encode(self, model, texts, **encode_kwargs):
+        """
+        Drop-in replacement for model.encode(texts) that only runs the
+        model on texts not already cached. Keyword arguments (e.g.
+        batch_size) are passed to model.encode.
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+
+        vectors = [None] * len(texts)
+        pending = {}
+        for i, text in enumerate(texts):
+            vector = self.get(text)
+            if vector is None:
+                pending.setdefault(text, []).append(i)
+            else:
+                vectors[i] = vector
+
+        with self._lock:
+            self.hits += len(texts) - sum(len(idx) for idx in pending.values())
+            self.misses += sum(len(idx) for idx in pending.values())
+
+        if pending:
+            new_texts = list(pending)
+            new_vectors = np.asarray(model.encode(new_texts, **encode_kwargs), dtype=np.float32)
+            for text, vector in zip(new_texts, new_vectors):
+                for i in pending[text]:
+                    vectors[i] = vector
+            self.put_many(new_texts, new_vectors)
+
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        result = np.stack(vectors)
+        return result[0] if single else result
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current occupancy."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 2) if total > 0 else 0,
+            "disk_entries": len(self._index),
+            "memory_entries": len(self._memory)
+        }
@@ -0,0 +1,163 @@
+"""
+Instrumentation - Per-Stage Pipeline Timing
+Context-manager and decorator timers for pipeline stages, per-batch
+summaries for the audit log, and a Prometheus text-format metrics file.
+
+Set SHORTLIST_METRICS=0 to disable. Disabled timers are a shared no-op
+context manager and decorators return the original function untouched.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from functools import wraps
+
+ENABLED = os.getenv("SHORTLIST_METRICS", "1") != "0"
+METRICS_FILE = os.path.join("logs", "metrics.prom")
+
+_NOOP = nullcontext()
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+class BatchMetrics:
+    """Per-item stage durations collected over one batch."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.samples[stage].append(seconds)
+
+    def summary(self) -> dict:
+        """Per-stage count, total and p50/p95 latency (ms)."""
+        stats = {}
+        for stage, values in self.samples.items():
+            ordered = sorted(values)
+            stats[stage] = {
+                "count": len(ordered),
+                "total_s": round(sum(ordered), 4),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+                "p95_ms": round(_percentile(ordered, 95) * 1000, 3)
+            }
+        return stats
+
+
+class _Registry:
+    """Process-wide cumulative stage totals plus a window of recent samples."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._count = defaultdict(int)
+        self._sum = defaultdict(float)
+        self._recent = defaultdict(lambda: deque(maxlen=window))
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._count[stage] += 1
+            self._sum[stage] += seconds
+            self._recent[stage].append(seconds)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (summary type)."""
+        lines = [
+            "# HELP shortlist_stage_duration_seconds Time spent per resume in each pipeline stage.",
+            "# TYPE shortlist_stage_duration_seconds summary"
+        ]
+        with self._lock:
+            for stage in sorted(self._count):
+                recent = sorted(self._recent[stage])
+                for quantile in (0.5, 0.95):
+                    value = _percentile(recent, quantile * 100)
+                    lines.append(
+                        f'shortlist_stage_duration_seconds{{stage="{stage}",quantile="{quantile}"}} {value:.6f}'
+                    )
+                lines.append(f'shortlist_stage_duration_seconds_sum{{stage="{stage}"}} {self._sum[stage]:.6f}')
+                lines.append(f'shortlist_stage_duration_seconds_count{{stage="{stage}"}} {self._count[stage]}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = _Registry()
+
+
+class _StageTimer:
+    def __init__(self, stage: str, records, batch: BatchMetrics):
+        self.stage = stage
+        self.records = records
+        self.batch = batch
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_stage(self.stage, time.perf_counter() - self.start, self.records, self.batch)
+        return False
+
+
+def record_stage(stage: str, seconds: float, records=None, batch: BatchMetrics = None) -> None:
+    """
+    Record a measured duration. When `records` (a list of per-resume dicts)
+    is given, the time is split evenly across them, as for a batched stage.
+    """
+    if not ENABLED:
+        return
+    items = len(records) if records else 1
+    per_item = seconds / items
+    for i in range(items):
+        if records:
+            records[i][stage] = records[i].get(stage, 0.0) + per_item
+        if batch is not None:
+            batch.add(stage, per_item)
+        REGISTRY.add(stage, per_item)
+
+
+def stage_timer(stage: str, records=None, batch: BatchMetrics = None):
+    """
+    Time a block as one pipeline stage.
+
+        with stage_timer("spacy", records, batch):
+            ...
+    """
+    if not ENABLED:
+        return _NOOP
+    return _StageTimer(stage, records, batch)
+
+
+def timed(stage: str):
+    """Decorator form of stage_timer() (process-wide totals only)."""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _StageTimer(stage, None, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def to_milliseconds(record: dict) -> dict:
+    """Per-resume stage durations in ms, for the audit log."""
+    return {stage: round(seconds * 1000, 3) for stage, seconds in record.items()}
+
+
+def export_prometheus(path: str = METRICS_FILE) -> None:
+    """Atomically write current metrics for a textfile-collector style scraper."""
+    if not ENABLED:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp_path, path)
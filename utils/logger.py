@@ -4,22 +4,17 @@ Logs all scoring decisions for audit trail.
 """
 
 import logging
-import json
 from datetime import datetime
 import hashlib
 import os
 import numpy as np
 
+from utils.audit_writer import AuditLogWriter
+
 # Configure logging
 log_dir = "logs"
 os.makedirs(log_dir, exist_ok=True)
 
-logging.basicConfig(
-    filename=os.path.join(log_dir, 'audit_log.jsonl'),
-    level=logging.INFO,
-    format='%(message)s'
-)
-
 logger = logging.getLogger(__name__)
 
 
@@ -43,12 +38,41 @@ def _convert_to_serializable(obj):
     return obj
 
 
+def _audit_sinks() -> list:
+    """Optional indexed copy of the audit trail (AUDIT_STORE=1, path in AUDIT_DB)."""
+    if os.getenv("AUDIT_STORE", "0") != "1":
+        return []
+    from utils.audit_store import AuditStore, DB_PATH
+    return [AuditStore(os.getenv("AUDIT_DB", DB_PATH)).add_many]
+
+
+# Entries are snapshotted (numpy values converted) by write() on the calling
+# thread, then encoded and written by a background thread in batches.
+# Tune with AUDIT_FSYNC (never|batch|interval), AUDIT_MAX_BYTES and AUDIT_ROTATE_DAILY.
+audit_writer = AuditLogWriter(
+    os.path.join(log_dir, 'audit_log.jsonl'),
+    serialize=_convert_to_serializable,
+    fsync=os.getenv("AUDIT_FSYNC", "interval"),
+    max_bytes=int(os.getenv("AUDIT_MAX_BYTES", 50 * 1024 * 1024)),
+    rotate_daily=os.getenv("AUDIT_ROTATE_DAILY", "0") == "1",
+    sinks=_audit_sinks()
+)
+
+
+def flush() -> bool:
+    """Block until all queued audit entries are on disk. False if writing them failed."""
+    return audit_writer.flush()
+
+
 def log_scoring_decision(
     resume_name: str,
     score_data: dict,
     jd_text: str,
     resume_text: str,
-    parsed_jd: dict
+    parsed_jd: dict,
+    stage_timings: dict = None,
+    resume_hash: str = None,
+    extraction: dict = None
 ) -> None:
     """
     Log scoring decision for audit trail.
@@ -59,12 +83,15 @@ def log_scoring_decision(
         jd_text: Original JD text
         resume_text: Original resume text
         parsed_jd: Parsed JD data
+        stage_timings: Optional per-stage durations in ms for this resume
+        resume_hash: Precomputed hash of resume_text (when the text is no longer at hand)
+        extraction: Optional {"pages", "truncated"} extraction report (PDF page timings)
     """
     log_entry = {
         "timestamp": datetime.utcnow().isoformat(),
         "resume_name": resume_name,
         "jd_hash": _hash_text(jd_text),
-        "resume_hash": _hash_text(resume_text),
+        "resume_hash": resume_hash or _hash_text(resume_text),
         "final_score": score_data["final_score"],
         "skill_match": score_data["skill_match"],
         "experience_match": score_data["experience_match"],
@@ -74,14 +101,24 @@ def log_scoring_decision(
         "required_skills_count": len(parsed_jd["required_skills"]),
         "min_experience_required": parsed_jd["min_experience"]
     }
+    if stage_timings:
+        log_entry["stage_timings_ms"] = stage_timings
+    if extraction and extraction.get("pages") is not None:
+        log_entry["pages_extracted"] = len(extraction["pages"])
+        log_entry["page_timings_ms"] = [round(page["seconds"] * 1000, 3) for page in extraction["pages"]]
+        log_entry["truncated"] = extraction["truncated"]
     
-    # Convert numpy types to native Python types
-    log_entry = _convert_to_serializable(log_entry)
-    
-    logger.info(json.dumps(log_entry))
+    # Copied and converted to native Python types before write() returns, so
+    # the skill lists shared with score_data can't change under the writer
+    audit_writer.write(log_entry)
 
 
-def log_batch_summary(total_resumes: int, successful: int, failed: int) -> None:
+def log_batch_summary(
+    total_resumes: int,
+    successful: int,
+    failed: int,
+    stage_stats: dict = None
+) -> None:
     """
     Log batch processing summary.
     
@@ -89,6 +126,7 @@ def log_batch_summary(total_resumes: int, successful: int, failed: int) -> None:
         total_resumes: Total number of resumes uploaded
         successful: Number successfully processed
         failed: Number that failed
+        stage_stats: Optional per-stage totals and percentiles for the batch
     """
     log_entry = {
         "timestamp": datetime.utcnow().isoformat(),
@@ -98,9 +136,10 @@ def log_batch_summary(total_resumes: int, successful: int, failed: int) -> None:
         "failed": failed,
         "success_rate": round(successful / total_resumes * 100, 2) if total_resumes > 0 else 0
     }
+    if stage_stats:
+        log_entry["stage_stats"] = stage_stats
     
-    log_entry = _convert_to_serializable(log_entry)
-    logger.info(json.dumps(log_entry))
+    audit_writer.write(log_entry)
 
 
 def log_error(resume_name: str, error_message: str) -> None:
@@ -118,5 +157,4 @@ def log_error(resume_name: str, error_message: str) -> None:
         "error": str(error_message)
     }
     
-    log_entry = _convert_to_serializable(log_entry)
-    logger.info(json.dumps(log_entry))
+    audit_writer.write(log_entry)
@@ -0,0 +1,112 @@
+"""
+Model Registry - Lazy, Timed Model Loading
+Heavy models (spaCy, the sentence encoder, the Gemini client) are
+registered by name and loaded on first use instead of at import time.
+warm_up() loads them on a background thread, e.g. while the UI renders.
+
+Models are never downloaded at runtime unless SHORTLIST_ALLOW_DOWNLOADS=1;
+a missing model raises ModelUnavailableError at once with the command that
+installs it.
+"""
+
+import os
+import threading
+import time
+
+ALLOW_DOWNLOADS = os.getenv("SHORTLIST_ALLOW_DOWNLOADS", "0") == "1"
+
+
+class ModelUnavailableError(RuntimeError):
+    """A registered model could not be loaded (not installed, offline, ...)."""
+
+
+class ModelRegistry:
+    """
+    Name -> loader map with load-once semantics.
+
+    get() blocks until the model is loaded, whether by this call, another
+    thread or warm_up(). A failed load is remembered and re-raised on
+    every get(), so callers fail fast instead of retrying a slow load.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._errors = {}
+        self._timings = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader) -> None:
+        """Register `loader()` under `name` (replacing any earlier loader)."""
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str):
+        """Return the loaded model, loading it on first use."""
+        if name in self._models:
+            return self._models[name]
+        if name not in self._loaders:
+            raise KeyError(f"No model registered as '{name}'")
+
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+            if name in self._errors:
+                raise self._errors[name]
+
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except ModelUnavailableError as e:
+                self._errors[name] = e
+                raise
+            except Exception as e:
+                error = ModelUnavailableError(f"Failed to load model '{name}': {e}")
+                self._errors[name] = error
+                raise error from e
+            finally:
+                self._timings[name] = time.perf_counter() - start
+
+            self._models[name] = model
+            return model
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def warm_up(self, names: list = None, background: bool = True):
+        """
+        Load the given (default: all) models. With background=True this
+        returns the started daemon thread immediately; load errors are kept
+        and surface on the next get().
+        """
+        names = list(names or self._loaders)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except ModelUnavailableError:
+                    pass
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def timings(self) -> dict:
+        """Per-model load status and duration in seconds."""
+        return {
+            name: {
+                "loaded": name in self._models,
+                "seconds": round(self._timings[name], 4) if name in self._timings else None,
+                "error": str(self._errors[name]) if name in self._errors else None
+            }
+            for name in self._loaders
+        }
+
+
+REGISTRY = ModelRegistry()
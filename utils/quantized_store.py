@@ -0,0 +1,208 @@
+"""
+Quantized Store - Compact Embedding Storage
+float32, float16 or int8 (symmetric, one float32 scale per vector)
+encodings for persisted sentence embeddings, with similarity computed
+directly on the stored codes.
+
+At 384 dimensions a vector takes 1536 bytes as float32, 768 as float16 and
+388 as int8 + scale. Run the drift report to see what each mode costs in
+retrieval quality for your data:
+    python -m utils.quantized_store --top-k 10
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+MODES = ("float32", "float16", "int8")
+
+_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+def _check_mode(mode: str) -> None:
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+
+
+def bytes_per_vector(dim: int, mode: str) -> int:
+    """Stored size of one vector, including its scale for int8 (float modes store none)."""
+    _check_mode(mode)
+    size = dim * np.dtype(_DTYPES[mode]).itemsize
+    return size + np.dtype(np.float32).itemsize if mode == "int8" else size
+
+
+def quantize(vectors: np.ndarray, mode: str):
+    """Encode (n, dim) vectors. Returns (codes, scales); scales are 1.0 unless mode is int8."""
+    _check_mode(mode)
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if mode != "int8":
+        return vectors.astype(_DTYPES[mode]), np.ones(len(vectors), dtype=np.float32)
+
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray = None) -> np.ndarray:
+    """Decode back to float32 (n, dim). `scales` may be None for float codes."""
+    if scales is None:
+        return np.array(codes, dtype=np.float32)
+    return np.asarray(codes, dtype=np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+def quantized_dot(codes: np.ndarray, scales: np.ndarray, queries: np.ndarray, chunk_rows: int = 65536) -> np.ndarray:
+    """
+    Similarities between stored vectors and float32 queries, computed chunk
+    by chunk so memory-mapped codes are never fully decoded at once.
+
+    `scales` may be None for float codes. Returns an (n_stored, n_queries)
+    float32 matrix.
+    """
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    out = np.empty((len(codes), len(queries)), dtype=np.float32)
+    for start in range(0, len(codes), chunk_rows):
+        block = np.asarray(codes[start:start + chunk_rows], dtype=np.float32)
+        out[start:start + len(block)] = block @ queries.T
+        if scales is not None:
+            out[start:start + len(block)] *= np.asarray(
+                scales[start:start + len(block)], dtype=np.float32
+            )[:, None]
+    return out
+
+
+class QuantizedStore:
+    """
+    Fixed-capacity, memory-mapped slot array of quantized vectors.
+
+    Files: `<prefix>.<mode>` (codes) and, for int8 only, `<prefix>.scales`
+    (float32; `scales` is None in the float modes). Existing files are reused when their size matches (capacity, dim, mode);
+    otherwise they are recreated and `reset` is set so callers can discard
+    any slot index that pointed into them.
+
+    Args:
+        prefix: Path prefix for the two files
+        capacity: Number of slots
+        dim: Vector dimension
+        mode: "float32", "float16" or "int8"
+    """
+
+    def __init__(self, prefix: str, capacity: int, dim: int, mode: str = "float32"):
+        _check_mode(mode)
+        self.capacity = capacity
+        self.dim = dim
+        self.mode = mode
+        codes_path = f"{prefix}.{mode}"
+        scales_path = f"{prefix}.scales"
+        os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+
+        dtype = _DTYPES[mode]
+        scaled = mode == "int8"
+        expected = [(codes_path, capacity * dim * np.dtype(dtype).itemsize)]
+        if scaled:
+            expected.append((scales_path, capacity * np.dtype(np.float32).itemsize))
+        elif os.path.exists(scales_path):
+            os.remove(scales_path)  # Written for float modes by earlier versions
+        self.reset = not all(os.path.exists(p) and os.path.getsize(p) == size for p, size in expected)
+        file_mode = "w+" if self.reset else "r+"
+
+        self.codes = np.memmap(codes_path, dtype=dtype, mode=file_mode, shape=(capacity, dim))
+        self.scales = (
+            np.memmap(scales_path, dtype=np.float32, mode=file_mode, shape=(capacity,)) if scaled else None
+        )
+
+    def write(self, slots: list, vectors: np.ndarray) -> None:
+        codes, scales = quantize(vectors, self.mode)
+        self.codes[slots] = codes
+        if self.scales is not None:
+            self.scales[slots] = scales
+
+    def _scales(self, slots: list = None):
+        if self.scales is None or slots is None:
+            return self.scales
+        return self.scales[slots]
+
+    def read(self, slots: list) -> np.ndarray:
+        """Decoded float32 vectors for `slots`."""
+        return dequantize(self.codes[slots], self._scales(slots))
+
+    def dot(self, queries: np.ndarray, slots: list = None) -> np.ndarray:
+        """Similarities of `queries` against all (or the given) slots."""
+        if slots is None:
+            return quantized_dot(self.codes, self.scales, queries)
+        return quantized_dot(self.codes[slots], self._scales(slots), queries)
+
+    def flush(self) -> None:
+        self.codes.flush()
+        if self.scales is not None:
+            self.scales.flush()
+
+
+def drift_report(vectors: np.ndarray, queries: np.ndarray, top_k: int = 10) -> dict:
+    """
+    Compare each mode with float32 on the given data: recall@k of the
+    float32 top-k neighbours, score error and bytes per vector.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    top_k = min(top_k, len(vectors))
+
+    exact = vectors @ queries.T
+    exact_top = np.argpartition(-exact, top_k - 1, axis=0)[:top_k]
+
+    report = {}
+    for mode in MODES:
+        codes, scales = quantize(vectors, mode)
+        approx = quantized_dot(codes, scales, queries)
+        approx_top = np.argpartition(-approx, top_k - 1, axis=0)[:top_k]
+        recall = np.mean([
+            len(set(exact_top[:, q]) & set(approx_top[:, q])) / top_k for q in range(len(queries))
+        ])
+        error = np.abs(approx - exact)
+        report[mode] = {
+            "bytes_per_vector": bytes_per_vector(vectors.shape[1], mode),
+            f"recall_at_{top_k}": round(float(recall), 4),
+            "mean_abs_score_error": float(error.mean()),
+            "max_abs_score_error": float(error.max())
+        }
+    return report
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report recall and score drift of each storage mode.")
+    parser.add_argument("--index", default=os.path.join("cache", "candidate_index"),
+                        help="Candidate index directory to sample vectors from")
+    parser.add_argument("--queries", type=int, default=100, help="Stored vectors reused as queries")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Use N random unit vectors (384-d) instead of an index")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    if args.synthetic:
+        vectors = _normalize(rng.normal(size=(args.synthetic, 384)).astype(np.float32))
+    else:
+        from matching.candidate_index import CandidateIndex
+        index = CandidateIndex(args.index)
+        vectors = index.vectors()
+        index.close()
+        if not len(vectors):
+            print(f"No vectors in {args.index}; use --synthetic N", file=sys.stderr)
+            return 1
+
+    queries = vectors[rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)]
+    print(json.dumps(drift_report(vectors, queries, args.top_k), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
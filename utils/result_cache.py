@@ -0,0 +1,201 @@
+"""
+Result Cache - Whole-Pipeline Memoization
+Stores each candidate's score_data and parsed features keyed by
+(JD, resume bytes, pipeline version), so re-running the same JD against
+the same uploads skips extraction, parsing, embedding and scoring.
+
+The pipeline version is a hash of the scoring code, the skill taxonomy and
+the model names, so any change to weights, taxonomy or models makes old
+entries unreachable; they then age out through normal eviction.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+CACHE_PATH = os.path.join("cache", "results.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used);
+CREATE INDEX IF NOT EXISTS idx_results_created ON results (created);
+"""
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _code_fingerprint() -> str:
+    """Hash of the scoring code and model versions; fixed for the life of the process."""
+    from parsing import feature_extractor, jd_parser, resume_parser
+    from matching import document_encoder, scorer, skill_embeddings, skill_matcher
+    from pipeline import engine
+    from utils import skill_index, skill_taxonomy
+
+    parts = [
+        inspect.getsource(module)
+        for module in (
+            feature_extractor, jd_parser, resume_parser,
+            document_encoder, scorer, skill_embeddings, skill_matcher,
+            engine, skill_index, skill_taxonomy
+        )
+    ]
+    parts.append(skill_matcher.MODEL_NAME)
+    parts.append(f"{jd_parser.nlp.meta.get('name')}-{jd_parser.nlp.meta.get('version')}")
+    return _sha256("\x00".join(parts).encode())
+
+
+def pipeline_version(extra: dict = None) -> str:
+    """
+    Fingerprint of everything that can change a score: parsing, matching
+    and scoring code, the engine that wires them together, the current
+    TECH_SKILLS set (including custom skills added at runtime) and the
+    spaCy / sentence-transformer model versions.
+    `extra` adds caller-specific settings (e.g. scoring weights).
+
+    Module sources are read once per process; only the skill set and
+    `extra` are re-hashed per call.
+    """
+    from utils import skill_taxonomy
+
+    parts = [_code_fingerprint(), "\n".join(sorted(skill_taxonomy.TECH_SKILLS))]
+    if extra:
+        parts.append(json.dumps(extra, sort_keys=True, default=str))
+    return _sha256("\x00".join(parts).encode())
+
+
+def jd_key(jd_text: str, required_skills: list, version: str) -> str:
+    """Key prefix for one prepared JD (text plus merged required skills) under a pipeline version."""
+    return _sha256("\x00".join([version, jd_text, "\n".join(sorted(required_skills))]).encode())
+
+
+def result_key(jd_key: str, file_bytes: bytes) -> str:
+    """Cache key for one resume document scored against a prepared JD."""
+    return _sha256(f"{jd_key}\x00{_sha256(file_bytes)}".encode())
+
+
+class ResultCache:
+    """
+    SQLite-backed memo of pipeline results.
+
+    Entries older than `max_age_days` are never returned. When the stored
+    payloads exceed `max_bytes`, least recently used entries are evicted.
+    Safe to share between threads.
+
+    Args:
+        path: Database file (created if missing)
+        max_age_days: Entry lifetime (0 = no age limit)
+        max_bytes: Total payload budget (0 = unbounded)
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        max_age_days: float = 30,
+        max_bytes: int = 256 * 1024 * 1024
+    ):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            # Running payload total, so a put doesn't re-sum the whole table
+            self._total = self._sum_sizes()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """Return the stored payload for `key`, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created, payload FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.max_age and now - row[0] > self.max_age):
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[1])
+
+    def put(self, key: str, payload: dict) -> None:
+        """Store a JSON-safe payload, then evict expired and over-budget entries."""
+        data = json.dumps(payload)
+        now = time.time()
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, created, last_used, size, payload) VALUES (?, ?, ?, ?, ?)",
+                (key, now, now, len(data), data)
+            )
+            self._total += len(data) - (old[0] if old else 0)
+            self._evict(now)
+
+    def _sum_sizes(self, where: str = "", params: tuple = ()) -> int:
+        return self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM results {where}", params).fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        if self.max_age:
+            cutoff = (now - self.max_age,)
+            expired = self._sum_sizes("WHERE created < ?", cutoff)
+            if expired:
+                self._conn.execute("DELETE FROM results WHERE created < ?", cutoff)
+                self._total -= expired
+        if not self.max_bytes or self._total <= self.max_bytes:
+            return
+
+        # Other processes may share the file: confirm against the table before evicting
+        self._total = self._sum_sizes()
+        if self._total <= self.max_bytes:
+            return
+        # Drop least recently used entries until back under budget
+        excess = self._total - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+            victims.append((key,))
+            excess -= size
+            self._total -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM results WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results")
+            self._total = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 2) if total > 0 else 0,
+            "entries": entries,
+            "bytes": size
+        }
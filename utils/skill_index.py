@@ -0,0 +1,153 @@
+"""
+Skill Index - Linear-Time Taxonomy Substring Lookup
+Answers "does a phrase contain a known skill?" and "is a phrase contained
+in a known skill?" in time linear in the phrase length.
+"""
+
+from collections import deque
+
+# Joins skills inside the suffix automaton; never present in cleaned text
+_SEPARATOR = "\x00"
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: does a text contain any of the patterns?"""
+
+    def __init__(self, patterns=()):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [False]
+        self._dirty = False
+        for pattern in patterns:
+            self.add(pattern)
+
+    def add(self, pattern: str) -> None:
+        """Insert a pattern. Failure links are recomputed lazily on next search."""
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(False)
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._output[state] = True
+        self._dirty = True
+
+    def _build(self) -> None:
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                if self._fail[nxt] == nxt:
+                    self._fail[nxt] = 0
+                self._output[nxt] = self._output[nxt] or self._output[self._fail[nxt]]
+
+        self._dirty = False
+
+    def contains_any(self, text: str) -> bool:
+        if self._dirty:
+            self._build()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                return True
+        return False
+
+
+class SuffixAutomaton:
+    """Substring oracle over a growing collection of strings."""
+
+    def __init__(self, strings=()):
+        self._next = [{}]
+        self._link = [-1]
+        self._len = [0]
+        self._last = 0
+        for string in strings:
+            self.add(string)
+
+    def _extend(self, ch: str) -> None:
+        cur = len(self._next)
+        self._next.append({})
+        self._len.append(self._len[self._last] + 1)
+        self._link.append(0)
+
+        p = self._last
+        while p != -1 and ch not in self._next[p]:
+            self._next[p][ch] = cur
+            p = self._link[p]
+
+        if p != -1:
+            q = self._next[p][ch]
+            if self._len[p] + 1 == self._len[q]:
+                self._link[cur] = q
+            else:
+                clone = len(self._next)
+                self._next.append(dict(self._next[q]))
+                self._len.append(self._len[p] + 1)
+                self._link.append(self._link[q])
+                while p != -1 and self._next[p].get(ch) == q:
+                    self._next[p][ch] = clone
+                    p = self._link[p]
+                self._link[q] = clone
+                self._link[cur] = clone
+
+        self._last = cur
+
+    def add(self, string: str) -> None:
+        """Append a string. The automaton is extended online, no rebuild needed."""
+        for ch in _SEPARATOR + string:
+            self._extend(ch)
+
+    def is_substring(self, text: str) -> bool:
+        state = 0
+        for ch in text:
+            state = self._next[state].get(ch)
+            if state is None:
+                return False
+        return True
+
+
+class SkillIndex:
+    """Both substring directions over one skill set, kept in sync incrementally."""
+
+    def __init__(self, skills=()):
+        self.skills = set()
+        self._contains = AhoCorasick()
+        self._contained = SuffixAutomaton()
+        self.add(skills)
+
+    def add(self, skills) -> None:
+        for skill in skills:
+            if skill not in self.skills:
+                self.skills.add(skill)
+                self._contains.add(skill)
+                self._contained.add(skill)
+
+    def contains_skill(self, phrase: str) -> bool:
+        """True if any indexed skill is a substring of `phrase`."""
+        return self._contains.contains_any(phrase)
+
+    def within_skill(self, phrase: str) -> bool:
+        """True if `phrase` is a substring of any indexed skill."""
+        if _SEPARATOR in phrase:
+            return False
+        return self._contained.is_substring(phrase)
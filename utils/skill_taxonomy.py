@@ -1,8 +1,13 @@
 """
 Skill Taxonomy - Technical Skill Validation
-Filters extracted skills to remove generic phrases and non-technical terms.
+Filters extracted skills to remove generic phrases and non-technical terms,
+and maps every known skill and alias to a canonical integer ID.
 """
 
+import hashlib
+
+from utils.skill_index import SkillIndex
+
 # Comprehensive tech skills taxonomy (500+ skills)
 TECH_SKILLS = {
     # Programming Languages
@@ -22,10 +27,10 @@ TECH_SKILLS = {
     
     # Cloud Platforms
     "aws", "azure", "gcp", "google cloud", "cloud computing", "heroku", "digitalocean",
-    "ec2", "s3", "lambda", "cloudformation", "terraform", "ansible",
+    "cloudformation", "terraform", "ansible",
     
     # Cloud Services
-    "ec2", "s3", "rds", "dynamodb", "lambda", "cloudwatch", "iam",
+    "ec2", "s3", "rds", "lambda", "cloudwatch", "iam",
     "azure functions", "azure devops", "azure data factory", "adf",
     "azure databricks", "synapse analytics", "adls", "blob storage",
     "cosmos db", "stream analytics",
@@ -92,6 +97,25 @@ TECH_SKILLS = {
     "cdn", "networking", "routing", "switching"
 }
 
+# Canonical skill -> other names for it. Every alias resolves to the
+# canonical skill's ID, so "golang" in a resume matches "go" in a JD exactly.
+SKILL_ALIASES = {
+    "go": ["golang"],
+    "spark": ["apache spark"],
+    "nlp": ["natural language processing"],
+    "gcp": ["google cloud"],
+    "vue": ["vue.js"],
+    "tdd": ["test-driven development"],
+    "adf": ["azure data factory"],
+    "ar": ["augmented reality"],
+    "vr": ["virtual reality"],
+    "scd": ["slowly changing dimension"],
+    "kubernetes": ["k8s"],
+    "postgresql": ["postgres"],
+    "scikit-learn": ["sklearn"],
+}
+TECH_SKILLS.update(alias for aliases in SKILL_ALIASES.values() for alias in aliases)
+
 # Common non-technical phrases to explicitly filter out
 NOISE_PHRASES = {
     "the company", "the team", "the project", "the role", "the position",
@@ -104,6 +128,70 @@ NOISE_PHRASES = {
 }
 
 
+_index = SkillIndex()
+
+
+def _get_index() -> SkillIndex:
+    """Return the substring index, synced with TECH_SKILLS (which callers may mutate)."""
+    global _index
+    # Compare contents, not sizes: swapping one skill for another keeps the length
+    if _index.skills != TECH_SKILLS:
+        if _index.skills <= TECH_SKILLS:
+            _index.add(TECH_SKILLS - _index.skills)
+        else:
+            _index = SkillIndex(TECH_SKILLS)
+    return _index
+
+
+def source_fingerprint(skills, aliases: dict) -> str:
+    """Content hash of a skill set and alias map, independent of iteration order."""
+    lines = sorted(skills)
+    lines += sorted(f"{canonical}={','.join(sorted(names))}" for canonical, names in aliases.items())
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+class SkillTable:
+    """
+    Canonical skills with integer IDs.
+
+    `names[id]` is the canonical name; `ids` maps every known name and
+    alias (lowercased) to its canonical ID.
+    """
+
+    def __init__(self, skills, aliases: dict):
+        alias_of = {alias: canonical for canonical, names in aliases.items() for alias in names}
+        self.names = sorted({alias_of.get(skill, skill) for skill in skills} | set(aliases))
+        self.ids = {name: skill_id for skill_id, name in enumerate(self.names)}
+        for alias, canonical in alias_of.items():
+            self.ids[alias] = self.ids[canonical]
+        self.source = source_fingerprint(skills, aliases)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def lookup(self, phrase: str):
+        """Canonical ID of a skill or alias, or None for an unknown phrase."""
+        return self.ids.get(" ".join(phrase.lower().split()))
+
+    def fingerprint(self) -> str:
+        """Identifies this exact ID assignment (for stored per-skill data)."""
+        return hashlib.sha256("\n".join(self.names).encode()).hexdigest()[:16]
+
+
+_table = None
+
+
+def skill_table() -> SkillTable:
+    """
+    Return the canonical skill table, rebuilt when the contents of
+    TECH_SKILLS or SKILL_ALIASES have changed (e.g. a skill was renamed).
+    """
+    global _table
+    if _table is None or _table.source != source_fingerprint(TECH_SKILLS, SKILL_ALIASES):
+        _table = SkillTable(TECH_SKILLS, SKILL_ALIASES)
+    return _table
+
+
 def validate_skills(extracted_skills: list) -> list:
     """
     Filter extracted skills to remove non-technical phrases.
@@ -119,6 +207,7 @@ def validate_skills(extracted_skills: list) -> list:
         Output: ["python", "machine learning"]
     """
     validated = []
+    index = _get_index()
     
     for skill in extracted_skills:
         skill_lower = skill.lower().strip()
@@ -134,12 +223,9 @@ def validate_skills(extracted_skills: list) -> list:
         # Check if skill is in taxonomy OR contains a known tech term
         if skill_lower in TECH_SKILLS:
             validated.append(skill)
-        else:
-            # Check if any tech skill is a substring (handles variations)
-            for tech_skill in TECH_SKILLS:
-                if tech_skill in skill_lower or skill_lower in tech_skill:
-                    validated.append(skill)
-                    break
+        # Check if any tech skill is a substring, or the phrase is part of one (handles variations)
+        elif index.contains_skill(skill_lower) or index.within_skill(skill_lower):
+            validated.append(skill)
     
     return list(set(validated))  # Remove duplicates
 
@@ -152,3 +238,4 @@ def add_custom_skills(custom_skills: list) -> None:
         custom_skills: List of additional skills to recognize
     """
     TECH_SKILLS.update(s.lower() for s in custom_skills)
+    _get_index()